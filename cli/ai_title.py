@@ -7,7 +7,8 @@ from dotenv import load_dotenv
 from openai import OpenAI
 from googleapiclient.discovery import build
 from google_auth import get_credentials
-from api import get
+import api
+from api import get, parse_cache_flags
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -138,12 +139,10 @@ def cmd_generate():
     console.print("[cyan]1. 중복 체크...[/]")
     words = keyword.split()
     found = False
-    for w in words:
-        if len(w) < 2:
-            continue
-        results = get("/posts/search", params={"q": w})
-        if isinstance(results, dict):
-            results = results.get("results", [])
+    search_words = [w for w in words if len(w) >= 2]
+    searched = api.search_posts(hits=search_words)["hits"]
+    for w in search_words:
+        results = searched.get(w, [])
         relevant = [r for r in results if sum(1 for kw in words if kw.lower() in str(r.get("title", "")).lower()) >= 2]
         if relevant:
             found = True
@@ -408,4 +407,5 @@ def main():
 
 
 if __name__ == "__main__":
+    sys.argv[1:] = parse_cache_flags(sys.argv[1:])
     main()
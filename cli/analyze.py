@@ -2,7 +2,7 @@
 import sys
 import json
 import os
-from api import get
+from api import iter_posts, iter_titles, parse_cache_flags
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -114,23 +114,25 @@ def run():
 
     # 2. 내 포스트 로딩
     console.print("[cyan]2. 내 포스트 로딩...[/]")
-    my_posts = get("/posts/search", params={"q": ""})
-    if isinstance(my_posts, dict):
-        my_posts = my_posts.get("results", [])
     my_titles_lower = []
-    for p in my_posts:
+    for p in iter_posts():
         t = p.get("title", "")
         if isinstance(t, list):
             t = t[0] if t else ""
         my_titles_lower.append(str(t).lower())
-    console.print(f"  내 포스트: {len(my_posts)}개")
+    console.print(f"  내 포스트: {len(my_titles_lower)}개")
 
     # 3. 수집 타이틀 로딩
     console.print("[cyan]3. 수집 타이틀 로딩...[/]")
-    titles = get("/titles/search", params={"q": ""})
-    if isinstance(titles, dict):
-        titles = titles.get("results", [])
-    console.print(f"  수집 타이틀: {len(titles)}개")
+    # 제목 텍스트만 보관 (행 전체는 페이지 단위로 흘려보냄)
+    title_texts = []
+    for t in iter_titles():
+        title_text = t.get("title", "")
+        if isinstance(title_text, list):
+            title_text = title_text[0] if title_text else ""
+        title_texts.append(str(title_text))
+    titles_lower = [t.lower() for t in title_texts]
+    console.print(f"  수집 타이틀: {len(title_texts)}개")
 
     # 4. 수익 점수 기반 분석
     console.print("[cyan]4. 수익 점수 분석 중...[/]\n")
@@ -143,13 +145,8 @@ def run():
 
         already_written = any(kw.lower() in t for t in my_titles_lower)
 
-        matched_titles = []
-        for t in titles:
-            title_text = t.get("title", "")
-            if isinstance(title_text, list):
-                title_text = title_text[0] if title_text else ""
-            if kw.lower() in str(title_text).lower():
-                matched_titles.append(str(title_text))
+        kw_lower = kw.lower()
+        matched_titles = [title_texts[i] for i, t in enumerate(titles_lower) if kw_lower in t]
 
         avg_pos = sum(data["positions"]) / len(data["positions"]) if data["positions"] else 99
         value_class = classify_keyword(kw)
@@ -254,6 +251,7 @@ def run():
 
 
 if __name__ == "__main__":
+    sys.argv[1:] = parse_cache_flags(sys.argv[1:])
     console.print("[bold]Blogdex 수익 기반 글쓰기 기회 분석[/]")
     console.print("  python analyze.py        최근 30일")
     console.print("  python analyze.py 90     최근 90일")
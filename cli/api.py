@@ -1,12 +1,391 @@
+"""Blogdex Worker API 클라이언트 - keep-alive 세션 공유 + 타임아웃 + 재시도 + gzip
+
+    from api import get, post
+    rows = get("/posts/search", {"q": ""})
+    found = search_posts(hits=["전기차 보조금"], counts=["전기차", "보조금"], totals=True)
+    for p in iter_posts():                     # 전체 글을 페이지 단위로 (after_id 커서)
+        ...
+    post("/titles", {"titles": batch}, idempotent=True)   # INSERT OR IGNORE 등은 재시도 허용
+
+요청 시간 확인: add_timing_hook(fn) 또는 BLOGDEX_API_TIMING=1 (stderr 출력)
+
+로컬 복제본(replica.py)이 있으면 지원하는 GET은 로컬에서 응답 (네트워크 오류 시에도)
+
+GET 응답은 디스크 캐시(api_cache.py) — 엔드포인트별 TTL 안이면 네트워크 생략, 지나면 ETag로 재검증.
+캐시 모드: 진입점의 --no-cache (캐시 안 씀) / --refresh (TTL 무시하고 재검증), BLOGDEX_CACHE=off|refresh도 가능
+    parser = argparse.ArgumentParser(); api.add_cache_args(parser); api.apply_cache_args(parser.parse_args())
+    sys.argv[1:] = api.parse_cache_flags(sys.argv[1:])   # sys.argv를 직접 읽는 스크립트 (__main__에서)
+
+여러 건을 한 번에 (비동기, 동시 최대 limit개):
+    blogs, hits = api.run(api.gather(api.aget("/blogs"), api.aget("/posts/search", {"q": w}), limit=8))
+"""
+import asyncio
+import gzip
+import json
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import replica
+from api_cache import ResponseCache
 from config import API_URL, API_KEY
 
-HEADERS = {"X-API-Key": API_KEY, "Content-Type": "application/json"}
+TIMEOUT = (5, 60)        # (연결, 읽기) 초
+RETRIES = 3
+BACKOFF = 0.5
+GZIP_MIN_BYTES = 1024    # 이보다 큰 요청 본문만 gzip
+
+_session = None
+_session_lock = threading.Lock()
+_timing_hooks = []
+_async_clients = {}  # 이벤트 루프별 httpx.AsyncClient
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+CACHE_PATH = Path(os.getenv("BLOGDEX_CACHE_PATH", str(Path(__file__).parent / ".api_cache.db")))
+CACHE_MAX_BYTES = int(os.getenv("BLOGDEX_CACHE_MAX_MB", "64")) * 1024 * 1024
+
+
+# on: TTL 안이면 캐시 / refresh: 항상 재검증 (바뀌지 않았으면 304로 본문 생략) / off: 캐시 안 씀
+_cache_env = os.getenv("BLOGDEX_CACHE", "on").lower()
+CACHE_MODE = "off" if _cache_env in ("0", "off") else "refresh" if _cache_env == "refresh" else "on"
+_cache = None
+
+
+def get_session():
+    """모든 호출이 공유하는 keep-alive 세션
+
+    GET은 연결 오류/429/5xx를 지수 백오프로 재시도 (Retry-After 존중).
+    POST는 여기서 재시도하지 않고 _request에서 idempotent=True일 때만 재시도.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=RETRIES, backoff_factor=BACKOFF,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET", "HEAD"],
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            s = requests.Session()
+            s.mount("https://", HTTPAdapter(pool_maxsize=16, max_retries=retry))
+            s.headers.update({"X-API-Key": API_KEY, "Accept-Encoding": "gzip"})
+            _session = s
+        return _session
+
+
+def add_timing_hook(fn):
+    """요청마다 fn(method, path, status, elapsed, sent_bytes, received_bytes) 호출"""
+    _timing_hooks.append(fn)
+
+
+def _print_timing(method, path, status, elapsed, sent, received):
+    print(f"[api] {method} {path} {status} {elapsed * 1000:.0f}ms "
+          f"↑{sent:,}B ↓{received:,}B", file=sys.stderr)
+
+
+if os.getenv("BLOGDEX_API_TIMING"):
+    add_timing_hook(_print_timing)
+
+
+def set_cache_mode(mode):
+    """"on" | "refresh" | "off" — 환경변수 대신 코드에서 지정 (daily_sync 등)"""
+    global CACHE_MODE
+    CACHE_MODE = mode
+
+
+CACHE_FLAGS = {"--no-cache": "off", "--refresh": "refresh"}
+
+
+def add_cache_args(parser):
+    """argparse 진입점에 --no-cache / --refresh 추가 (파싱 뒤 apply_cache_args)"""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--no-cache", dest="cache_mode", action="store_const", const="off",
+                       help="API 응답 캐시 안 씀")
+    group.add_argument("--refresh", dest="cache_mode", action="store_const", const="refresh",
+                       help="캐시 TTL 무시하고 재검증 (바뀌지 않았으면 304)")
+
+
+def apply_cache_args(args):
+    if getattr(args, "cache_mode", None):
+        set_cache_mode(args.cache_mode)
+
+
+def parse_cache_flags(argv):
+    """sys.argv를 직접 읽는 진입점용 — argv의 캐시 플래그를 적용하고 나머지 인자 목록 반환"""
+    rest = []
+    for arg in argv:
+        if arg in CACHE_FLAGS:
+            set_cache_mode(CACHE_FLAGS[arg])
+        else:
+            rest.append(arg)
+    return rest
+
+
+def _response_cache():
+    global _cache
+    if CACHE_MODE == "off":
+        return None
+    if _cache is None:
+        _cache = ResponseCache(CACHE_PATH, CACHE_MAX_BYTES)
+    return _cache
+
+
+def _cache_lookup(method, path, params, headers, revalidate=False):
+    """(cache, entry, 캐시 값) — 캐시 값이 있으면 네트워크 생략, entry만 있으면 headers에 검증자 추가
+
+    revalidate=True면 TTL 안이어도 항상 서버에 확인 (CACHE_MODE가 refresh일 때와 같음)
+    """
+    cache = _response_cache() if method == "GET" else None
+    entry = cache.lookup(path, params) if cache else None
+    if entry is not None:
+        if entry.fresh and CACHE_MODE != "refresh" and not revalidate:
+            return cache, entry, entry.value()
+        headers.update(entry.validators())
+    return cache, entry, None
+
+
+def _finish(r, method, path, params, start, body, cache, entry):
+    """응답 처리 (requests/httpx 공통) — 타이밍 훅, 304 재검증, 200 캐시 저장"""
+    # 압축 해제 전 크기 (Content-Length 없으면 해제 후 크기)
+    received = int(r.headers.get("Content-Length") or len(r.content))
+    for hook in _timing_hooks:
+        hook(method, path, r.status_code, time.monotonic() - start, len(body or b""), received)
+    if r.status_code == 304 and entry is not None:
+        cache.revalidated(entry)
+        return entry.value()
+    value = r.json()
+    if cache is not None and r.status_code == 200:
+        cache.store(path, params, r.content, r.headers)
+    return value
+
+
+def _encode(data):
+    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if len(body) >= GZIP_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+def _request(method, path, params=None, data=None, idempotent=False, revalidate=False):
+    body, headers = _encode(data) if data is not None else (None, {})
+    cache, entry, cached = _cache_lookup(method, path, params, headers, revalidate)
+    if cached is not None:
+        return cached
+    attempts = RETRIES + 1 if (idempotent and method != "GET") else 1
+    for attempt in range(attempts):
+        start = time.monotonic()
+        try:
+            r = get_session().request(method, f"{API_URL}{path}", params=params, data=body,
+                                      headers=headers, timeout=TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt + 1 >= attempts:
+                raise
+        else:
+            if r.status_code not in RETRY_STATUSES or attempt + 1 >= attempts:
+                return _finish(r, method, path, params, start, body, cache, entry)
+        time.sleep(random.uniform(0, BACKOFF * (2 ** attempt)))
+
+
+def _local(path, params, offline=False):
+    """복제본 응답 또는 replica.MISS (offline=True면 오래된 복제본도 사용)"""
+    local = replica.default()
+    if local is None:
+        return replica.MISS
+    return local.answer(path, params, max_age_hours=None if offline else replica.MAX_AGE_HOURS)
+
+
+def _read(path, params, fetch):
+    """복제본 → fetch() → 오프라인이면 오래된 복제본이라도"""
+    hit = _local(path, params)
+    if hit is not replica.MISS:
+        return hit
+    try:
+        return fetch()
+    except (requests.ConnectionError, requests.Timeout):
+        hit = _local(path, params, offline=True)
+        if hit is replica.MISS:
+            raise
+        return hit
+
+
+def get(path, params=None, fresh=False):
+    """fresh=True면 복제본/캐시 TTL을 건너뛰고 서버에서 (중복 확인처럼 최신 상태가 필요할 때)"""
+    if fresh:
+        return _request("GET", path, params=params, revalidate=True)
+    return _read(path, params, lambda: _request("GET", path, params=params))
+
+
+def iter_rows(path, params=None, cursor="after_id", limit=1000, fresh=False):
+    """커서 페이지네이션 목록을 끝까지 한 행씩 — 메모리에는 한 페이지(limit행)만
+
+    응답: {"results" 또는 "data": [...], "next": 다음 커서 값 또는 null}
+    cursor: 커서 파라미터 이름 (/titles/filter는 최신순이라 before_id)
+    """
+    params = dict(params or {})
+    value = 0
+    while value is not None:
+        page = get(path, {**params, cursor: value, "limit": limit}, fresh=fresh)
+        yield from page.get("results", page.get("data", []))
+        value = page.get("next")
+
+
+def iter_posts(q="", blog_id=None, limit=1000, fresh=False):
+    """내 포스트 전체 (LIMIT 10000에 잘리지 않음)"""
+    params = {"q": q, **({"blog_id": blog_id} if blog_id else {})}
+    return iter_rows("/posts/search", params, limit=limit, fresh=fresh)
+
+
+def iter_titles(q="", limit=1000):
+    """수집 타이틀 전체 (/titles/search의 50개 제한 없이, published_in 매칭은 없음)"""
+    return iter_rows("/titles/search", {"q": q}, limit=limit)
+
+
+def search_posts(hits=(), counts=(), totals=False, blog_id=None, limit=None, blogs=False,
+                 related=None, similar=(), titles=5):
+    """여러 패턴 검색을 요청 한 번에 (/posts/search/batch)
+
+    hits: 패턴별 글 목록 / counts: 패턴별 {blog_id: 글 수} / totals: 블로그별 전체 글 수 / blogs: 블로그 목록
+    related: rank_posts(related)와 같은 관련 글을 블로그별로 집계 (글 목록은 받지 않음) —
+        글 수, similar 단어가 제목에 모두 들어간 글 수, 순위 상위 titles개 제목
+    → {"hits": {패턴: [글]}, "counts": {패턴: {blog_id: n}}, "totals": {blog_id: n}, "blogs": [...],
+       "related": {"total": n, "counts": {blog_id: n}, "similar": {blog_id: n}, "titles": {blog_id: [제목]}}}
+    """
+    body = {"hits": list(hits), "counts": list(counts), "totals": totals}
+    if blog_id:
+        body["blog_id"] = blog_id
+    if limit:
+        body["limit"] = limit
+    if blogs:
+        body["blogs"] = True
+    if related:
+        try:
+            from kiwi_tokens import query_tokens
+            tokens = " ".join(query_tokens(related))
+        except ImportError:
+            print("[api] kiwipiepy 없음 → 관련 글은 LIKE 검색으로 대체", file=sys.stderr)
+            tokens = ""
+        body["related"] = {"q": related, "tokens": tokens, "words": list(similar), "titles": titles}
+    res = _read("/posts/search/batch", body,
+                lambda: _request("POST", "/posts/search/batch", data=body, idempotent=True))
+    # JSON 객체 키는 문자열 → blog_id 정수로
+    res["counts"] = {q: {int(k): v for k, v in c.items()} for q, c in res.get("counts", {}).items()}
+    if "totals" in res:
+        res["totals"] = {int(k): v for k, v in res["totals"].items()}
+    if "related" in res:
+        rel = res["related"]
+        for key in ("counts", "similar", "titles"):
+            rel[key] = {int(k): v for k, v in rel.get(key, {}).items()}
+    return res
+
+
+def rank_posts(text, mode="all", blog_id=None, limit=50):
+    """순위 검색 (/posts/fts) — text를 Kiwi 토큰으로 나눠 띄어쓰기와 상관없이 매칭, score 높은 순
+
+    mode="all"은 모든 명사가 들어간 글, "any"는 하나라도 들어간 글 (관련 글 후보용)
+    kiwipiepy가 없으면 기존 LIKE 검색(/posts/search, 순위 없음)으로 대체
+    """
+    params = {"q": text, **({"blog_id": blog_id} if blog_id else {})}
+    try:
+        from kiwi_tokens import query_tokens
+        tokens = query_tokens(text)
+    except ImportError:
+        print("[api] kiwipiepy 없음 → /posts/search LIKE 검색으로 대체", file=sys.stderr)
+        return get("/posts/search", params).get("results", [])[:limit]
+    return get("/posts/fts", {**params, "tokens": " ".join(tokens), "mode": mode, "limit": limit}).get("results", [])
+
+
+def post(path, data, idempotent=False):
+    """idempotent=True면 연결 오류/429/5xx에서 재시도 (같은 요청을 두 번 보내도 결과가 같을 때만)"""
+    return _request("POST", path, data=data, idempotent=idempotent)
+
+
+# === 비동기 (여러 건 동시 조회용) ===
+
+def _async_client():
+    """현재 이벤트 루프 전용 keep-alive 클라이언트 (run()이 끝날 때 닫음)"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            headers={"X-API-Key": API_KEY, "Accept-Encoding": "gzip"},
+            timeout=httpx.Timeout(TIMEOUT[1], connect=TIMEOUT[0]),
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=16),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def _arequest(method, path, params=None, data=None, idempotent=False):
+    body, headers = _encode(data) if data is not None else (None, {})
+    cache, entry, cached = _cache_lookup(method, path, params, headers)
+    if cached is not None:
+        return cached
+    attempts = RETRIES + 1 if (idempotent or method == "GET") else 1
+    for attempt in range(attempts):
+        start = time.monotonic()
+        try:
+            r = await _async_client().request(method, f"{API_URL}{path}", params=params,
+                                              content=body, headers=headers)
+        except (httpx.ConnectError, httpx.TimeoutException, httpx.RemoteProtocolError):
+            if attempt + 1 >= attempts:
+                raise
+        else:
+            if r.status_code not in RETRY_STATUSES or attempt + 1 >= attempts:
+                return _finish(r, method, path, params, start, body, cache, entry)
+            retry_after = r.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                await asyncio.sleep(int(retry_after))
+                continue
+        await asyncio.sleep(random.uniform(0, BACKOFF * (2 ** attempt)))
+
+
+async def aget(path, params=None):
+    hit = _local(path, params)
+    if hit is not replica.MISS:
+        return hit
+    try:
+        return await _arequest("GET", path, params=params)
+    except (httpx.ConnectError, httpx.TimeoutException):
+        hit = _local(path, params, offline=True)
+        if hit is replica.MISS:
+            raise
+        return hit
+
+
+async def apost(path, data, idempotent=False):
+    return await _arequest("POST", path, data=data, idempotent=idempotent)
+
+
+async def gather(*aws, limit=8):
+    """코루틴들을 동시에 최대 limit개씩 실행 → 입력 순서대로 결과 (하나라도 실패하면 예외)"""
+    sem = asyncio.Semaphore(limit)
+
+    async def bounded(aw):
+        async with sem:
+            return await aw
+
+    return await asyncio.gather(*(bounded(aw) for aw in aws))
+
 
-def get(path, params=None):
-    r = requests.get(f"{API_URL}{path}", headers=HEADERS, params=params)
-    return r.json()
+def run(coro):
+    """동기 코드에서 비동기 호출 실행 — 끝나면 이 루프의 클라이언트를 닫음"""
+    async def main():
+        try:
+            return await coro
+        finally:
+            client = _async_clients.pop(asyncio.get_running_loop(), None)
+            if client is not None:
+                await client.aclose()
 
-def post(path, data):
-    r = requests.post(f"{API_URL}{path}", headers=HEADERS, json=data)
-    return r.json()
+    return asyncio.run(main())
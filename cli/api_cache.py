@@ -0,0 +1,144 @@
+"""api.get 응답 디스크 캐시 - 엔드포인트별 TTL + ETag/Last-Modified 재검증 + 크기 제한 LRU
+
+    cache = ResponseCache(path)
+    entry = cache.lookup("/blogs", None)
+    if entry and entry.fresh: ...                 # 네트워크 생략
+    headers = entry.validators() if entry else {} # TTL 지난 항목은 조건부 요청 → 304면 cache.revalidated
+
+TTL이 없는(0) 엔드포인트는 캐시하지 않음 — 쓰기 직후 바로 읽어야 하는 /sync/status 등.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+# 경로 접두어 → TTL(초). 가장 긴 접두어가 적용
+TTLS = {
+    "/blogs": 3600,
+    "/posts/search": 300,
+    "/posts/fts": 300,
+    "/titles/search": 600,
+    "/titles/stats": 600,
+    "/titles/sources": 3600,
+    "/gsc/": 3600,
+    "/bing/": 3600,
+    "/analysis/": 1800,
+    "/coupang/": 1800,
+    "/exposure/status": 600,
+}
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def ttl_for(path):
+    best = ""
+    for prefix in TTLS:
+        if path.startswith(prefix) and len(prefix) > len(best):
+            best = prefix
+    return TTLS.get(best, 0)
+
+
+def cache_key(path, params):
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    return hashlib.sha1(json.dumps([path, items], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class Entry:
+    def __init__(self, key, body, etag, last_modified, fetched_at, ttl):
+        self.key = key
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.ttl = ttl
+
+    @property
+    def fresh(self):
+        return time.time() - self.fetched_at < self.ttl
+
+    def value(self):
+        return json.loads(zlib.decompress(self.body))
+
+    def validators(self):
+        """조건부 요청 헤더 (검증자가 없으면 빈 dict → 일반 요청)"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+    @property
+    def db(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, path TEXT, body BLOB,"
+                " etag TEXT, last_modified TEXT, fetched_at REAL, used_at REAL, size INTEGER)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_used ON responses(used_at)")
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, path, params):
+        """캐시 대상이면 Entry (없으면 None), TTL 0인 경로도 None"""
+        ttl = ttl_for(path)
+        if not ttl:
+            return None
+        key = cache_key(path, params)
+        row = self.db.execute(
+            "SELECT body, etag, last_modified, fetched_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        with self.db:
+            self.db.execute("UPDATE responses SET used_at = ? WHERE key = ?", (time.time(), key))
+        return Entry(key, row[0], row[1], row[2], row[3], ttl)
+
+    def store(self, path, params, content, headers):
+        """200 응답 본문(bytes) 저장 — 캐시 대상이 아니면 무시"""
+        if not ttl_for(path):
+            return
+        body = zlib.compress(content, 1)
+        now = time.time()
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (cache_key(path, params), path, body, headers.get("ETag"), headers.get("Last-Modified"),
+                 now, now, len(body)),
+            )
+        self._evict()
+
+    def revalidated(self, entry):
+        """304 — 본문은 그대로, TTL만 새로 시작"""
+        entry.fetched_at = time.time()
+        with self.db:
+            self.db.execute("UPDATE responses SET fetched_at = ? WHERE key = ?", (entry.fetched_at, entry.key))
+
+    def _evict(self):
+        """총 크기가 max_bytes를 넘으면 가장 오래 안 쓴 항목부터 삭제"""
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        with self.db:
+            for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY used_at").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+
+    def clear(self):
+        with self.db:
+            self.db.execute("DELETE FROM responses")
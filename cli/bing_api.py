@@ -0,0 +1,74 @@
+"""Bing Webmaster API 클라이언트 - keep-alive 세션 풀 + 계정별 속도 제한 + 재시도"""
+import re
+import threading
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from concurrency import RateLimiter
+
+BING_API = "https://ssl.bing.com/webmaster/api.svc/json"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session(pool_size=16):
+    """모든 계정이 공유하는 keep-alive 세션 (429/5xx는 지수 백오프로 재시도)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=3, backoff_factor=1.0,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET"],
+                respect_retry_after_header=True,
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+            s = requests.Session()
+            s.mount("https://", adapter)
+            _session = s
+        return _session
+
+
+def parse_bing_date(value):
+    """'/Date(1700000000000-0800)/' → 'YYYY-MM-DD'"""
+    ts = int(re.search(r"\d+", value).group()) / 1000
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+
+
+class BingAccount:
+    """API 키 하나(계정)에 대한 호출 — 계정별 RateLimiter 적용"""
+
+    def __init__(self, account, api_key, qps=2.0, timeout=15):
+        self.account = account
+        self.api_key = api_key
+        self.limiter = RateLimiter(qps)
+        self.timeout = timeout
+        self.calls = 0
+        self.method_calls = {}  # API 메서드별 호출 수
+        self._lock = threading.Lock()  # 카운터는 BING_WORKERS 스레드가 같이 갱신
+
+    def _get(self, method, **params):
+        with self._lock:
+            self.calls += 1
+            self.method_calls[method] = self.method_calls.get(method, 0) + 1
+        with self.limiter:
+            r = get_session().get(
+                f"{BING_API}/{method}",
+                params={**params, "apikey": self.api_key},
+                timeout=self.timeout,
+            )
+        r.raise_for_status()
+        return r.json().get("d", []) or []
+
+    def user_sites(self):
+        return self._get("GetUserSites")
+
+    def traffic_stats(self, site_url):
+        return self._get("GetRankAndTrafficStats", siteUrl=site_url)
+
+    def query_stats(self, site_url):
+        return self._get("GetQueryStats", siteUrl=site_url)
@@ -1,5 +1,5 @@
 import sys
-from api import get
+from api import rank_posts, parse_cache_flags
 from rich.console import Console
 from rich.table import Table
 from rich import box
@@ -12,12 +12,8 @@ def run():
         return
 
     keyword = sys.argv[1]
-    response = get("/posts/search", params={"q": keyword})
-
-    if isinstance(response, dict):
-        results = response.get("results", [])
-    else:
-        results = response
+    # 순위 검색: '전기차보조금'과 '전기차 보조금'을 같은 명사로 매칭, 관련도 높은 순
+    results = rank_posts(keyword, limit=500)
 
     if not results:
         console.print(f"\n[bold green]'{keyword}' — 쓴 적 없음! 새로운 주제입니다.[/]")
@@ -41,4 +37,5 @@ def run():
     console.print(f"\n[bold yellow]⚠ '{keyword}' 관련 글이 {len(results)}건 있습니다[/]")
 
 if __name__ == "__main__":
+    sys.argv[1:] = parse_cache_flags(sys.argv[1:])
     run()
@@ -0,0 +1,237 @@
+"""동기화 체크포인트 - (source, site, date) 단위로 수집/업로드 진행 상황 저장
+
+재실행 시:
+- 수집이 끝나지 않았거나 실패한 단위만 다시 수집
+- D1 업로드가 확인(ack)되지 않은 행만 다시 업로드
+- merge()로 완료된 단위를 모아 그날 스냅샷/요약 생성
+
+파일 구조: <root>/<source>/<date>/<site>.json  (단위 하나당 파일 하나)
+          <root>/<source>/<date>/<site>.<endpoint>.jsonl  (행을 이터레이터로 저장한 경우, 한 줄 = 행 하나)
+"""
+import json
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+
+def _safe_name(s):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", str(s))
+
+
+@contextmanager
+def atomic_writer(path, mode=None):
+    """임시 파일에 쓴 뒤 rename — 중간에 죽어도 반쯤 쓰인 파일이 남지 않음
+
+    mode: 최종 파일 권한 (mkstemp 기본은 0600 — 다른 사용자가 읽어야 하면 0o644 등)
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            yield f
+        if mode is not None:
+            os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def write_json_atomic(path, data, indent=None):
+    with atomic_writer(path) as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+
+
+class CheckpointStore:
+    """source/date 하나에 대한 사이트별 체크포인트
+
+    단위 파일 내용:
+        {"source", "site", "date", "status": "ok"|"error", "error",
+         "data": {...}, "rows": {endpoint: [행...] 또는 {"file", "count"}}, "acked": [endpoint...],
+         "updated_at"}
+    """
+
+    def __init__(self, root, source, date):
+        self.source = source
+        self.date = date
+        self.dir = Path(root) / _safe_name(source) / _safe_name(date)
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, site):
+        return self.dir / f"{_safe_name(site)}.json"
+
+    def get(self, site):
+        path = self._path(site)
+        if not path.exists():
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def iter_units(self):
+        """단위 파일을 하나씩 읽어 yield (전체를 메모리에 올리지 않음)"""
+        for path in sorted(self.dir.glob("*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    yield json.load(f)
+            except (OSError, ValueError):
+                continue
+
+    def units(self):
+        return list(self.iter_units())
+
+    def is_done(self, site):
+        unit = self.get(site)
+        return bool(unit) and unit.get("status") == "ok"
+
+    def _write(self, unit):
+        unit["updated_at"] = datetime.now().isoformat()
+        write_json_atomic(self._path(unit["site"]), unit)
+
+    def _rows_path(self, site, endpoint):
+        return self.dir / f"{_safe_name(site)}.{_safe_name(endpoint)}.jsonl"
+
+    def _write_rows(self, site, endpoint, rows):
+        """이터레이터 행을 읽는 대로 NDJSON 파일로 → {"file", "count"} (메모리에는 한 행씩만)"""
+        path = self._rows_path(site, endpoint)
+        count = 0
+        with atomic_writer(path) as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                count += 1
+        return {"file": path.name, "count": count}
+
+    def _read_rows(self, ref):
+        with open(self.dir / ref["file"], encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def save(self, site, data, rows=None, status="ok", error=None):
+        """수집 결과 저장 (이전 ack는 초기화 — 새로 수집한 행은 다시 업로드)
+
+        rows의 값이 list가 아니면(제너레이터 등) 행 파일로 흘려 쓰고 단위 파일은 그 뒤에 씀 —
+        data는 행을 다 읽은 뒤에 기록되므로 행을 세면서 채우는 dict를 넘겨도 됨
+        """
+        rows = {endpoint: r if isinstance(r, list) else self._write_rows(site, endpoint, r)
+                for endpoint, r in (rows or {}).items()}
+        unit = {
+            "source": self.source, "site": site, "date": self.date,
+            "status": status, "data": data, "rows": rows, "acked": [],
+        }
+        if error:
+            unit["error"] = str(error)
+        self._write(unit)
+
+    def fail(self, site, error):
+        """수집 실패 기록 — 이전에 성공한 데이터가 있으면 보존"""
+        unit = self.get(site)
+        if unit and unit.get("status") == "ok":
+            return
+        self.save(site, {}, status="error", error=error)
+
+    def iter_pending(self, endpoint):
+        """endpoint로 아직 업로드 확인되지 않은 (site, rows)를 단위별로 yield (행 파일은 한 줄씩 읽는 이터레이터)"""
+        for unit in self.iter_units():
+            rows = unit.get("rows", {}).get(endpoint)
+            if _row_count(rows) and endpoint not in unit.get("acked", []):
+                yield unit["site"], self._read_rows(rows) if isinstance(rows, dict) else rows
+
+    def pending(self, endpoint):
+        return list(self.iter_pending(endpoint))
+
+    def ack(self, site, endpoint):
+        unit = self.get(site)
+        if not unit:
+            return
+        if endpoint not in unit.get("acked", []):
+            unit.setdefault("acked", []).append(endpoint)
+            self._write(unit)
+
+    def is_settled(self):
+        """모든 단위가 수집 성공 + 업로드 확인 완료 (단위가 없으면 True)
+
+        행이 없는 엔드포인트는 보낼 것이 없으므로 ack 대상이 아님 (iter_pending도 건너뜀)
+        """
+        for unit in self.iter_units():
+            if unit.get("status") != "ok":
+                return False
+            rows = unit.get("rows", {})
+            if {endpoint for endpoint, r in rows.items() if _row_count(r)} - set(unit.get("acked", [])):
+                return False
+        return True
+
+    def merge(self, order=None):
+        """단위별 결과 합치기 → {site: data 또는 {"error": ...}}
+
+        order가 있으면 그 순서대로 (없는 단위는 제외)
+        """
+        units = {u["site"]: u for u in self.units()}
+        sites = order if order is not None else sorted(units)
+        merged = {}
+        for site in sites:
+            unit = units.get(site)
+            if not unit:
+                continue
+            if unit.get("status") == "ok":
+                merged[site] = unit.get("data", {})
+            else:
+                merged[site] = {"error": unit.get("error", "unknown")}
+        return merged
+
+
+def _row_count(rows):
+    """단위 파일의 rows 값(list 또는 행 파일 {"file", "count"}) → 행 수"""
+    if isinstance(rows, dict):
+        return rows.get("count", 0)
+    return len(rows or [])
+
+
+def upload_pending(store, endpoint, payload_key, uploader, max_rows=None, stage=None, bulk=None):
+    """체크포인트에서 미확인 행만 업로드(uploader.Uploader) 후 성공한 단위 ack
+
+    단위 파일을 하나씩 읽으며 스트리밍 업로드 (모든 단위의 행을 한 목록으로 합치지 않음).
+    한 단위의 행이 여러 배치에 걸치면 모든 배치가 성공하거나 spool replay 대상으로 넘어가야 ack —
+    spool에 넘긴 행은 spool이 재전송하므로 체크포인트에 남겨 두면 다음 실행에서 두 번 보내게 됨.
+    spool에 못 넣었거나 재시도 불가(rejected)인 배치의 단위는 ack하지 않음 (체크포인트가 재전송 주체).
+    INGEST_KEYS 엔드포인트는 uploader.bulk_stream (bulk=None이면 BULK_INGEST 설정을 따름)
+    반환: (업로드 성공 행 수, 실패한 단위 목록 — spool로 넘어간 단위 포함)
+    """
+    from uploader import INGEST_KEYS  # 체크포인트 저장소만 쓰는 곳(metrics 등)은 requests 없이 import
+
+    owners = []
+
+    def items():
+        for site, unit_rows in store.iter_pending(endpoint):
+            owners.append(site)
+            for r in unit_rows:
+                yield site, r
+
+    if endpoint in INGEST_KEYS:
+        result = uploader.bulk_stream(endpoint, items(), stage or store.source, max_rows, bulk)
+    else:
+        result = uploader.upload_stream(endpoint, items(), payload_key, stage=stage or store.source, max_rows=max_rows)
+    for site in owners:
+        if site not in result.lost_tags:
+            store.ack(site, endpoint)
+    return result.sent, sorted(result.failed_tags)
+
+
+def prune(root, keep_days=14):
+    """keep_days보다 오래된 날짜 디렉토리 삭제 (날짜 형식 YYYY-MM-DD로 시작하는 것만)"""
+    cutoff = (datetime.now() - timedelta(days=keep_days)).strftime("%Y-%m-%d")
+    root = Path(root)
+    if not root.exists():
+        return
+    for source_dir in root.iterdir():
+        if not source_dir.is_dir():
+            continue
+        for date_dir in source_dir.iterdir():
+            if date_dir.is_dir() and re.match(r"\d{4}-\d{2}-\d{2}", date_dir.name) and date_dir.name[:10] < cutoff:
+                shutil.rmtree(date_dir, ignore_errors=True)
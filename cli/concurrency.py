@@ -0,0 +1,68 @@
+"""동시성 유틸리티 - 제한된 병렬 실행 + API별 속도 제한"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RateLimiter:
+    """초당 호출 수 제한 (토큰 버킷, 스레드 안전)
+
+    rate <= 0 이면 제한 없음. with 문으로도 사용 가능:
+        limiter = RateLimiter(5)
+        with limiter:
+            call_api()
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def run_parallel(fn, items, workers=4):
+    """items 각각에 fn을 최대 workers개 동시 실행
+
+    입력 순서대로 (item, result, error) 리스트 반환.
+    한 항목의 예외는 error에 담기고 나머지 항목 실행을 막지 않음.
+    """
+    items = list(items)
+    results = []
+    if workers <= 1 or len(items) <= 1:
+        for item in items:
+            try:
+                results.append((item, fn(item), None))
+            except Exception as e:
+                results.append((item, None, e))
+        return results
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as ex:
+        futures = [ex.submit(fn, item) for item in items]
+        for item, fut in zip(items, futures):
+            try:
+                results.append((item, fut.result(), None))
+            except Exception as e:
+                results.append((item, None, e))
+    return results
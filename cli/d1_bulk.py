@@ -0,0 +1,133 @@
+"""D1 벌크 쓰기 - 여러 행을 한 번의 INSERT로 저장
+
+1순위: Cloudflare D1 HTTP API (파라미터 바인딩, 한 요청에 다중 VALUES)
+       CLOUDFLARE_ACCOUNT_ID / CLOUDFLARE_API_TOKEN + database_id 필요
+2순위: wrangler d1 execute --file 1회 (다중 VALUES 문을 청크별로 한 파일에) + 전후 행 수 --command 2회
+
+HTTP API는 INSERT ... RETURNING <key>로 실제 들어간 행을 받아 행별 신규/중복(무시) 여부를 돌려줌.
+wrangler --file(--remote)은 D1 가져오기 API를 타서 문장별 결과(RETURNING 행)를 돌려주지 않으므로
+전후 COUNT(*) 차이로 신규 수만 계산 (같은 테이블에 동시에 쓰는 다른 작업이 없다는 가정).
+"""
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+import requests
+
+D1_API = "https://api.cloudflare.com/client/v4/accounts/{account}/d1/database/{db}/query"
+D1_MAX_PARAMS = 100  # D1 쿼리당 바인딩 파라미터 한도
+
+_session = requests.Session()
+
+
+def _chunks(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _sql_literal(v):
+    if v is None:
+        return "NULL"
+    if isinstance(v, bool):
+        return "1" if v else "0"
+    if isinstance(v, (int, float)):
+        return repr(v)
+    return "'" + str(v).replace("'", "''") + "'"
+
+
+def _insert_sql(table, columns, n_rows, key, conflict, values=None):
+    cols = ", ".join(columns)
+    if values is None:
+        row_sql = "(" + ", ".join("?" for _ in columns) + ")"
+        tuples = ", ".join(row_sql for _ in range(n_rows))
+    else:
+        tuples = ", ".join("(" + ", ".join(_sql_literal(v) for v in row) + ")" for row in values)
+    returning = f" RETURNING {key}" if key else ""
+    return f"INSERT OR {conflict} INTO {table} ({cols}) VALUES {tuples}{returning}"
+
+
+def _via_http(table, columns, rows, key, conflict, account_id, api_token, database_id):
+    url = D1_API.format(account=account_id, db=database_id)
+    headers = {"Authorization": f"Bearer {api_token}", "Content-Type": "application/json"}
+    per_stmt = max(1, D1_MAX_PARAMS // len(columns))
+    returned = []
+    for chunk in _chunks(rows, per_stmt):
+        params = [v for row in chunk for v in row]
+        r = _session.post(url, headers=headers, timeout=30, json={
+            "sql": _insert_sql(table, columns, len(chunk), key, conflict),
+            "params": params,
+        })
+        data = r.json()
+        if not data.get("success"):
+            raise RuntimeError(f"D1 API 오류: {data.get('errors')}")
+        for res in data.get("result", []):
+            returned.extend(row.get(key) for row in res.get("results", []))
+    return returned
+
+
+def _wrangler(database, args, cwd, timeout=120):
+    env = os.environ.copy()
+    env["PATH"] = "/opt/homebrew/bin:/usr/local/bin:/usr/bin:/bin:" + env.get("PATH", "")
+    r = subprocess.run(
+        ["npx", "wrangler", "d1", "execute", database, "--remote", "--json", *args],
+        capture_output=True, text=True, cwd=cwd, env=env, timeout=timeout,
+    )
+    if r.returncode != 0:
+        raise RuntimeError(f"wrangler 실패: {(r.stderr or r.stdout)[:300]}")
+    return r.stdout
+
+
+def _count(database, table, cwd):
+    # --command는 문장별 결과를 돌려줌 (--file과 달리)
+    out = json.loads(_wrangler(database, ["--command", f"SELECT COUNT(*) AS n FROM {table}"], cwd, timeout=60))
+    return out[0]["results"][0]["n"]
+
+
+def _via_wrangler(database, table, columns, rows, conflict, cwd):
+    """→ 새로 들어간 행 수 (전후 COUNT(*) 차이)"""
+    # _via_http와 같은 크기로 나눠 문장 여러 개를 한 파일에 (문장 하나가 D1 SQL 길이 한도를 넘지 않게)
+    per_stmt = max(1, D1_MAX_PARAMS // len(columns))
+    sql = "".join(_insert_sql(table, columns, len(chunk), None, conflict, values=chunk) + ";\n"
+                  for chunk in _chunks(rows, per_stmt))
+    before = _count(database, table, cwd)
+    with tempfile.NamedTemporaryFile("w", suffix=".sql", delete=False, encoding="utf-8") as f:
+        f.write(sql)
+        sql_file = f.name
+    try:
+        _wrangler(database, ["--file", sql_file], cwd)
+    finally:
+        os.unlink(sql_file)
+    return _count(database, table, cwd) - before
+
+
+def insert_rows(database, table, columns, rows, key, conflict="IGNORE",
+                database_id=None, wrangler_cwd=None):
+    """rows(dict 목록)를 한 번의 벌크 INSERT로 저장
+
+    key: RETURNING으로 받아 신규 행을 식별할 컬럼 (rows 안에서 유일해야 함)
+    반환: {"inserted", "ignored", "rows": [(row, "inserted"|"ignored")], "via", "elapsed"}
+          wrangler 경로는 행별 결과를 알 수 없어 "rows"가 None (inserted/ignored는 전후 행 수 차이)
+    """
+    start = time.monotonic()
+    if not rows:
+        return {"inserted": 0, "ignored": 0, "rows": [], "via": None, "elapsed": 0.0}
+
+    values = [[r.get(c) for c in columns] for r in rows]
+    account_id = os.getenv("CLOUDFLARE_ACCOUNT_ID")
+    api_token = os.getenv("CLOUDFLARE_API_TOKEN")
+    if not (account_id and api_token and database_id):
+        inserted = _via_wrangler(database, table, columns, values, conflict, wrangler_cwd)
+        return {
+            "inserted": inserted, "ignored": len(rows) - inserted, "rows": None,
+            "via": "wrangler", "elapsed": time.monotonic() - start,
+        }
+
+    inserted_keys = set(_via_http(table, columns, values, key, conflict, account_id, api_token, database_id))
+    per_row = [(r, "inserted" if r.get(key) in inserted_keys else "ignored") for r in rows]
+    inserted = sum(1 for _, st in per_row if st == "inserted")
+    return {
+        "inserted": inserted, "ignored": len(rows) - inserted, "rows": per_row,
+        "via": "d1-api", "elapsed": time.monotonic() - start,
+    }
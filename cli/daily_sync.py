@@ -9,6 +9,9 @@ import re
 import json
 import requests
 import logging
+import importlib
+import time
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 # stdout/stderr 안전 처리 (대시보드 원격 실행 시 fd 없을 수 있음)
@@ -43,9 +46,21 @@ if os.path.exists(_env_sh):
                 _k, _v = _line.split("=", 1)
                 os.environ.setdefault(_k.strip(), _v.strip().strip('"').strip("'"))
 
-from config import API_URL, API_KEY
+import api
 from google_auth import get_credentials
 from googleapiclient.discovery import build
+from concurrency import RateLimiter, run_parallel
+from gsc_collect import HostRouter, SiteAggregate, iter_gsc_pages
+from stages import Stage, run_stages
+import d1_bulk
+from bing_api import BingAccount, parse_bing_date
+from uploader import Uploader, BULK_INGEST, INGEST_MAX_BYTES, INGEST_MAX_ROWS
+from spool import Spool
+from rollup import ExposureRollup
+from metrics import Metrics
+import replica
+from schedule import Cadence, SyncSchedule, parse_cadence_env
+from checkpoint import CheckpointStore, upload_pending, atomic_writer, write_json_atomic, prune as prune_checkpoints
 
 # 로깅 설정
 LOG_DIR = PROJECT_DIR / "logs"
@@ -61,9 +76,27 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 
 # API 설정
-HEADERS = {"X-API-Key": API_KEY, "Content-Type": "application/json"}
 SNAPSHOT_DIR = PROJECT_DIR / "snapshots"
 SNAPSHOT_DIR.mkdir(exist_ok=True)
+CHECKPOINT_DIR = SNAPSHOT_DIR / "checkpoints"  # (source, site, date) 단위 진행 상황
+EXPOSURE_ROLLUP_FILE = SNAPSHOT_DIR / "exposure_rollup.json"  # 사이트별 일일 노출/클릭 (최근 28일)
+
+# 실행 메트릭 (JSON-lines 누적 + Prometheus textfile 교체)
+METRICS = Metrics()
+METRICS_JSONL = LOG_DIR / "metrics.jsonl"
+METRICS_TEXTFILE = Path(os.getenv("METRICS_TEXTFILE", str(LOG_DIR / "daily_sync.prom")))
+
+# aikorea24 (노인복지 뉴스 D1)
+AIKOREA24_DIR = "/Users/twinssn/Projects/aikorea24"
+AIKOREA24_DB_ID = os.getenv("AIKOREA24_DB_ID")  # 있으면 D1 HTTP API로 저장 (CLOUDFLARE_* 필요)
+
+# D1 업로드 엔진 (모든 스테이지 공유) — 재시도 끝에 실패한 배치는 spool에 보관 후 다음 실행에서 재전송
+SPOOL = Spool(SNAPSHOT_DIR / "spool")
+UPLOADER = Uploader(
+    max_in_flight=int(os.getenv("UPLOAD_IN_FLIGHT", "4")),
+    max_batch_bytes=int(os.getenv("UPLOAD_BATCH_BYTES", str(256 * 1024))),
+    spool=SPOOL,
+)
 
 # 텔레그램 설정
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -160,6 +193,49 @@ SITES = [
     "https://watersports.techpawz.com/",
 ]
 
+# 스테이지 동시 실행 수 (GSC/GA4/Bing/포스트 동기화 등)
+SYNC_WORKERS = int(os.getenv("SYNC_WORKERS", "4"))
+
+# GSC 병렬 수집 (API 한도: 사이트당 1,200 QPM)
+GSC_WORKERS = int(os.getenv("GSC_WORKERS", "4"))  # 동시 조회 속성 수
+GSC_QPS = float(os.getenv("GSC_QPS", "5"))        # 초당 최대 호출 수
+GSC_PAGE_SIZE = int(os.getenv("GSC_PAGE_SIZE", "25000"))   # startRow 페이지 크기 (API 최대 25000)
+GSC_TOP_KEYWORDS = int(os.getenv("GSC_TOP_KEYWORDS", "100"))  # 사이트당 보관할 키워드 행 수
+GSC_REFETCH_DAYS = int(os.getenv("GSC_REFETCH_DAYS", "7"))     # 스냅샷 날짜 이전 며칠을 다시 조회해 바뀐 행만 업로드 (0이면 끔)
+GA4_PAGE_SIZE = int(os.getenv("GA4_PAGE_SIZE", "10000"))        # runReport 1회 행 수 (offset으로 끝까지)
+NAVER_QPS = float(os.getenv("NAVER_QPS", "8"))                 # 네이버 검색 API 초당 최대 호출 수
+SENIOR_PAGES = int(os.getenv("SENIOR_PAGES", "2"))             # 쿼리당 페이지 수 (페이지당 100건)
+SENIOR_SEEN_DAYS = int(os.getenv("SENIOR_SEEN_DAYS", "30"))    # 저장한 뉴스 링크 기억 기간
+SENIOR_SEEN_FILE = SNAPSHOT_DIR / "senior_seen_links.json"
+SENIOR_QUERIES = [
+    "AI 노인 돌봄 서비스", "AI 시니어 디지털 교육", "AI 치매 예방 기술",
+    "AI 고령자 복지 정책", "AI 요양 로봇 서비스", "노인 디지털 격차 해소",
+    "독거노인 돌봄 정책", "기초연금 인상 변경", "노인 일자리 지원사업",
+    "요양보호사 처우 개선",
+]
+
+# 소스별 수집 주기 — (최소 간격 시간, 데이터 허용 지연 일수). "bing:사이트명"으로 사이트별 규칙 가능
+# SYNC_CADENCE 환경변수로 덮어쓰기: "bing=72,ga4=12:2,bing:example.com=168"
+SYNC_CADENCE = {
+    "gsc": Cadence(20, stale_days=4),
+    "ga4": Cadence(20, stale_days=2),
+    "bing": Cadence(20),
+    "senior": Cadence(20),
+    "sync_hugo": Cadence(20),
+    "sync_astro": Cadence(20),
+    "sync_wordpress": Cadence(20),
+    "sync_blogger": Cadence(20),
+    **parse_cadence_env(os.getenv("SYNC_CADENCE")),
+}
+
+# API별 일일 호출 한도 (--plan의 쿼터 비율 계산용, GA4는 속성당)
+API_DAILY_QUOTAS = {
+    "gsc": int(os.getenv("GSC_DAILY_QUOTA", "30000000")),
+    "ga4": int(os.getenv("GA4_DAILY_QUOTA", "20000")),
+    "bing": int(os.getenv("BING_DAILY_QUOTA", "10000")),
+    "naver": int(os.getenv("NAVER_DAILY_QUOTA", "25000")),
+}
+
 # 도메인 속성: 서브도메인 데이터를 한번에 조회 (403 우회)
 DOMAIN_PROPERTIES = {
     "sc-domain:techpawz.com": [
@@ -292,21 +368,26 @@ for suffix in ["", "_2", "_3"]:
     if key and "여기" not in key:
         BING_KEYS.append({"account": account or f"account{suffix}", "api_key": key})
 
+BING_WORKERS = int(os.getenv("BING_WORKERS", "4"))          # 계정당 동시 수집 사이트 수
+BING_QPS = float(os.getenv("BING_QPS", "2"))                # 계정당 초당 최대 호출 수
+BING_LOOKBACK_DAYS = int(os.getenv("BING_LOOKBACK_DAYS", "7"))  # 워터마크 없는 사이트의 첫 수집 범위
+BING_OVERLAP_DAYS = int(os.getenv("BING_OVERLAP_DAYS", "1"))    # 늦게 반영되는 수치 재업로드 범위
+BING_WATERMARK_FILE = SNAPSHOT_DIR / "bing_watermarks.json"    # 사이트별 마지막 업로드 날짜
+
 
 def api_post(path, data):
     try:
-        r = requests.post(f"{API_URL}{path}", headers=HEADERS, json=data, timeout=30)
-        return r.json()
+        return api.post(path, data)
     except Exception as e:
-        log.error(f"API POST {path} 실패: {e}")
+        log.error(f"API POST {path} 실패 (spool 보관): {e}")
+        SPOOL.put_payload(path, data, str(e))
         return {"error": str(e)}
 
 
 
 def api_get(path, params=None):
     try:
-        r = requests.get(f"{API_URL}{path}", headers=HEADERS, params=params, timeout=30)
-        return r.json()
+        return api.get(path, params)
     except Exception as e:
         log.error(f"API GET {path} 실패: {e}")
         return {"error": str(e)}
@@ -325,14 +406,23 @@ def send_telegram(message):
         log.error(f"텔레그램 전송 실패: {e}")
 
 
+def _load_senior_seen():
+    """지난 실행에서 저장한 뉴스 링크(정규화) → 처음 본 날짜"""
+    try:
+        with open(SENIOR_SEEN_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
 def sync_senior():
-    """노인복지 뉴스 수집 → D1 저장 + 브리핑 HTML 생성"""
-    import urllib.request
-    import urllib.parse
-    from html import unescape
+    """노인복지 뉴스 수집 → D1 저장 + 브리핑 HTML 생성
+
+    쿼리 전체를 비동기로 동시 조회(초당 NAVER_QPS회 제한), 쿼리당 SENIOR_PAGES페이지까지.
+    정규화한 링크로 중복 제거 — 이전 실행에서 저장한 링크(SENIOR_SEEN_FILE)도 제외.
+    """
     import subprocess
-    import time
-    import httpx
+    from naver_news import clean, collect, normalize_link
 
     log.info("=== 노인복지 뉴스 수집 시작 ===")
 
@@ -343,88 +433,70 @@ def sync_senior():
         log.error("네이버 API 키 없음")
         return {"status": "error", "row_count": 0}
 
-    SENIOR_QUERIES = [
-        "AI 노인 돌봄 서비스", "AI 시니어 디지털 교육", "AI 치매 예방 기술",
-        "AI 고령자 복지 정책", "AI 요양 로봇 서비스", "노인 디지털 격차 해소",
-        "독거노인 돌봄 정책", "기초연금 인상 변경", "노인 일자리 지원사업",
-        "요양보호사 처우 개선",
-    ]
-
     senior_kw = [
         "노인", "시니어", "고령", "돌봄", "치매", "요양", "실버", "어르신",
         "경로", "독거", "노후", "간병", "기초연금", "요양보호사", "복지관",
         "경로당", "노인복지", "장기요양", "노인학대", "치매안심", "노인일자리",
     ]
     skip_kw = ["부동산", "아파트", "분양", "주식", "증권", "코인"]
-
-    def clean(text):
-        if not text: return ""
-        text = unescape(text)
-        text = re.sub(r"<[^>]+>", "", text)
-        text = re.sub(r"\s+", " ", text).strip()
-        return text
-
-    # 1. 네이버 뉴스 수집
-    results = []
-    for q in SENIOR_QUERIES:
-        encoded = urllib.parse.quote(q)
-        url = f"https://openapi.naver.com/v1/search/news.json?query={encoded}&display=10&sort=date"
-        req = urllib.request.Request(url, headers={
-            "X-Naver-Client-Id": NAVER_ID,
-            "X-Naver-Client-Secret": NAVER_SECRET,
-        })
-        try:
-            data = json.loads(urllib.request.urlopen(req, timeout=10).read())
-            for item in data.get("items", []):
-                title = clean(item["title"])
-                desc = clean(item["description"])
-                full = (title + " " + desc).lower()
-                if any(s in full for s in skip_kw):
-                    continue
-                if not any(kw in full for kw in senior_kw):
-                    continue
-                results.append({
-                    "title": title, "link": item["link"],
-                    "description": desc[:200], "source": "네이버뉴스",
-                    "category": "senior",
-                    "pub_date": datetime.now().strftime("%Y-%m-%d"),
-                })
-        except Exception as e:
-            log.error(f"  노인복지 '{q}' 실패: {e}")
-
-    # 중복 제거
-    seen = set()
+    senior_re = re.compile("|".join(map(re.escape, senior_kw)))
+    skip_re = re.compile("|".join(map(re.escape, skip_kw)))
+
+    # 1. 네이버 뉴스 수집 (비동기 동시 조회)
+    items, stats = collect(SENIOR_QUERIES, NAVER_ID, NAVER_SECRET, pages=SENIOR_PAGES, qps=NAVER_QPS)
+    METRICS.inc("api_calls", stats["calls"], api="naver", endpoint="search/news")
+    METRICS.inc("api_errors", stats["errors"], api="naver", endpoint="search/news")
+    METRICS.inc("rows_fetched", len(items), source="senior")
+    for q, err in stats["failed_queries"]:
+        log.error(f"  노인복지 '{q}' 실패: {err}")
+
+    # 중복 제거 (정규화 링크 — 오늘 수집분 + 이전 실행에서 저장한 링크, 같은 제목)
+    today = datetime.now().strftime("%Y-%m-%d")
+    seen_links = _load_senior_seen()
+    seen_titles = set()
     unique = []
-    for r in results:
-        if r["title"] not in seen:
-            seen.add(r["title"])
-            unique.append(r)
-    log.info(f"  수집: {len(unique)}건 (중복 제거 후)")
+    repeat = 0
+    for _, item in items:
+        title = clean(item["title"])
+        desc = clean(item["description"])
+        full = (title + " " + desc).lower()
+        if skip_re.search(full) or not senior_re.search(full):
+            continue
+        link_key = normalize_link(item.get("originallink") or item["link"])
+        if link_key in seen_links:
+            repeat += 1
+            continue
+        if title in seen_titles:
+            continue
+        seen_links[link_key] = today
+        seen_titles.add(title)
+        unique.append({
+            "title": title, "link": item["link"],
+            "description": desc[:200], "source": "네이버뉴스",
+            "category": "senior",
+            "pub_date": today,
+        })
+    log.info(f"  수집: {len(items)}건 조회 ({stats['calls']}회 호출) → 신규 {len(unique)}건 (이전 수집 {repeat}건 제외)")
 
-    # 2. D1 저장 (aikorea24-db)
+    # 2. D1 저장 (aikorea24-db) — 전체를 한 번의 벌크 INSERT로
     saved = 0
+    ignored = 0
     if unique:
         try:
-            env = os.environ.copy()
-            env["PATH"] = "/opt/homebrew/bin:/usr/local/bin:/usr/bin:/bin:" + env.get("PATH", "")
-            for item in unique:
-                title_escaped = item["title"].replace("'", "''")
-                desc_escaped = item["description"].replace("'", "''")
-                link_escaped = item["link"].replace("'", "''")
-                cmd = (
-                    f"INSERT OR IGNORE INTO news (title, link, description, source, category, pub_date) "
-                    f"VALUES ('{title_escaped}', '{link_escaped}', '{desc_escaped}', "
-                    f"'{item['source']}', 'senior', '{item['pub_date']}')"
-                )
-                r = subprocess.run(
-                    ["npx", "wrangler", "d1", "execute", "aikorea24-db", "--remote", "--command", cmd],
-                    capture_output=True, text=True,
-                    cwd="/Users/twinssn/Projects/aikorea24", env=env, timeout=30,
-                )
-                if r.returncode == 0:
-                    saved += 1
-            log.info(f"  D1 저장: {saved}건")
+            res = d1_bulk.insert_rows(
+                "aikorea24-db", "news",
+                ["title", "link", "description", "source", "category", "pub_date"],
+                unique, key="link",
+                database_id=AIKOREA24_DB_ID, wrangler_cwd=AIKOREA24_DIR,
+            )
+            saved, ignored = res["inserted"], res["ignored"]
+            METRICS.inc("rows_uploaded", len(unique), stage="senior")
+            log.info(f"  D1 저장: 신규 {saved}건, 중복 {ignored}건 ({res['via']}, {res['elapsed']:.2f}초)")
+            # 저장에 성공한 뒤에만 링크 기록 (실패하면 다음 실행에서 다시 수집)
+            cutoff = (datetime.now() - timedelta(days=SENIOR_SEEN_DAYS)).strftime("%Y-%m-%d")
+            write_json_atomic(SENIOR_SEEN_FILE, {k: d for k, d in seen_links.items() if d >= cutoff})
         except Exception as e:
+            METRICS.inc("upload_failed_rows", len(unique), stage="senior")
             log.error(f"  D1 저장 실패: {e}")
 
     # 3. 브리핑 HTML 생성
@@ -443,300 +515,530 @@ def sync_senior():
     except Exception as e:
         log.error(f"  브리핑 생성 실패: {e}")
 
-    return {"status": "ok", "date": datetime.now().strftime("%Y-%m-%d"), "row_count": saved}
+    return {"status": "ok", "date": today, "row_count": saved, "ignored": ignored}
 
 
-def sync_bing():
-    """Bing Webmaster API에서 키워드/트래픽 데이터 수집"""
+def _load_bing_watermarks():
+    try:
+        with open(BING_WATERMARK_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _recent_bing_stats(name, days=7):
+    """주기상 건너뛴 사이트의 리포트용 수치 — 최근 days일 체크포인트 중 가장 최근 값"""
+    for i in range(1, days + 1):
+        date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
+        if not (CHECKPOINT_DIR / "bing" / date).exists():
+            continue
+        unit = CheckpointStore(CHECKPOINT_DIR, "bing", date).get(name)
+        if unit and unit.get("data"):
+            return unit["data"]
+    return None
+
+
+def sync_bing(schedule=None):
+    """Bing Webmaster API에서 키워드/트래픽 데이터 수집
+
+    계정별·사이트별 동시 수집 (공유 keep-alive 세션, 계정별 BING_QPS 제한, 429/5xx 재시도).
+    사이트별 마지막 업로드 날짜(워터마크) 이후 행만 업로드 — 늦게 반영되는 수치를 위해
+    BING_OVERLAP_DAYS만큼 겹쳐서 다시 보내고, 워터마크가 없으면 최근 BING_LOOKBACK_DAYS일.
+    사이트별 체크포인트(오늘 날짜 기준): 재실행 시 실패/누락 사이트만 다시 수집
+    schedule(SyncSchedule)이 있으면 사이트별 주기가 안 된 사이트는 건너뛰고 최근 수치를 리포트에 사용
+    """
     log.info("=== Bing 동기화 시작 ===")
 
     if not BING_KEYS:
         log.warning("Bing API 키 없음, 스킵")
         return {"status": "skipped", "row_count": 0}
 
-    total_sites = 0
-    site_bing_stats = {}
-    total_keywords = 0
-    all_daily = []
-    all_keywords = []
+    today = datetime.now().strftime("%Y-%m-%d")
+    store = CheckpointStore(CHECKPOINT_DIR, "bing", today)
+    watermarks = _load_bing_watermarks()
+    default_since = (datetime.now() - timedelta(days=BING_LOOKBACK_DAYS)).strftime("%Y-%m-%d")
+
+    def since(name, kind):
+        mark = watermarks.get(name, {}).get(kind)
+        if not mark:
+            return default_since
+        d = datetime.strptime(mark, "%Y-%m-%d") - timedelta(days=BING_OVERLAP_DAYS)
+        return d.strftime("%Y-%m-%d")
+
+    def fetch_site(job):
+        client, site_url, name = job
+        with METRICS.timer("site_seconds", source="bing", site=name):
+            _fetch_site(client, site_url, name)
+
+    def _fetch_site(client, site_url, name):
+        stats_entry = {"clicks": 0, "impressions": 0, "keywords": 0}
+        daily_rows = []
+        keyword_rows = []
+        errors = []
+
+        # 트래픽 통계
+        try:
+            stats = client.traffic_stats(site_url)
+            METRICS.inc("rows_fetched", len(stats), source="bing")
+            # 사이트별 클릭/노출 합산 (리포트용, 응답의 최근 7일치)
+            for s in stats[-7:]:
+                stats_entry["clicks"] += s.get("Clicks", 0)
+                stats_entry["impressions"] += s.get("Impressions", 0)
+            cutoff = since(name, "daily")
+            for s in stats:
+                date_str = parse_bing_date(s["Date"])
+                if date_str > cutoff:
+                    daily_rows.append({
+                        "site": name, "date": date_str, "source": "bing",
+                        "clicks": s.get("Clicks", 0),
+                        "impressions": s.get("Impressions", 0),
+                    })
+        except Exception as e:
+            errors.append(f"트래픽: {e}")
+            log.error(f"  {name} 트래픽: {e}")
+
+        # 키워드 통계
+        try:
+            keywords = client.query_stats(site_url)
+            METRICS.inc("rows_fetched", len(keywords), source="bing")
+            stats_entry["keywords"] = len(keywords[-100:])  # 리포트용 (최근 100건)
+            cutoff = since(name, "keywords")
+            for kw in keywords:
+                date_str = parse_bing_date(kw["Date"])
+                if date_str <= cutoff:
+                    continue
+                keyword_rows.append({
+                    "site": name, "date": date_str, "source": "bing",
+                    "query": kw.get("Query", ""),
+                    "clicks": kw.get("Clicks", 0),
+                    "impressions": kw.get("Impressions", 0),
+                    "ctr": round(kw.get("Clicks", 0) / max(kw.get("Impressions", 1), 1) * 100, 2),
+                    "position": round(kw.get("AvgImpressionPosition", 0), 1),
+                })
+            log.info(f"    {name}: 키워드 {len(keyword_rows)}건 (신규)")
+        except Exception as e:
+            errors.append(f"키워드: {e}")
+            log.error(f"  {name} 키워드: {e}")
 
-    for bk in BING_KEYS:
-        account = bk["account"]
-        api_key = bk["api_key"]
-        log.info(f"  계정: {account}")
+        # 일부만 실패해도 받은 행은 저장/업로드, 상태는 error로 남겨 다음 실행 때 재수집
+        if errors:
+            METRICS.inc("site_errors", source="bing", site=name)
+        store.save(name, stats_entry, rows={"/bing/daily": daily_rows, "/bing/keywords": keyword_rows},
+                   status="error" if errors else "ok", error="; ".join(errors) or None)
 
+    def fetch_account(bk):
+        client = BingAccount(bk["account"], bk["api_key"], qps=BING_QPS)
         # 사이트 목록 조회
         try:
-            r = requests.get(
-                f"https://ssl.bing.com/webmaster/api.svc/json/GetUserSites?apikey={api_key}",
-                timeout=15
-            )
-            sites = r.json().get("d", [])
+            sites = client.user_sites()
         except Exception as e:
-            log.error(f"  사이트 목록 실패: {e}")
-            continue
-
+            log.error(f"  {client.account} 사이트 목록 실패: {e}")
+            return []
+        names = []
+        jobs = []
         for site_info in sites:
             site_url = site_info.get("Url", "")
             name = site_url.replace("https://", "").replace("http://", "").rstrip("/")
-            total_sites += 1
-
-            # 트래픽 통계
-            try:
-                r = requests.get(
-                    f"https://ssl.bing.com/webmaster/api.svc/json/GetRankAndTrafficStats?siteUrl={site_url}&apikey={api_key}",
-                    timeout=15
-                )
-                stats = r.json().get("d", [])
-                for s in stats[-7:]:  # 최근 7일치만
-                    ts = int(re.search(r"\d+", s["Date"]).group()) / 1000
-                    date_str = datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
-                    all_daily.append({
-                        "site": name, "date": date_str, "source": "bing",
-                        "clicks": s.get("Clicks", 0),
-                        "impressions": s.get("Impressions", 0),
-                    })
-                # 사이트별 클릭/노출 합산
-                if name not in site_bing_stats:
-                    site_bing_stats[name] = {"clicks": 0, "impressions": 0, "keywords": 0}
-                for s in stats[-7:]:
-                    site_bing_stats[name]["clicks"] += s.get("Clicks", 0)
-                    site_bing_stats[name]["impressions"] += s.get("Impressions", 0)
-            except Exception as e:
-                log.error(f"  {name} 트래픽: {e}")
-
-            # 키워드 통계
-            try:
-                r = requests.get(
-                    f"https://ssl.bing.com/webmaster/api.svc/json/GetQueryStats?siteUrl={site_url}&apikey={api_key}",
-                    timeout=15
-                )
-                keywords = r.json().get("d", [])
-                for kw in keywords[-100:]:  # 최근 100건
-                    ts = int(re.search(r"\d+", kw["Date"]).group()) / 1000
-                    date_str = datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
-                    all_keywords.append({
-                        "site": name, "date": date_str, "source": "bing",
-                        "query": kw.get("Query", ""),
-                        "clicks": kw.get("Clicks", 0),
-                        "impressions": kw.get("Impressions", 0),
-                        "ctr": round(kw.get("Clicks", 0) / max(kw.get("Impressions", 1), 1) * 100, 2),
-                        "position": round(kw.get("AvgImpressionPosition", 0), 1),
-                    })
-                    total_keywords += 1
-                log.info(f"    {name}: 키워드 {len(keywords[-100:])}건")
-                if name not in site_bing_stats:
-                    site_bing_stats[name] = {"clicks": 0, "impressions": 0, "keywords": 0}
-                site_bing_stats[name]["keywords"] = max(site_bing_stats[name]["keywords"], len(keywords[-100:]))
-            except Exception as e:
-                log.error(f"  {name} 키워드: {e}")
-
-    # D1 업로드 — Bing 전용 테이블에 저장
-    if all_daily:
-        for i in range(0, len(all_daily), 100):
-            batch = all_daily[i:i+100]
-            api_post("/bing/daily", {"rows": batch})
-
-    if all_keywords:
-        for i in range(0, len(all_keywords), 30):
-            batch = all_keywords[i:i+30]
-            api_post("/bing/keywords", {"keywords": batch})
-
-    log.info(f"Bing 완료: {total_sites}개 사이트, {total_keywords}개 키워드")
+            names.append(name)
+            if store.is_done(name):
+                continue
+            if schedule is not None and not schedule.due("bing", name):
+                skipped.append(name)
+                continue
+            jobs.append((client, site_url, name))
+        log.info(f"  계정 {client.account}: 사이트 {len(sites)}개 (수집 {len(jobs)}개)")
+        run_parallel(fetch_site, jobs, BING_WORKERS)
+        for method, n in client.method_calls.items():
+            METRICS.inc("api_calls", n, api="bing", endpoint=method)
+        return names
+
+    skipped = []
+    site_names = []
+    for _, names, _ in run_parallel(fetch_account, BING_KEYS, len(BING_KEYS)):
+        site_names.extend(names or [])
+
+    # D1 업로드 — Bing 전용 테이블에 저장 (확인되지 않은 행만)
+    upload_pending(store, "/bing/daily", "rows", UPLOADER, max_rows=100)
+    upload_pending(store, "/bing/keywords", "keywords", UPLOADER, max_rows=30)
+
+    # 업로드됐거나 spool 재전송으로 넘어간(ack) 행까지 워터마크 전진
+    site_bing_stats = {}
+    uploaded_keywords = 0
+    for unit in store.units():
+        name = unit["site"]
+        if name not in site_names:
+            continue
+        # 부분 실패한 사이트도 받은 수치는 리포트에 반영
+        site_bing_stats[name] = unit.get("data", {})
+        for kind, endpoint in (("daily", "/bing/daily"), ("keywords", "/bing/keywords")):
+            rows = unit.get("rows", {}).get(endpoint) or []
+            if rows and endpoint in unit.get("acked", []):
+                latest = max(r["date"] for r in rows)
+                mark = watermarks.setdefault(name, {})
+                mark[kind] = max(mark.get(kind, ""), latest)
+                if kind == "keywords":
+                    uploaded_keywords += len(rows)
+    write_json_atomic(BING_WATERMARK_FILE, watermarks, indent=2)
+
+    # 주기상 건너뛴 사이트는 최근 수집 수치로 리포트
+    for name in skipped:
+        recent = _recent_bing_stats(name)
+        if recent:
+            site_bing_stats[name] = recent
+
+    # 사이트별 sync_log — 다음 실행의 사이트별 주기 판단용
+    fetched = [u for u in store.units() if u["site"] in site_names and u.get("status") == "ok"]
+    run_parallel(lambda u: record_sync_log("bing", {
+        "date": today, "status": "ok",
+        "row_count": len(u.get("rows", {}).get("/bing/keywords") or []),
+    }, site=u["site"]), fetched, SYNC_WORKERS)
+
+    total_sites = len(site_names)
+    total_keywords = sum(v.get("keywords", 0) for v in site_bing_stats.values())
+    log.info(f"Bing 완료: {total_sites}개 사이트, {total_keywords}개 키워드 (신규 {uploaded_keywords}건 업로드)"
+             + (f", 주기상 건너뜀 {len(skipped)}개" if skipped else ""))
 
     return {
-        "status": "ok", "date": datetime.now().strftime("%Y-%m-%d"),
+        "status": "ok", "date": today,
         "sites": total_sites, "row_count": total_keywords,
-        "site_stats": site_bing_stats
+        "site_stats": site_bing_stats, "upload": UPLOADER.summary("bing"),
     }
 
 
-def sync_gsc():
-    """GSC 데이터 수집 → 로컬 스냅샷 + D1 업로드"""
-    log.info("=== GSC 동기화 시작 ===")
+def _gsc_site_label(site_url):
+    """메트릭 site 라벨 — Bing/GA4와 같은 사이트명 (scheme, sc-domain: 제거)"""
+    return site_url.replace("https://", "").replace("sc-domain:", "").rstrip("/")
 
-    end = datetime.now() - timedelta(days=3)
-    date_str = end.strftime("%Y-%m-%d")
-    snapshot_file = SNAPSHOT_DIR / f"gsc_{date_str}.json"
-
-    if snapshot_file.exists():
-        log.info(f"{date_str} 스냅샷 이미 존재, 스킵")
-        return {"status": "skipped", "date": date_str, "row_count": 0}
-
-    creds = get_credentials()
-    service = build("webmasters", "v3", credentials=creds)
 
-    snapshot = {"date": date_str, "collected_at": datetime.now().isoformat(), "sites": {}}
-    total_clicks = 0
-    total_impressions = 0
-    total_keywords = 0
-    d1_daily_rows = []
-    d1_keyword_rows = []
+def _gsc_units():
+    """GSC 체크포인트 단위: 속성 → [(단위 키, 스냅샷 사이트명)]
 
+    도메인 속성의 서브도메인은 URL 속성과 이름이 겹칠 수 있어 "속성|서브도메인"으로 구분
+    """
+    units = {}
     for site_url in SITES:
         name = site_url.replace("https://", "").rstrip("/")
-        try:
-            resp = service.searchanalytics().query(
-                siteUrl=site_url,
-                body={
-                    "startDate": date_str,
-                    "endDate": date_str,
-                    "dimensions": ["query", "page"],
-                    "rowLimit": 500,
-                }
-            ).execute()
-
-            rows = resp.get("rows", [])
-            clicks = sum(r["clicks"] for r in rows)
-            impressions = sum(r["impressions"] for r in rows)
-            ctr = (clicks / impressions * 100) if impressions > 0 else 0
-
-            total_clicks += clicks
-            total_impressions += impressions
-
-            # D1 일별 요약
-            d1_daily_rows.append({
-                "site": name, "date": date_str,
-                "clicks": clicks, "impressions": impressions,
-                "ctr": round(ctr, 2)
-            })
-
-            # 키워드 데이터
-            keywords = []
-            sorted_rows = sorted(rows, key=lambda r: r["impressions"], reverse=True)[:100]
-            for row in sorted_rows:
-                kw = {
-                    "query": row["keys"][0],
-                    "page": row["keys"][1] if len(row["keys"]) > 1 else "",
-                    "clicks": int(row["clicks"]),
-                    "impressions": int(row["impressions"]),
-                    "ctr": round(row["ctr"] * 100, 2),
-                    "position": round(row["position"], 1)
-                }
-                keywords.append(kw)
-                d1_keyword_rows.append({
-                    "site": name, "date": date_str,
-                    "query": kw["query"], "page": kw["page"],
-                    "clicks": kw["clicks"],
-                    "impressions": kw["impressions"],
-                    "ctr": kw["ctr"], "position": kw["position"]
-                })
-
-            total_keywords += len(keywords)
-            snapshot["sites"][name] = {
-                "clicks": clicks, "impressions": impressions,
-                "ctr": round(ctr, 2), "top_keywords": keywords
-            }
-            log.info(f"  {name}: 클릭 {clicks}, 노출 {impressions}, 키워드 {len(keywords)}")
-
-        except Exception as e:
-            snapshot["sites"][name] = {"error": str(e)}
-            log.error(f"  {name}: {e}")
-
-    snapshot["total"] = {
-        "clicks": total_clicks, "impressions": total_impressions,
-        "ctr": round((total_clicks / total_impressions * 100) if total_impressions > 0 else 0, 2)
-    }
-
-    # 로컬 스냅샷 저장
-    with open(snapshot_file, "w", encoding="utf-8") as f:
-        json.dump(snapshot, f, ensure_ascii=False, indent=2)
-    log.info(f"스냅샷 저장: {snapshot_file}")
-
-    # === 도메인 속성으로 서브도메인 데이터 수집 ===
+        units[site_url] = [(name, name)]
     for domain_prop, subdomains in DOMAIN_PROPERTIES.items():
-        try:
-            resp = service.searchanalytics().query(
-                siteUrl=domain_prop,
-                body={
-                    "startDate": date_str,
-                    "endDate": date_str,
-                    "dimensions": ["query", "page"],
-                    "rowLimit": 5000,
-                }
-            ).execute()
-            all_rows = resp.get("rows", [])
-
-            for subdomain in subdomains:
-                sub_rows = [r for r in all_rows if subdomain in r.get("keys", ["", ""])[1]]
-                clicks = sum(r["clicks"] for r in sub_rows)
-                impressions = sum(r["impressions"] for r in sub_rows)
-                ctr = (clicks / impressions * 100) if impressions > 0 else 0
-
-                total_clicks += clicks
-                total_impressions += impressions
-
-                d1_daily_rows.append({
-                    "site": subdomain, "date": date_str,
-                    "clicks": clicks, "impressions": impressions,
-                    "ctr": round(ctr, 2)
-                })
+        units[domain_prop] = [(f"{domain_prop}|{sub}", sub) for sub in subdomains]
+    return units
 
-                keywords = []
-                sorted_rows = sorted(sub_rows, key=lambda r: r["impressions"], reverse=True)[:100]
-                for row in sorted_rows:
-                    kw = {
-                        "query": row["keys"][0],
-                        "page": row["keys"][1] if len(row["keys"]) > 1 else "",
-                        "clicks": int(row["clicks"]),
-                        "impressions": int(row["impressions"]),
-                        "ctr": round(row["ctr"] * 100, 2),
-                        "position": round(row["position"], 1)
-                    }
-                    keywords.append(kw)
-                    d1_keyword_rows.append({
-                        "site": subdomain, "date": date_str,
-                        "query": kw["query"], "page": kw["page"],
-                        "clicks": kw["clicks"],
-                        "impressions": kw["impressions"],
-                        "ctr": kw["ctr"], "position": kw["position"]
-                    })
 
-                total_keywords += len(keywords)
-                snapshot["sites"][subdomain] = {
-                    "clicks": clicks, "impressions": impressions,
-                    "ctr": round(ctr, 2), "top_keywords": keywords
-                }
-                log.info(f"  {subdomain} (via {domain_prop}): 클릭 {clicks}, 노출 {impressions}, 키워드 {len(keywords)}")
+def _gsc_fetcher(date_str, units, creds, limiter):
+    """date_str 하루치 속성 조회 함수 생성 — fetch(site_url) → [(단위 key, 사이트명, entry, rows)]
 
-        except Exception as e:
-            log.error(f"  {domain_prop}: {e}")
-            for subdomain in subdomains:
-                snapshot["sites"][subdomain] = {"error": str(e)}
-
-    # 스냅샷 total 업데이트
-    snapshot["total"] = {
-        "clicks": total_clicks, "impressions": total_impressions,
-        "ctr": round((total_clicks / total_impressions * 100) if total_impressions > 0 else 0, 2)
+    속성 하나를 startRow로 끝까지 페이지네이션하며 스트리밍 집계.
+    googleapiclient(httplib2)는 스레드 안전하지 않아 스레드별로 서비스 생성
+    """
+    body = {
+        "startDate": date_str,
+        "endDate": date_str,
+        "dimensions": ["query", "page"],
     }
+    local = threading.local()
+
+    def fetch(site_url):
+        with METRICS.timer("site_seconds", source="gsc", site=_gsc_site_label(site_url)):
+            if not hasattr(local, "service"):
+                local.service = build("webmasters", "v3", credentials=creds)
+            subdomains = DOMAIN_PROPERTIES.get(site_url)
+            if subdomains is None:
+                aggs = [SiteAggregate(GSC_TOP_KEYWORDS)]
+            else:
+                aggs = [SiteAggregate(GSC_TOP_KEYWORDS) for _ in subdomains]
+            # 도메인 속성은 페이지 호스트가 정확히 일치하는 서브도메인 집계로 분배
+            sink = aggs[0] if subdomains is None else HostRouter(dict(zip(subdomains, aggs)))
+            pages = 0
+            for rows in iter_gsc_pages(local.service, site_url, body, GSC_PAGE_SIZE, limiter):
+                pages += 1
+                sink.add_rows(rows)
+            if pages > 1:
+                log.info(f"  {site_url}: {pages}페이지 수집")
+            if subdomains is not None and sink.unmatched:
+                log.info(f"  {site_url}: 등록되지 않은 호스트 행 {sink.unmatched}건 제외")
+            METRICS.inc("api_calls", pages, api="gsc", endpoint="searchanalytics.query")
+            METRICS.inc("rows_fetched", sum(agg.row_count for agg in aggs), source="gsc")
+
+            out = []
+            for (key, name), agg in zip(units[site_url], aggs):
+                keywords = agg.keywords()
+                entry = {
+                    "clicks": agg.clicks, "impressions": agg.impressions,
+                    "ctr": round(agg.ctr, 2), "top_keywords": keywords
+                }
+                out.append((key, name, entry, {
+                    "/gsc/daily": [{"site": name, "date": date_str, "clicks": agg.clicks,
+                                    "impressions": agg.impressions, "ctr": round(agg.ctr, 2)}],
+                    "/gsc/keywords": [{"site": name, "date": date_str, **kw} for kw in keywords],
+                }))
+                via = f" (via {site_url})" if subdomains is not None else ""
+                log.info(f"  {name}{via}: 클릭 {agg.clicks}, 노출 {agg.impressions}, 키워드 {len(keywords)}")
+            return out
+
+    return fetch
+
+
+def _fetch_gsc_props(store, units, todo, fetch, save, workers):
+    """todo 속성을 동시 조회해 단위별로 save(key, name, entry, rows) — 실패한 속성의 단위는 store.fail"""
+    def run(site_url):
+        for key, name, entry, rows in fetch(site_url):
+            save(key, name, entry, rows)
+
+    for prop, _, err in run_parallel(run, todo, workers):
+        if err is not None:
+            log.error(f"  {prop}: {err}")
+            METRICS.inc("site_errors", source="gsc", site=_gsc_site_label(prop))
+            for key, _ in units[prop]:
+                store.fail(key, err)
+
+
+def _gsc_snapshot_keys(units):
+    """사이트명 → 스냅샷에 쓸 단위 key (도메인 속성 결과가 같은 이름의 URL 속성 결과를 덮어씀)"""
+    latest = {}
+    for keys in units.values():
+        for key, name in keys:
+            latest[name] = key
+    return latest
+
+
+def _upload_gsc(store):
+    for endpoint in ("/gsc/daily", "/gsc/keywords"):
+        sent, failed = upload_pending(store, endpoint, "data", UPLOADER, stage="gsc")
+        if failed:
+            log.error(f"  {endpoint} 업로드 실패 {len(failed)}개 사이트 (다음 실행 때 재시도)")
+
+
+def sync_gsc(workers=None):
+    """GSC 데이터 수집 → 로컬 스냅샷 + D1 업로드
+
+    URL 속성/도메인 속성을 최대 workers개(기본 GSC_WORKERS) 동시 조회,
+    호출 속도는 GSC_QPS로 제한. 한 사이트 실패는 다른 사이트에 영향 없음.
+    각 속성은 startRow로 끝까지 페이지네이션하며 스트리밍 집계하므로
+    사이트 합계는 전체 행 기준, 키워드는 노출 상위 GSC_TOP_KEYWORDS개만 보관.
+    사이트별 결과는 체크포인트에 저장되어 재실행 시 실패/누락 사이트만 다시 수집하고
+    D1 업로드가 확인되지 않은 행만 다시 보냄. 스냅샷은 체크포인트를 합쳐서 생성.
+    이어서 그 이전 GSC_REFETCH_DAYS일을 다시 조회해 바뀐 행만 업로드 (_refetch_gsc).
+    """
+    log.info("=== GSC 동기화 시작 ===")
 
-    # 로컬 스냅샷 저장
-    with open(snapshot_file, "w", encoding="utf-8") as f:
-        json.dump(snapshot, f, ensure_ascii=False, indent=2)
-    log.info(f"스냅샷 저장: {snapshot_file}")
-
-    # D1 업로드
-    if d1_daily_rows:
-        for i in range(0, len(d1_daily_rows), 100):
-            batch = d1_daily_rows[i:i+100]
-            api_post("/gsc/daily", {"data": batch})
-
-    if d1_keyword_rows:
-        for i in range(0, len(d1_keyword_rows), 100):
-            batch = d1_keyword_rows[i:i+100]
-            api_post("/gsc/keywords", {"data": batch})
-
-    log.info(f"GSC 완료: 클릭 {total_clicks}, 노출 {total_impressions}, 키워드 {total_keywords}")
+    end = datetime.now() - timedelta(days=3)
+    date_str = end.strftime("%Y-%m-%d")
+    snapshot_file = SNAPSHOT_DIR / f"gsc_{date_str}.json"
+    store = CheckpointStore(CHECKPOINT_DIR, "gsc", date_str)
+    units = _gsc_units()
+    workers = workers or GSC_WORKERS
+    limiter = RateLimiter(GSC_QPS)
 
-    return {
-        "status": "ok", "date": date_str,
-        "clicks": total_clicks, "impressions": total_impressions,
-        "row_count": total_keywords
-    }
+    if snapshot_file.exists() and store.is_settled():
+        log.info(f"{date_str} 스냅샷 이미 존재, 스킵")
+        result = {"status": "skipped", "date": date_str, "row_count": 0}
+    else:
+        todo = [prop for prop, keys in units.items() if not all(store.is_done(k) for k, _ in keys)]
+        if todo:
+            creds = get_credentials()
+            done = len(units) - len(todo)
+            log.info(f"  {len(todo)}개 속성 조회 (체크포인트 완료 {done}개, 동시 {workers}개, 초당 {GSC_QPS}회)")
+            _fetch_gsc_props(store, units, todo, _gsc_fetcher(date_str, units, creds, limiter),
+                             lambda key, name, entry, rows: store.save(key, entry, rows=rows), workers)
+
+        # 체크포인트를 단위별로 읽어 스냅샷에 바로 기록
+        def entries():
+            for name, key in _gsc_snapshot_keys(units).items():
+                unit = store.get(key)
+                if not unit:
+                    continue
+                if unit.get("status") == "ok":
+                    yield name, unit.get("data", {})
+                else:
+                    yield name, {"error": unit.get("error", "unknown")}
+
+        # 로컬 스냅샷 저장(1회, 원자적) + 노출 롤업 갱신
+        totals = _write_gsc_snapshot(snapshot_file, date_str, entries())
+        log.info(f"스냅샷 저장: {snapshot_file}")
+        rollup = load_exposure_rollup()
+        rollup.update(date_str, totals["sites"])
+        rollup.save()
+
+        # D1 업로드 — 확인되지 않은 행만
+        _upload_gsc(store)
+
+        failed_sites = totals["failed"]
+        log.info(f"GSC 완료: 클릭 {totals['clicks']}, 노출 {totals['impressions']}, 키워드 {totals['keywords']}"
+                 + (f", 실패 {failed_sites}개 사이트" if failed_sites else ""))
+        result = {
+            "status": "ok", "date": date_str,
+            "clicks": totals["clicks"], "impressions": totals["impressions"],
+            "row_count": totals["keywords"],
+        }
+
+    if GSC_REFETCH_DAYS > 0:
+        result["refetch"] = _refetch_gsc(end, units, limiter, workers)
+    result["upload"] = UPLOADER.summary("gsc")
+    return result
+
+
+def _gsc_row_changed(old, new, fields):
+    return old is None or any(old.get(f) != new.get(f) for f in fields)
+
+
+def _gsc_keywords_by_query(keywords):
+    """query → D1에 남는 행
+
+    gsc_keywords는 UNIQUE(site, date, query) + INSERT OR REPLACE라 전체 업로드에서 같은 query의
+    (query, page) 행이 여러 개면 마지막 행만 남음. 재조회 비교/업로드도 이 결과 기준이어야
+    바뀐 행만 보내도 전체 업로드와 같은 상태가 됨
+    """
+    out = {}
+    for k in keywords:
+        out[k["query"]] = {**k, "page": k.get("page", "")}
+    return out
+
+
+def _refetch_gsc(end, units, limiter, workers):
+    """늦게 확정되는 GSC 수치 반영 — end 이전 GSC_REFETCH_DAYS일을 다시 조회해 스냅샷과 비교
+
+    값이 바뀐 gsc_daily 행과 새로 들어오거나 바뀐 gsc_keywords 행(query 단위, D1 UNIQUE 키 기준)만 업로드하고
+    스냅샷/노출 롤업은 새 값으로 교체. 날짜별 체크포인트(gsc_refetch/<날짜>@<오늘>)로 하루 한 번만 조회.
+    """
+    today = datetime.now().strftime("%Y-%m-%d")
+    summary = {"dates": 0, "changed_daily": 0, "changed_keywords": 0}
+    creds = None
+    for i in range(1, GSC_REFETCH_DAYS + 1):
+        date_str = (end - timedelta(days=i)).strftime("%Y-%m-%d")
+        snapshot_file = SNAPSHOT_DIR / f"gsc_{date_str}.json"
+        store = CheckpointStore(CHECKPOINT_DIR, "gsc_refetch", f"{date_str}@{today}")
+        todo = [prop for prop, keys in units.items() if not all(store.is_done(k) for k, _ in keys)]
+        if todo:
+            try:
+                with open(snapshot_file, encoding="utf-8") as f:
+                    old_sites = json.load(f).get("sites", {})
+            except FileNotFoundError:
+                log.warning(f"  {date_str} 스냅샷 없음 → 비교 없이 전체 업로드, 스냅샷 새로 작성")
+                old_sites = {}
+            except (OSError, ValueError) as e:
+                log.warning(f"  {date_str} 스냅샷 읽기 실패({e}) → 비교 없이 전체 업로드, 스냅샷 새로 작성")
+                old_sites = {}
+            creds = creds or get_credentials()
+
+            def save_changed(key, name, entry, rows, old_sites=old_sites, store=store):
+                old = old_sites.get(name) or {}
+                old_kw = _gsc_keywords_by_query(old.get("top_keywords", []))
+                daily = rows["/gsc/daily"] if _gsc_row_changed(old, entry, ("clicks", "impressions", "ctr")) else []
+                keywords = [
+                    r for query, r in _gsc_keywords_by_query(rows["/gsc/keywords"]).items()
+                    if _gsc_row_changed(old_kw.get(query), r, ("page", "clicks", "impressions", "ctr", "position"))
+                ]
+                store.save(key, entry, rows={"/gsc/daily": daily, "/gsc/keywords": keywords})
+
+            log.info(f"  {date_str} 재조회: {len(todo)}개 속성")
+            _fetch_gsc_props(store, units, todo, _gsc_fetcher(date_str, units, creds, limiter),
+                             save_changed, workers)
+
+            # 다시 받은 단위만 교체, 실패한 단위는 기존 스냅샷 값 유지
+            keys = _gsc_snapshot_keys(units)
+
+            def entries(old_sites=old_sites, store=store, keys=keys):
+                for name in dict.fromkeys([*old_sites, *keys]):
+                    unit = store.get(keys[name]) if name in keys else None
+                    if unit and unit.get("status") == "ok":
+                        yield name, unit.get("data", {})
+                    elif name in old_sites:
+                        yield name, old_sites[name]
+
+            totals = _write_gsc_snapshot(snapshot_file, date_str, entries())
+            rollup = load_exposure_rollup()
+            rollup.update(date_str, totals["sites"])
+            rollup.save()
+            summary["dates"] += 1
+
+        for unit in store.iter_units():
+            if unit.get("status") == "ok":
+                summary["changed_daily"] += len(unit["rows"].get("/gsc/daily", []))
+                summary["changed_keywords"] += len(unit["rows"].get("/gsc/keywords", []))
+        _upload_gsc(store)
+
+    log.info(f"GSC 재조회: {summary['dates']}일, 변경 일별 {summary['changed_daily']}건 / "
+             f"키워드 {summary['changed_keywords']}건")
+    return summary
+
+
+def _write_gsc_snapshot(path, date_str, entries):
+    """(사이트명, entry) 이터레이터를 읽는 대로 스냅샷 JSON에 기록 (json.dump(indent=2)와 같은 형식)
+
+    사이트 entry 전체를 모아 두지 않고 합계와 사이트별 노출/클릭만 누적해서 반환:
+        {"clicks", "impressions", "keywords", "failed", "sites": {name: {"impressions", "clicks"}}}
+    """
+    totals = {"clicks": 0, "impressions": 0, "keywords": 0, "failed": 0, "sites": {}}
+    with atomic_writer(path) as f:
+        f.write("{\n")
+        f.write(f'  "date": {json.dumps(date_str)},\n')
+        f.write(f'  "collected_at": {json.dumps(datetime.now().isoformat())},\n')
+        f.write('  "sites": {')
+        first = True
+        for name, entry in entries:
+            f.write("\n" if first else ",\n")
+            first = False
+            body = json.dumps(entry, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+            f.write(f"    {json.dumps(name, ensure_ascii=False)}: {body}")
+            if "error" in entry:
+                totals["failed"] += 1
+                totals["sites"][name] = {}
+                continue
+            totals["clicks"] += entry["clicks"]
+            totals["impressions"] += entry["impressions"]
+            totals["keywords"] += len(entry.get("top_keywords", []))
+            totals["sites"][name] = {"impressions": entry["impressions"], "clicks": entry["clicks"]}
+        f.write("\n  }," if not first else "},")
+        clicks, impressions = totals["clicks"], totals["impressions"]
+        total = {
+            "clicks": clicks, "impressions": impressions,
+            "ctr": round((clicks / impressions * 100) if impressions > 0 else 0, 2)
+        }
+        body = json.dumps(total, indent=2).replace("\n", "\n  ")
+        f.write(f'\n  "total": {body}\n}}')
+    return totals
+
+
+def load_exposure_rollup():
+    """노출 롤업 로드 — 파일이 없으면 기존 GSC 스냅샷으로 한 번 채움"""
+    rollup = ExposureRollup(EXPOSURE_ROLLUP_FILE)
+    if not rollup:
+        rollup.backfill(SNAPSHOT_DIR.glob("gsc_*.json"))
+        if rollup:
+            rollup.save()
+    return rollup
+
+
+def _iter_ga4_report(client, request, page_size):
+    """runReport를 offset으로 끝까지 호출하며 응답 행을 하나씩 yield"""
+    offset = 0
+    while True:
+        request.limit = page_size
+        request.offset = offset
+        METRICS.inc("api_calls", api="ga4", endpoint="runReport")
+        response = client.run_report(request=request)
+        yield from response.rows
+        offset += len(response.rows)
+        if not response.rows or offset >= response.row_count:
+            return
+
+
+def _ga4_rows(domain, report_rows):
+    """GA4 응답 행 → /ga4/pageviews 행"""
+    for row in report_rows:
+        path = row.dimension_values[0].value
+        date = row.dimension_values[1].value
+        yield {
+            "site": domain, "date": f"{date[:4]}-{date[4:6]}-{date[6:8]}",
+            "page": f"https://{domain}{path}",
+            "pageviews": int(row.metric_values[0].value),
+            "sessions": int(row.metric_values[1].value),
+            "revenue": round(float(row.metric_values[2].value), 6),
+        }
 
 
 def sync_ga4(days=3):
-    """GA4 페이지뷰 수집 → D1 업로드"""
+    """GA4 페이지뷰 수집 → D1 업로드 (속성별 체크포인트, 재실행 시 미완료 속성만 수집)"""
     log.info("=== GA4 동기화 시작 ===")
 
     from google.analytics.data_v1beta import BetaAnalyticsDataClient
@@ -749,12 +1051,15 @@ def sync_ga4(days=3):
     start_str = start_date.strftime("%Y-%m-%d")
     end_str = end_date.strftime("%Y-%m-%d")
 
-    all_data = []
-    total_pv = 0
-    total_rev = 0.0
+    # 같은 도메인이 여러 속성에 걸쳐 있어 체크포인트 단위는 속성 ID
+    store = CheckpointStore(CHECKPOINT_DIR, "ga4", f"{start_str}~{end_str}")
+    todo = [(p, d) for p, d in GA4_PROPERTIES.items() if not store.is_done(p)]
+    if len(todo) < len(GA4_PROPERTIES):
+        log.info(f"  체크포인트 완료 {len(GA4_PROPERTIES) - len(todo)}개 속성 스킵")
 
-    for prop_id, domain in GA4_PROPERTIES.items():
+    for prop_id, domain in todo:
         try:
+            site_start = time.monotonic()
             request = RunReportRequest(
                 property=f"properties/{prop_id}",
                 date_ranges=[DateRange(start_date=start_str, end_date=end_str)],
@@ -764,47 +1069,66 @@ def sync_ga4(days=3):
                     Metric(name="sessions"),
                     Metric(name="totalAdRevenue"),
                 ],
-                limit=10000,
             )
-            response = client.run_report(request=request)
-            site_pv = 0
-            site_rev = 0.0
-            for row in response.rows:
-                path = row.dimension_values[0].value
-                date = row.dimension_values[1].value
-                date_fmt = f"{date[:4]}-{date[4:6]}-{date[6:8]}"
-                pageviews = int(row.metric_values[0].value)
-                sessions = int(row.metric_values[1].value)
-                revenue = float(row.metric_values[2].value)
-                all_data.append({
-                    "site": domain, "date": date_fmt,
-                    "page": f"https://{domain}{path}",
-                    "pageviews": pageviews, "sessions": sessions,
-                    "revenue": round(revenue, 6),
-                })
-                site_pv += pageviews
-                site_rev += revenue
-            total_pv += site_pv
-            total_rev += site_rev
-            log.info(f"  {domain}: {site_pv:,} PV, ${site_rev:.2f}")
+            # 리포트 페이지 → 체크포인트 행 파일로 흘려 씀 (속성 전체 행을 목록으로 모으지 않음)
+            entry = {"domain": domain, "rows": 0, "pv": 0, "rev": 0.0}
+
+            def counted(rows, entry=entry):
+                for row in rows:
+                    entry["rows"] += 1
+                    entry["pv"] += row["pageviews"]
+                    entry["rev"] += row["revenue"]
+                    yield row
+
+            rows = counted(_ga4_rows(domain, _iter_ga4_report(client, request, GA4_PAGE_SIZE)))
+            store.save(prop_id, entry, rows={"/ga4/pageviews": rows})
+            METRICS.inc("rows_fetched", entry["rows"], source="ga4")
+            METRICS.inc("site_seconds", time.monotonic() - site_start, source="ga4", site=domain)
+            log.info(f"  {domain}: {entry['pv']:,} PV, ${entry['rev']:.2f}")
         except Exception as e:
+            METRICS.inc("site_errors", source="ga4", site=domain)
+            store.fail(prop_id, e)
             log.error(f"  {domain}: {e}")
 
-    # D1 업로드
-    if all_data:
-        for i in range(0, len(all_data), 500):
-            batch = all_data[i:i+500]
-            api_post("/ga4/pageviews", {"data": batch})
+    # D1 업로드 — 확인되지 않은 행만, 행 파일에서 읽는 대로 배치 전송 (back-pressure는 Uploader)
+    sent, failed = upload_pending(store, "/ga4/pageviews", "data", UPLOADER)
+    if failed:
+        log.error(f"  /ga4/pageviews 업로드 실패 {len(failed)}개 속성 (다음 실행 때 재시도)")
 
-    log.info(f"GA4 완료: {len(all_data)}건, {total_pv:,} PV, ${total_rev:.2f}")
+    merged = [v for v in store.merge(list(GA4_PROPERTIES)).values() if "error" not in v]
+    row_count = sum(v["rows"] for v in merged)
+    total_pv = sum(v["pv"] for v in merged)
+    total_rev = sum(v["rev"] for v in merged)
+    log.info(f"GA4 완료: {row_count}건, {total_pv:,} PV, ${total_rev:.2f}")
 
     return {
         "status": "ok", "date_range": f"{start_str}~{end_str}",
-        "row_count": len(all_data), "total_pv": total_pv,
-        "total_rev": round(total_rev, 2)
+        "row_count": row_count, "total_pv": total_pv,
+        "total_rev": round(total_rev, 2), "upload": UPLOADER.summary("ga4"),
     }
 
 
+def replay_spool():
+    """지난 실행에서 실패해 spool에 남은 업로드 재전송"""
+    pending = SPOOL.stats()
+    if not pending:
+        return {"status": "ok", "rows": 0, "sent": 0, "failed": 0}
+    log.info(f"spool 재전송: {', '.join(f'{ep} {n}건' for ep, n in sorted(pending.items()))}")
+    res = SPOOL.replay(UPLOADER, workers=UPLOADER.max_in_flight)
+    log.info(f"  spool 재전송 완료: {res['sent']}/{res['rows']}건 (남은 {res['failed']}건은 다시 보관)")
+    return {"status": "ok" if not res["failed"] else "partial", **res, "upload": UPLOADER.summary("replay")}
+
+
+def refresh_replica():
+    """로컬 복제본이 있으면 방금 올린 데이터까지 증분 pull (처음 만들기는 python replica.py sync)"""
+    local = replica.default()
+    if local is None:
+        return {"status": "skipped", "rows": 0}
+    got = local.sync()
+    log.info(f"  복제본 갱신: {sum(got.values()):,}행")
+    return {"status": "ok", "rows": sum(got.values())}
+
+
 def record_sync_log(source, result, site=None):
     """sync_log에 수집 결과 기록"""
     api_post("/sync/log", {
@@ -818,89 +1142,251 @@ def record_sync_log(source, result, site=None):
     })
 
 
-def main():
-    start_time = datetime.now()
-    log.info("=" * 50)
-    log.info("Blogdex 일일 동기화 시작")
-    log.info("=" * 50)
+def _sync_posts(module):
+    """포스트 동기화 스테이지 함수 생성 (sync_hugo 등 모듈의 run 호출)"""
+    def run():
+        importlib.import_module(module).run()
+        return {"status": "ok"}
+    return run
+
+
+def _run_indexing():
+    from index_submit import run as run_indexing
+    log.info("Indexing API 제출 시작")
+    run_indexing(max_per_site=3)
+    log.info("Indexing API 제출 완료")
+    return {"status": "ok"}
+
+
+def _scheduled(source, fn, schedule):
+    """주기가 안 된 소스는 실행하지 않고 skipped 반환 (sync_log에는 기록하지 않음)"""
+    if schedule is None:
+        return fn
+
+    def run():
+        due, reason = schedule.check(source)
+        if not due:
+            log.info(f"[{source}] 건너뜀: {reason}")
+            return {"status": "skipped", "row_count": 0, "reason": reason, "scheduled_skip": True}
+        return fn()
+    return run
+
+
+def build_stages(results=None, schedule=None):
+    """일일 동기화 스테이지 그래프
+
+    spool 재전송이 먼저 끝나야 GSC/GA4/Bing 업로드 시작 (지난 실패분이 새 값을 덮어쓰지 않게).
+    GSC/GA4/Bing/노인복지 뉴스/플랫폼별 포스트 동기화는 서로 독립이라 동시 실행,
+    posts는 4개 포스트 동기화 결과를 취합하고, Indexing API 제출은 posts 이후 실행.
+    로컬 복제본(있을 때만)은 업로드가 모두 끝난 뒤 증분 갱신.
+    텔레그램 리포트는 run_stages가 모두 끝난 뒤 main에서 생성.
+    results: 스테이지 결과 dict (run_stages에 같은 객체를 넘겨야 posts 취합이 동작)
+    schedule: SyncSchedule — 주기가 안 된 소스는 건너뜀 (Bing은 사이트별로 판단)
+    """
+    post_modules = ["sync_hugo", "sync_astro", "sync_wordpress", "sync_blogger"]
+    results_ref = {} if results is None else results
+
+    def posts_summary():
+        failed = [m for m in post_modules if results_ref.get(m, {}).get("status") == "error"]
+        if failed:
+            msgs = "; ".join(f"{m}: {results_ref[m].get('message', '')}" for m in failed)
+            log.error(f"포스트 동기화 실패: {msgs}")
+            return {"status": "error", "row_count": 0, "date": "N/A", "message": msgs}
+        log.info("포스트 동기화 완료")
+        return {"status": "ok", "row_count": 0, "date": datetime.now().strftime("%Y-%m-%d")}
+
+    stages = [
+        Stage("replay", replay_spool, label="spool 재전송"),
+        Stage("gsc", _scheduled("gsc", sync_gsc, schedule), deps=["replay"], log_source="gsc", label="GSC 동기화"),
+        Stage("ga4", _scheduled("ga4", lambda: sync_ga4(days=3), schedule), deps=["replay"],
+              log_source="ga4", label="GA4 동기화"),
+        Stage("bing", lambda: sync_bing(schedule), deps=["replay"], log_source="bing", label="Bing 동기화"),
+        Stage("senior", _scheduled("senior", sync_senior, schedule), log_source="senior", label="노인복지 수집"),
+    ]
+    stages += [Stage(m, _scheduled(m, _sync_posts(m), schedule), log_source=m, label=f"{m} 포스트 동기화")
+               for m in post_modules]
+    stages += [
+        Stage("posts", posts_summary, deps=post_modules, log_source="posts", label="포스트 동기화"),
+        Stage("indexing", _run_indexing, deps=["posts"], label="Indexing API"),
+        Stage("replica", refresh_replica, deps=["gsc", "ga4", "bing", "posts"], label="로컬 복제본 갱신"),
+    ]
+    return stages, results_ref
 
-    results = {}
 
-    # GSC 동기화
+def _record_stage(stage, result):
+    """스테이지 결과를 sync_log에 기록 (예외로 끝난 스테이지는 row_count 0 / date N/A)"""
+    METRICS.set("stage_seconds", result.get("elapsed", 0), stage=stage.name)
+    METRICS.set("stage_errors", 1 if result.get("status") == "error" else 0, stage=stage.name)
+    if not stage.log_source or result.get("scheduled_skip"):
+        return
+    if result.get("status") == "error" and "row_count" not in result:
+        result = {"row_count": 0, "date": "N/A", **result}
+    record_sync_log(stage.log_source, result)
+
+
+def export_metrics(elapsed):
+    """업로드 통계를 합쳐 메트릭 파일 기록"""
+    for stage, st in UPLOADER.stats.items():
+        METRICS.inc("rows_uploaded", st.rows, stage=stage)
+        METRICS.inc("upload_failed_rows", st.failed_rows, stage=stage)
+        METRICS.set("upload_bytes", st.bytes, stage=stage)
+        METRICS.set("upload_batches", st.batches, stage=stage)
+        METRICS.set("upload_failed_batches", st.failed_batches, stage=stage)
+        METRICS.set("upload_retries", st.retries, stage=stage)
+    METRICS.set("run_seconds", round(elapsed, 1))
     try:
-        gsc_result = sync_gsc()
-        results["gsc"] = gsc_result
-        record_sync_log("gsc", gsc_result)
-    except Exception as e:
-        log.error(f"GSC 동기화 실패: {e}")
-        results["gsc"] = {"status": "error", "message": str(e)}
-        record_sync_log("gsc", {"status": "error", "row_count": 0, "date": "N/A"})
+        METRICS.write_jsonl(METRICS_JSONL, date=datetime.now().strftime("%Y-%m-%d"))
+        METRICS.write_prometheus(METRICS_TEXTFILE)
+    except OSError as e:
+        log.error(f"메트릭 저장 실패: {e}")
+
+
+def plan_run(history_runs=7):
+    """--plan: API 호출 없이 스테이지별 예상 호출/업로드 행/배치/시간 출력
+
+    사이트 목록·체크포인트·spool 등 로컬 상태 + 최근 history_runs회 실행 메트릭 평균으로 추정.
+    기록이 없는 값은 설정에서 나오는 상한(예: 사이트당 키워드 GSC_TOP_KEYWORDS개)으로 계산.
+    """
+    from sync_plan import History, estimate_batches, print_plan
+
+    hist = History.load(METRICS_JSONL, runs=history_runs)
+    basis = f"최근 {len(hist)}회 평균" if len(hist) else "설정값"
+    max_bytes, max_rows = UPLOADER.max_batch_bytes, UPLOADER.max_batch_rows
+    bing_rows = 30
+    if BULK_INGEST:
+        max_bytes, max_rows = INGEST_MAX_BYTES, INGEST_MAX_ROWS
+        bing_rows = max_rows
+
+    def bytes_per_row(stage):
+        sent, rows = hist.avg("upload_bytes", stage=stage), hist.avg("rows_uploaded", stage=stage)
+        return sent / rows if sent and rows else None
+
+    def seconds(stage, ratio=1.0):
+        past = hist.avg("stage_seconds", stage=stage)
+        return past * ratio if past is not None else None
+
+    plans = []
+
+    # spool 재전송
+    spooled = sum(SPOOL.stats().values())
+    plans.append({"stage": "replay", "rows": spooled,
+                  "batches": estimate_batches(spooled, bytes_per_row("replay"), max_bytes, max_rows),
+                  "seconds": seconds("replay") if spooled else 0, "basis": "spool 파일"})
+
+    # GSC — 오늘 대상 날짜의 체크포인트에서 남은 속성만
+    date_str = (datetime.now() - timedelta(days=3)).strftime("%Y-%m-%d")
+    units = _gsc_units()
+    store = CheckpointStore(CHECKPOINT_DIR, "gsc", date_str)
+    if (SNAPSHOT_DIR / f"gsc_{date_str}.json").exists() and store.is_settled():
+        plans.append({"stage": "gsc", "seconds": 0, "basis": f"{date_str} 완료됨"})
+    else:
+        todo = [p for p, keys in units.items() if not all(store.is_done(k) for k, _ in keys)]
+        todo_units = sum(len(units[p]) for p in todo)
+        ratio = len(todo) / len(units) if units else 0
+        pages = (hist.avg("api_calls", api="gsc") or len(units)) / max(len(units), 1)
+        past_rows = hist.avg("rows_uploaded", stage="gsc")
+        rows = past_rows * ratio if past_rows is not None else todo_units * (1 + GSC_TOP_KEYWORDS)
+        calls = len(todo) * pages
+        gsc_seconds = seconds("gsc", ratio)
+        plans.append({
+            "stage": "gsc", "calls": {"gsc": calls}, "rows": rows,
+            "batches": estimate_batches(todo_units, None, max_bytes, max_rows)
+                       + estimate_batches(rows - todo_units, bytes_per_row("gsc"), max_bytes, max_rows),
+            "seconds": gsc_seconds if gsc_seconds is not None else calls / min(GSC_QPS, GSC_WORKERS),
+            "basis": f"{len(todo)}/{len(units)}개 속성, {basis}",
+        })
 
-    # GA4 동기화
-    try:
-        ga4_result = sync_ga4(days=3)
-        results["ga4"] = ga4_result
-        record_sync_log("ga4", ga4_result)
-    except Exception as e:
-        log.error(f"GA4 동기화 실패: {e}")
-        results["ga4"] = {"status": "error", "message": str(e)}
-        record_sync_log("ga4", {"status": "error", "row_count": 0, "date": "N/A"})
+    # GSC 재조회 창 — 오늘 아직 재조회하지 않은 날짜/속성만
+    today = datetime.now().strftime("%Y-%m-%d")
+    pages = (hist.avg("api_calls", api="gsc") or len(units)) / max(len(units), 1)
+    refetch_props = 0
+    for i in range(1, GSC_REFETCH_DAYS + 1):
+        d = (datetime.now() - timedelta(days=3 + i)).strftime("%Y-%m-%d")
+        if not (CHECKPOINT_DIR / "gsc_refetch" / f"{d}@{today}").exists():
+            refetch_props += len(units)
+            continue
+        store = CheckpointStore(CHECKPOINT_DIR, "gsc_refetch", f"{d}@{today}")
+        refetch_props += sum(1 for keys in units.values() if not all(store.is_done(k) for k, _ in keys))
+    plans.append({
+        "stage": "gsc (재조회)", "calls": {"gsc": refetch_props * pages},
+        "seconds": refetch_props * pages / min(GSC_QPS, GSC_WORKERS),
+        "basis": f"{GSC_REFETCH_DAYS}일 × {len(units)}개 속성, 바뀐 행만 업로드",
+    })
 
-    # Bing 동기화
-    try:
-        bing_result = sync_bing()
-        results["bing"] = bing_result
-        record_sync_log("bing", bing_result)
-    except Exception as e:
-        log.error(f"Bing 동기화 실패: {e}")
-        results["bing"] = {"status": "error", "message": str(e)}
-        record_sync_log("bing", {"status": "error", "row_count": 0, "date": "N/A"})
+    # GA4
+    end_date = datetime.now() - timedelta(days=1)
+    ga4_range = f"{(end_date - timedelta(days=2)).strftime('%Y-%m-%d')}~{end_date.strftime('%Y-%m-%d')}"
+    store = CheckpointStore(CHECKPOINT_DIR, "ga4", ga4_range)
+    todo = [p for p in GA4_PROPERTIES if not store.is_done(p)]
+    ratio = len(todo) / len(GA4_PROPERTIES) if GA4_PROPERTIES else 0
+    pages = (hist.avg("api_calls", api="ga4") or len(GA4_PROPERTIES)) / max(len(GA4_PROPERTIES), 1)
+    rows = (hist.avg("rows_fetched", source="ga4") or 0) * ratio
+    plans.append({
+        "stage": "ga4", "calls": {"ga4": len(todo) * pages}, "rows": rows,
+        "batches": estimate_batches(rows, bytes_per_row("ga4"), max_bytes, max_rows),
+        "seconds": seconds("ga4", ratio),
+        "basis": f"{len(todo)}/{len(GA4_PROPERTIES)}개 속성, {basis}",
+    })
 
-    # 노인복지 뉴스 수집 + 브리핑
-    try:
-        senior_result = sync_senior()
-        results["senior"] = senior_result
-        record_sync_log("senior", senior_result)
-    except Exception as e:
-        log.error(f"노인복지 수집 실패: {e}")
-        results["senior"] = {"status": "error", "message": str(e)}
-        record_sync_log("senior", {"status": "error", "row_count": 0, "date": "N/A"})
+    # Bing — 사이트 수는 지난 실행 GetQueryStats 호출 수(없으면 워터마크 파일)로 추정
+    sites = hist.avg("api_calls", api="bing", endpoint="GetQueryStats") or len(_load_bing_watermarks())
+    rows = hist.avg("rows_uploaded", stage="bing") or 0
+    plans.append({
+        "stage": "bing", "calls": {"bing": len(BING_KEYS) + 2 * sites if BING_KEYS else 0}, "rows": rows,
+        "batches": estimate_batches(rows, bytes_per_row("bing"), max_bytes, bing_rows),
+        "seconds": seconds("bing") if BING_KEYS else 0,
+        "basis": f"계정 {len(BING_KEYS)}개, 사이트 약 {sites:.0f}개, {basis}" if BING_KEYS else "API 키 없음",
+    })
 
+    # 노인복지 뉴스 — 쿼리 × 페이지가 상한 (결과가 적으면 일찍 끝남)
+    max_calls = len(SENIOR_QUERIES) * SENIOR_PAGES
+    naver_calls = min(hist.avg("api_calls", api="naver") or max_calls, max_calls)
+    senior_seconds = seconds("senior")
+    plans.append({
+        "stage": "senior", "calls": {"naver": naver_calls},
+        "rows": hist.avg("rows_uploaded", stage="senior") or 0, "batches": 1,
+        "seconds": senior_seconds if senior_seconds is not None else naver_calls / NAVER_QPS,
+        "basis": f"쿼리 {len(SENIOR_QUERIES)}개 × {SENIOR_PAGES}페이지, {basis}",
+    })
 
-    # 포스트 동기화 (Hugo/Astro/WordPress/Blogger)
-    try:
-        from sync_hugo import run as sync_hugo_posts
-        from sync_astro import run as sync_astro_posts
-        from sync_wordpress import run as sync_wordpress_posts
-        from sync_blogger import run as sync_blogger_posts
-
-        log.info("포스트 동기화 시작 (Hugo/Astro/WordPress/Blogger)")
-        sync_hugo_posts()
-        sync_astro_posts()
-        sync_wordpress_posts()
-        sync_blogger_posts()
-        results["posts"] = {"status": "ok"}
-        record_sync_log("posts", {"status": "ok", "row_count": 0, "date": datetime.now().strftime("%Y-%m-%d")})
-        log.info("포스트 동기화 완료")
-    except Exception as e:
-        log.error(f"포스트 동기화 실패: {e}")
-        results["posts"] = {"status": "error", "message": str(e)}
-        record_sync_log("posts", {"status": "error", "row_count": 0, "date": "N/A"})
+    for name in ["sync_hugo", "sync_astro", "sync_wordpress", "sync_blogger", "posts", "indexing"]:
+        plans.append({"stage": name, "seconds": seconds(name), "basis": basis})
 
-    # Google Indexing API 제출
-    try:
-        from index_submit import run as run_indexing
-        log.info("Indexing API 제출 시작")
-        run_indexing(max_per_site=3)
-        results["indexing"] = {"status": "ok"}
-        log.info("Indexing API 제출 완료")
-    except Exception as e:
-        log.error(f"Indexing API 실패: {e}")
-        results["indexing"] = {"status": "error", "message": str(e)}
+    print_plan(plans, API_DAILY_QUOTAS)
+
+    # 스테이지는 SYNC_WORKERS개씩 동시 실행 — 전체 시간은 대략 replay + 가장 긴 스테이지
+    replay_s = plans[0]["seconds"] or 0
+    longest = max((p["seconds"] for p in plans[1:] if p.get("seconds") is not None), default=0)
+    log.info(f"예상 소요: 약 {replay_s + longest:,.0f}초 (동시 {SYNC_WORKERS}개, 가장 긴 스테이지 기준)")
+
+
+def main(force=None, cache_mode="refresh"):
+    """force: True면 주기와 상관없이 전체 실행, 소스 이름 모음이면 해당 소스만 강제
+
+    cache_mode: api 응답 캐시 모드 (기본 refresh, --no-cache면 off)
+    """
+    start_time = datetime.now()
+    log.info("=" * 50)
+    log.info("Blogdex 일일 동기화 시작")
+    log.info("=" * 50)
+
+    prune_checkpoints(CHECKPOINT_DIR, keep_days=14)
+    # 방금 올린 데이터를 바로 조회하므로 TTL을 믿지 않고 항상 재검증 (바뀌지 않았으면 304)
+    api.set_cache_mode(cache_mode)
+
+    # sync_log 최신 상태 기준 주기 판단 (조회 실패 시 전부 실행)
+    status = api_get("/sync/status")
+    if not isinstance(status, list):
+        log.warning(f"sync 상태 조회 실패, 전체 실행: {status}")
+    schedule = SyncSchedule(status, SYNC_CADENCE, force=force)
+
+    stages, results = build_stages(schedule=schedule)
+    run_stages(stages, workers=SYNC_WORKERS, results=results, on_done=_record_stage)
 
     # 소요 시간
     elapsed = (datetime.now() - start_time).total_seconds()
     log.info(f"완료: {elapsed:.1f}초 소요")
+    export_metrics(elapsed)
 
     # 텔레그램 알림
     gsc = results.get("gsc", {})
@@ -924,25 +1410,8 @@ def main():
 
     # 검색 노출 현황 + 변화 추적
     try:
-        import glob
-        all_gsc_files = sorted(glob.glob(str(SNAPSHOT_DIR / "gsc_*.json")))
-
-        def calc_gsc_exposure(file_list):
-            sites = {}
-            for sf in file_list:
-                sd = json.load(open(sf))
-                for sname, sinfo in sd.get("sites", {}).items():
-                    if sname not in sites:
-                        sites[sname] = 0
-                    sites[sname] += sinfo.get("impressions", 0)
-            return sites
-
-        # 최근 7일 vs 그 이전 7일
-        recent_files = all_gsc_files[-7:]
-        prev_files = all_gsc_files[-14:-7] if len(all_gsc_files) >= 14 else []
-
-        gsc_recent = calc_gsc_exposure(recent_files)
-        gsc_prev = calc_gsc_exposure(prev_files)
+        # 최근 7일 vs 그 이전 7일 (롤업 파일에서 조회)
+        gsc_recent, gsc_prev = load_exposure_rollup().recent_vs_prev(7)
 
         bing_stats = results.get("bing", {}).get("site_stats", {})
 
@@ -960,7 +1429,7 @@ def main():
         # 변화 감지: 이전 7일 대비
         new_exposure = []  # 이전엔 노출 없었는데 이번에 생긴 사이트
         lost_exposure = []  # 이전엔 노출 있었는데 이번에 사라진 사이트
-        if prev_files:
+        if gsc_prev:
             prev_all = set(list(gsc_prev.keys()) + list(bing_stats.keys()))
             for s in all_s:
                 g_now = gsc_recent.get(s, 0) + bing_stats.get(s, {}).get("keywords", 0)
@@ -1166,4 +1635,26 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Blogdex 일일 동기화")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "replay"],
+                        help="run: 전체 동기화 (기본), replay: spool에 남은 업로드만 재전송")
+    parser.add_argument("--plan", action="store_true", help="API 호출 없이 예상 작업량만 출력")
+    parser.add_argument("--history", type=int, default=7, help="--plan 추정에 쓸 최근 실행 수 (기본 7)")
+    parser.add_argument("--force", nargs="?", const="all", metavar="SOURCES",
+                        help="수집 주기 무시 (전체 또는 쉼표로 구분한 소스: gsc,bing,...)")
+    api.add_cache_args(parser)
+    args = parser.parse_args()
+    api.apply_cache_args(args)
+
+    if args.plan:
+        plan_run(history_runs=args.history)
+    elif args.command == "replay":
+        replay_spool()
+    else:
+        force = None
+        if args.force == "all":
+            force = True
+        elif args.force:
+            force = {f.strip() for f in args.force.split(",") if f.strip()}
+        main(force=force, cache_mode=args.cache_mode or "refresh")
@@ -15,7 +15,8 @@ from google.analytics.data_v1beta.types import (
     Filter, OrderBy
 )
 from google_auth import get_credentials
-from api import get
+import api
+from api import parse_cache_flags
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -81,48 +82,33 @@ def cmd_new():
     keyword = " ".join(sys.argv[2:])
     console.print(f"\n[bold]새 글 발행 분석: '{keyword}'[/]\n")
 
+    # 블로그 목록, 단어별 블로그당 글 수, 블로그별 전체 글 수, 관련 글 블로그별 집계를 요청 한 번에
+    # (전체 글 목록도, 관련 글 목록도 받지 않음)
+    words = [w for w in keyword.split() if len(w) >= 2]
+    found = api.search_posts(counts=words, totals=True, blogs=True, related=keyword, similar=words)
+
     # 1. 블로그 목록
-    blogs = get("/blogs")
+    blogs = found["blogs"]
     blog_map = {b["id"]: b for b in blogs}
 
-    # 2. 전체 글에서 블로그별 총 글 수
-    all_posts = get("/posts/search", params={"q": ""})
-    if isinstance(all_posts, dict):
-        all_posts = all_posts.get("results", [])
-
-    blog_total = {}
-    for p in all_posts:
-        bid = p.get("blog_id")
-        blog_total[bid] = blog_total.get(bid, 0) + 1
-
-    # 3. 키워드 관련 기존 글 조회
-    related = get("/posts/search", params={"q": keyword})
-    if isinstance(related, dict):
-        related = related.get("results", [])
-
-    blog_related = {}
-    blog_titles = {}
-    for p in related:
-        bid = p.get("blog_id")
-        blog_related[bid] = blog_related.get(bid, 0) + 1
-        if bid not in blog_titles:
-            blog_titles[bid] = []
-        blog_titles[bid].append(p.get("title", ""))
-
-    # 4. 키워드 단어별 검색 → 토픽 연관성
-    words = [w for w in keyword.split() if len(w) >= 2]
+    # 2. 블로그별 총 글 수
+    blog_total = found["totals"]
 
+    # 3. 키워드 관련 기존 글 (순위 검색 — 띄어쓰기가 다른 제목도 같은 명사면 포함)
+    #    블로그별 글 수 / 키워드 단어가 제목에 모두 포함된 글 수(높은 유사도) / 순위 상위 제목
+    related = found["related"]
+    blog_related = related["counts"]
+    blog_high_sim = related["similar"]
+    blog_titles = related["titles"]
+
+    # 4. 키워드 단어별 블로그당 글 수 → 토픽 연관성
     blog_topic_hits = {}
     for word in words:
-        wr = get("/posts/search", params={"q": word})
-        if isinstance(wr, dict):
-            wr = wr.get("results", [])
-        for p in wr:
-            bid = p.get("blog_id")
-            blog_topic_hits[bid] = blog_topic_hits.get(bid, 0) + 1
-
-    console.print(f"[cyan]'{keyword}' 관련 기존 글: {len(related)}건[/]")
-    if related:
+        for bid, n in found["counts"].get(word, {}).items():
+            blog_topic_hits[bid] = blog_topic_hits.get(bid, 0) + n
+
+    console.print(f"[cyan]'{keyword}' 관련 기존 글: {related['total']}건[/]")
+    if blog_related:
         for bid, cnt in sorted(blog_related.items(), key=lambda x: -x[1]):
             bname = blog_map.get(bid, {}).get("name", "?")
             console.print(f"  {bname}: {cnt}건")
@@ -143,13 +129,7 @@ def cmd_new():
         size_score = min(total, 500) * 0.1
 
         # 카니발리제이션 패널티: 제목 유사도까지 고려
-        titles_in_blog = blog_titles.get(bid, [])
-        # 키워드 단어가 제목에 모두 포함된 글 수 (높은 유사도)
-        high_sim = 0
-        for t in titles_in_blog:
-            t_lower = t.lower()
-            if all(w.lower() in t_lower for w in words):
-                high_sim += 1
+        high_sim = blog_high_sim.get(bid, 0)
 
         if related_cnt == 0:
             cannibal_penalty = 0
@@ -393,9 +373,7 @@ def run():
     # 3. D1: 키워드 관련 기존 글 수
     # ────────────────────────────────────────────
     console.print("\n[cyan]3. D1 기존 글 확인...[/]")
-    posts = get("/posts/search", params={"q": keyword})
-    if isinstance(posts, dict):
-        posts = posts.get("results", [])
+    posts = api.rank_posts(keyword, limit=10000)
 
     blog_post_counts = {}
     for p in posts:
@@ -514,6 +492,7 @@ def run():
 
 
 if __name__ == "__main__":
+    sys.argv[1:] = parse_cache_flags(sys.argv[1:])
     if len(sys.argv) >= 2 and sys.argv[1] == "new":
         cmd_new()
     else:
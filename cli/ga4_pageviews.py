@@ -6,7 +6,7 @@ from google.analytics.data_v1beta.types import (
     RunReportRequest, DateRange, Dimension, Metric
 )
 from google_auth import get_credentials
-from api import post
+from uploader import Uploader
 from rich.console import Console
 
 console = Console()
@@ -106,14 +106,13 @@ def run(days=30):
     console.print(f"저장: {backup}")
 
     if all_data:
-        try:
-            batch_size = 500
-            for i in range(0, len(all_data), batch_size):
-                batch = all_data[i:i+batch_size]
-                resp = post("/ga4/pageviews", {"data": batch})
-            console.print(f"[bold green]D1 업로드 완료[/]")
-        except Exception as e:
-            console.print(f"[yellow]D1 업로드 실패: {e}[/]")
+        uploader = Uploader(max_in_flight=4)
+        result = uploader.bulk("/ga4/pageviews", all_data, stage="ga4_pageviews")
+        stats = uploader.summary("ga4_pageviews")
+        if result.ok:
+            console.print(f"[bold green]D1 업로드 완료[/] — 요청 {stats['batches']}회, {stats['rows_per_sec']:,.0f}행/초")
+        else:
+            console.print(f"[yellow]D1 업로드 일부 실패: {result.failed}행 (오류율 {stats['error_rate']:.1%})[/]")
 
     return all_data
 
@@ -2,6 +2,7 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 import pickle
 import os
+import threading
 
 CREDENTIALS_FILE = "/Users/twinssn/Projects/blogdex/cli/client_secret_hugh7973.json"
 TOKEN_FILE = "/Users/twinssn/Projects/blogdex/credentials/token_1_twinssn.pickle"
@@ -15,7 +16,16 @@ SCOPES = [
     "https://www.googleapis.com/auth/siteverification",
 ]
 
+# daily_sync 스테이지가 동시에 호출해도 토큰 파일 갱신이 겹치지 않도록
+_lock = threading.Lock()
+
+
 def get_credentials():
+    with _lock:
+        return _load_credentials()
+
+
+def _load_credentials():
     creds = None
 
     if os.path.exists(TOKEN_FILE):
@@ -0,0 +1,121 @@
+"""GSC searchanalytics 페이지네이션 수집 + 스트리밍 집계"""
+import heapq
+from urllib.parse import urlsplit
+
+# searchanalytics.query 1회 최대 행 수
+GSC_MAX_PAGE_SIZE = 25000
+
+
+def iter_gsc_pages(service, site_url, body, page_size=GSC_MAX_PAGE_SIZE, limiter=None):
+    """startRow를 늘려가며 결과가 끝날 때까지 페이지(행 목록) 단위로 yield
+
+    body에는 startDate/endDate/dimensions 등을 넣고 rowLimit/startRow는 여기서 채움.
+    limiter(RateLimiter)가 있으면 페이지 호출마다 적용.
+    """
+    page_size = min(page_size, GSC_MAX_PAGE_SIZE)
+    start_row = 0
+    while True:
+        req = service.searchanalytics().query(
+            siteUrl=site_url,
+            body={**body, "rowLimit": page_size, "startRow": start_row},
+        )
+        if limiter:
+            with limiter:
+                resp = req.execute()
+        else:
+            resp = req.execute()
+        rows = resp.get("rows", [])
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        start_row += len(rows)
+
+
+class SiteAggregate:
+    """사이트 하나의 GSC 행을 스트리밍 집계
+
+    클릭/노출 합계는 모든 행 기준으로 정확하게 누적하고,
+    키워드는 노출 상위 top_n개만 힙으로 보관 (전체 행을 메모리에 두지 않음).
+    """
+
+    def __init__(self, top_n=100):
+        self.top_n = top_n
+        self.clicks = 0
+        self.impressions = 0
+        self.row_count = 0
+        self._heap = []
+
+    def add(self, row):
+        self.clicks += row["clicks"]
+        self.impressions += row["impressions"]
+        self.row_count += 1
+        if self.top_n <= 0:
+            return
+        # 노출이 같으면 먼저 들어온 행 우선 (sorted(..., reverse=True)의 안정 정렬과 동일)
+        item = (row["impressions"], -self.row_count, row)
+        if len(self._heap) < self.top_n:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def add_rows(self, rows):
+        for row in rows:
+            self.add(row)
+
+    @property
+    def ctr(self):
+        return (self.clicks / self.impressions * 100) if self.impressions > 0 else 0
+
+    def top_rows(self):
+        return [r for _, _, r in sorted(self._heap, key=lambda x: x[:2], reverse=True)]
+
+    def keywords(self):
+        """스냅샷 top_keywords 형식으로 변환"""
+        keywords = []
+        for row in self.top_rows():
+            keywords.append({
+                "query": row["keys"][0],
+                "page": row["keys"][1] if len(row["keys"]) > 1 else "",
+                "clicks": int(row["clicks"]),
+                "impressions": int(row["impressions"]),
+                "ctr": round(row["ctr"] * 100, 2),
+                "position": round(row["position"], 1)
+            })
+        return keywords
+
+
+def page_host(url):
+    """페이지 URL → 소문자 호스트명 (포트 제외, 파싱 실패 시 빈 문자열)"""
+    try:
+        return urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+
+
+class HostRouter:
+    """도메인 속성 행을 페이지 호스트별 집계로 분배 (한 번 훑기)
+
+    호스트는 정확히 일치해야 함 — 5.example.kr 집계에 65.example.kr 행이 섞이지 않음.
+    같은 페이지가 쿼리마다 반복되므로 페이지 → 호스트 파싱 결과를 캐시.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = {host.lower(): agg for host, agg in buckets.items()}
+        self.unmatched = 0
+        self._hosts = {}
+
+    def add_rows(self, rows):
+        get_bucket = self.buckets.get
+        hosts = self._hosts
+        for r in rows:
+            keys = r.get("keys") or ()
+            page = keys[1] if len(keys) > 1 else ""
+            host = hosts.get(page)
+            if host is None:
+                host = hosts[page] = page_host(page)
+            agg = get_bucket(host)
+            if agg is None:
+                self.unmatched += 1
+            else:
+                agg.add(r)
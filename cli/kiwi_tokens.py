@@ -0,0 +1,86 @@
+"""Kiwi 형태소 분석 기반 키워드/검색 토큰
+
+    extract_keywords("전기차보조금 신청 방법")  # 핵심 키워드 (최대 8개, local_api 크롤링 결과용)
+    index_tokens("전기차보조금 신청 방법")      # 검색 인덱스 토큰 — my_posts.search_tokens
+    query_tokens("전기차 보조금")               # 검색어 토큰 — 띄어쓰기와 상관없이 같은 명사
+
+띄어쓰기가 달라도("전기차보조금" / "전기차 보조금") 명사 단위 토큰은 같으므로
+인덱스에는 명사 + 복합명사를, 검색어는 명사만 AND로 맞춤 (복합명사는 순위 가산용)
+Kiwi 모델 로딩이 느려서(1초 안팎) 처음 쓸 때 한 번만 생성
+"""
+import re
+
+STOP_NOUNS = {'것','수','등','때','곳','중','위','점','편','집','방','후','날','분','말','개','줄','번','가지','이유','방법','정리','총정리','완벽','가이드','추천','비교','후기','리뷰','만들기','하기','보기','알아보기','확인','안내','소개','설명','정보','내용','사용','이용','활용','경우','사람','사이트','블로그','포스팅','글','목록','리스트','TOP','top','가격','방송','특집'}
+
+_kiwi = None
+
+
+def _get_kiwi():
+    global _kiwi
+    if _kiwi is None:
+        from kiwipiepy import Kiwi
+        _kiwi = Kiwi()
+    return _kiwi
+
+
+def _split(text):
+    """(명사 목록, 복합명사 목록, Kiwi 토큰)"""
+    tokens = _get_kiwi().tokenize(text or "")
+    nouns = []
+    for token in tokens:
+        if token.tag.startswith('NNG') or token.tag.startswith('NNP'):
+            if len(token.form) >= 2 and token.form not in STOP_NOUNS:
+                nouns.append(token.form)
+    # 복합명사 처리: 연속 명사는 합치기
+    compounds = []
+    i = 0
+    while i < len(tokens):
+        if tokens[i].tag.startswith('NN') and len(tokens[i].form) >= 2:
+            compound = tokens[i].form
+            j = i + 1
+            while j < len(tokens) and tokens[j].tag.startswith('NN') and tokens[j].start == tokens[j-1].start + len(tokens[j-1].form):
+                compound += tokens[j].form
+                j += 1
+            if len(compound) >= 3 and compound != tokens[i].form:
+                compounds.append(compound)
+            i = j
+        else:
+            i += 1
+    return nouns, compounds, tokens
+
+
+def extract_keywords(title):
+    """Kiwi로 핵심 명사 추출"""
+    nouns, compounds, _ = _split(title)
+    all_keywords = list(dict.fromkeys(compounds + nouns))
+    return all_keywords[:8]
+
+
+def _normalize(form):
+    # FTS5 unicode61 토크나이저가 공백/구두점으로 다시 쪼개므로 토큰 안의 구분자는 제거
+    return re.sub(r"[^\w]", "", form).lower()
+
+
+def _terms(tokens, nouns):
+    """명사 + 영문(SL)/숫자(SN)"""
+    terms = list(nouns)
+    for token in tokens:
+        if token.tag in ("SL", "SN") and len(token.form) >= 2:
+            terms.append(token.form)
+    return terms
+
+
+def index_tokens(text):
+    """검색 인덱스용 토큰 (명사 + 복합명사 + 영문/숫자, 개수 제한 없음)"""
+    nouns, compounds, tokens = _split(text)
+    out = (_normalize(t) for t in compounds + _terms(tokens, nouns))
+    return list(dict.fromkeys(t for t in out if t))
+
+
+def query_tokens(text):
+    """검색어 토큰 (명사 + 영문/숫자) — 명사가 하나도 없으면 공백 단위 단어"""
+    nouns, _, tokens = _split(text)
+    out = [_normalize(t) for t in _terms(tokens, nouns)]
+    if not any(out):
+        out = [_normalize(w) for w in (text or "").split()]
+    return list(dict.fromkeys(t for t in out if t))
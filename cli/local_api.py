@@ -11,44 +11,13 @@ import os
 sys.path.insert(0, os.path.dirname(__file__))
 
 from flask import Flask, request, jsonify
-from kiwipiepy import Kiwi
-kiwi = Kiwi()
 from flask_cors import CORS
 import httpx
 import re
 import json
 from urllib.parse import urlparse, unquote
 
-
-
-STOP_NOUNS = {'것','수','등','때','곳','중','위','점','편','집','방','후','날','분','말','개','줄','번','가지','이유','방법','정리','총정리','완벽','가이드','추천','비교','후기','리뷰','만들기','하기','보기','알아보기','확인','안내','소개','설명','정보','내용','사용','이용','활용','경우','사람','사이트','블로그','포스팅','글','목록','리스트','TOP','top','가격','방송','특집'}
-
-def extract_keywords(title):
-    """Kiwi로 핵심 명사 추출"""
-    tokens = kiwi.tokenize(title)
-    nouns = []
-    for token in tokens:
-        if token.tag.startswith('NNG') or token.tag.startswith('NNP'):
-            if len(token.form) >= 2 and token.form not in STOP_NOUNS:
-                nouns.append(token.form)
-    # 복합명사 처리: 연속 명사는 합치기
-    compounds = []
-    i = 0
-    while i < len(tokens):
-        if tokens[i].tag.startswith('NN') and len(tokens[i].form) >= 2:
-            compound = tokens[i].form
-            j = i + 1
-            while j < len(tokens) and tokens[j].tag.startswith('NN') and tokens[j].start == tokens[j-1].start + len(tokens[j-1].form):
-                compound += tokens[j].form
-                j += 1
-            if len(compound) >= 3 and compound != tokens[i].form:
-                compounds.append(compound)
-            i = j
-        else:
-            i += 1
-    
-    all_keywords = list(dict.fromkeys(compounds + nouns))
-    return all_keywords[:8]
+from kiwi_tokens import extract_keywords
 
 
 app = Flask(__name__)
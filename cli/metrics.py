@@ -0,0 +1,87 @@
+"""실행 단위 메트릭 - 스테이지/사이트별 소요 시간, API 호출 수, 행 수, 바이트, 재시도/오류
+
+    m = Metrics()
+    with m.timer("site_seconds", source="gsc", site=name):
+        ...
+    m.inc("api_calls", api="bing", endpoint="GetQueryStats")
+    m.write_jsonl(path, run_id=...)   # 실행마다 한 줄 추가 (추세 분석용)
+    m.write_prometheus(path)          # node_exporter textfile collector용 (매 실행 교체)
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from checkpoint import atomic_writer
+
+
+class Metrics:
+    def __init__(self, prefix="blogdex"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._values = {}  # (name, ((label, value), ...)) → float
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._values[self._key(name, labels)] = value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """블록 소요 시간(초)을 name에 누적"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.inc(name, time.monotonic() - start, **labels)
+
+    def snapshot(self):
+        """[{"name", "labels", "value"}] (이름/라벨 순 정렬)"""
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            {"name": name, "labels": dict(labels), "value": round(value, 3) if isinstance(value, float) else value}
+            for (name, labels), value in items
+        ]
+
+    def write_jsonl(self, path, **fields):
+        """실행 하나 = JSON 한 줄로 추가"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        line = {"ts": datetime.now().isoformat(), **fields, "metrics": self.snapshot()}
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    def write_prometheus(self, path):
+        """Prometheus 텍스트 형식으로 교체 저장 (임시 파일 → rename, 수집기가 반쯤 쓰인 파일을 읽지 않게)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = []
+        typed = set()
+        for m in self.snapshot():
+            name = f"{self.prefix}_{m['name']}"
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} gauge")
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in m["labels"].items())
+            lines.append(f"{name}{{{labels}}} {m['value']}" if labels else f"{name} {m['value']}")
+        lines.append(f"# TYPE {self.prefix}_last_run_timestamp_seconds gauge")
+        lines.append(f"{self.prefix}_last_run_timestamp_seconds {int(time.time())}")
+
+        # node_exporter가 다른 사용자로 읽으므로 0644
+        with atomic_writer(path, mode=0o644) as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,127 @@
+"""네이버 뉴스 검색 비동기 수집 - 쿼리 동시 조회 + 속도 제한 + start= 페이지네이션
+
+    items, stats = collect(queries, client_id, client_secret, pages=2)
+    # items: [(query, item)]  stats: {"calls", "errors", "items"}
+"""
+import asyncio
+import re
+import time
+from html import unescape
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+NAVER_NEWS_API = "https://openapi.naver.com/v1/search/news.json"
+NAVER_MAX_DISPLAY = 100  # 1회 최대 결과 수
+NAVER_MAX_START = 1000   # start 파라미터 최대값
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+_TRACKING_PARAMS = re.compile(r"^(utm_|fbclid$|gclid$|ref$|from$)")
+
+
+def clean(text):
+    """HTML 엔티티/태그 제거 + 공백 정리"""
+    if not text:
+        return ""
+    return _SPACE_RE.sub(" ", _TAG_RE.sub("", unescape(text))).strip()
+
+
+def normalize_link(url):
+    """중복 판정용 링크 정규화 — scheme/host 소문자, www/m. 접두어, 추적 파라미터, fragment, 끝 / 제거"""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    host = (parts.hostname or "").lower()
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not _TRACKING_PARAMS.match(k)))
+    return urlunsplit(("https", host, parts.path.rstrip("/"), query, ""))
+
+
+class AsyncRateLimiter:
+    """초당 rate회 — 호출 시각을 1/rate 간격으로 예약 (이벤트 루프 하나 안에서만 사용)"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+async def _search(client, limiter, query, start, display, stats, retries=3):
+    params = {"query": query, "display": display, "start": start, "sort": "date"}
+    for attempt in range(retries + 1):
+        await limiter.acquire()
+        stats["calls"] += 1
+        try:
+            r = await client.get(NAVER_NEWS_API, params=params)
+        except httpx.HTTPError:
+            if attempt >= retries:
+                raise
+        else:
+            if r.status_code != 429 and r.status_code < 500:
+                r.raise_for_status()
+                return r.json().get("items", [])
+            if attempt >= retries:
+                r.raise_for_status()
+        await asyncio.sleep(0.5 * 2 ** attempt)
+
+
+async def _collect_query(client, limiter, query, pages, display, stats):
+    items = []
+    for page in range(pages):
+        start = 1 + page * display
+        if start > NAVER_MAX_START:
+            break
+        try:
+            batch = await _search(client, limiter, query, start, display, stats)
+        except Exception as e:
+            if not items:
+                raise
+            # 뒤 페이지만 실패하면 받은 결과는 유지
+            stats["errors"] += 1
+            stats["failed_queries"].append((f"{query} (start={start})", str(e)))
+            break
+        items.extend((query, it) for it in batch)
+        if len(batch) < display:
+            break
+    return items
+
+
+async def _collect(queries, client_id, client_secret, pages, display, qps, timeout):
+    headers = {"X-Naver-Client-Id": client_id, "X-Naver-Client-Secret": client_secret}
+    limiter = AsyncRateLimiter(qps)
+    stats = {"calls": 0, "errors": 0, "failed_queries": []}
+    async with httpx.AsyncClient(headers=headers, timeout=timeout) as client:
+        results = await asyncio.gather(
+            *(_collect_query(client, limiter, q, pages, display, stats) for q in queries),
+            return_exceptions=True,
+        )
+    items = []
+    for query, res in zip(queries, results):
+        if isinstance(res, Exception):
+            stats["errors"] += 1
+            stats["failed_queries"].append((query, str(res)))
+            continue
+        items.extend(res)
+    stats["items"] = len(items)
+    return items, stats
+
+
+def collect(queries, client_id, client_secret, pages=2, display=NAVER_MAX_DISPLAY, qps=8.0, timeout=10):
+    """모든 쿼리를 동시에 조회 (전체 호출은 초당 qps회로 제한) → ([(query, item)], stats)
+
+    쿼리당 최대 pages페이지 × display건. 실패한 쿼리는 stats["failed_queries"]에 (query, error)
+    """
+    display = max(1, min(display, NAVER_MAX_DISPLAY))
+    return asyncio.run(_collect(list(queries), client_id, client_secret, pages, display, qps, timeout))
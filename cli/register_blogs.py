@@ -1,5 +1,6 @@
+import sys
 import yaml
-from api import get, post
+from api import get, post, parse_cache_flags
 from rich.console import Console
 from rich.table import Table
 from rich import box
@@ -56,4 +57,5 @@ def run():
     console.print(f"\n총 {len(blogs)}개 블로그 등록 완료")
 
 if __name__ == "__main__":
+    sys.argv[1:] = parse_cache_flags(sys.argv[1:])
     run()
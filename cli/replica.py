@@ -0,0 +1,451 @@
+"""D1 테이블 로컬 SQLite 복제본 - id 워터마크 증분 pull + 조회 레이어
+
+    python replica.py sync                 # 증분 (처음이면 전체)
+    python replica.py sync --full my_posts # 특정 테이블 다시 받기
+    python replica.py status
+
+복제본이 있으면 api.get이 지원하는 GET 경로(/blogs, /posts/search 등)를 로컬에서 응답.
+BLOGDEX_REPLICA_MAX_AGE시간(기본 24)보다 오래됐으면 네트워크로, 네트워크가 안 되면 나이와 상관없이 로컬로.
+BLOGDEX_REPLICA=0이면 사용 안 함.
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+REPLICA_PATH = Path(os.getenv("BLOGDEX_REPLICA_PATH", str(Path(__file__).parent / "replica.db")))
+MAX_AGE_HOURS = float(os.getenv("BLOGDEX_REPLICA_MAX_AGE", "24"))
+PAGE_SIZE = 5000
+FTS_MAX_TOKENS = 16  # worker /posts/fts와 같은 상한
+SEARCH_BATCH_MAX = 30  # worker /posts/search/batch와 같은 상한
+
+# 테이블 → 자연키 (INSERT OR REPLACE로 D1에서 새 id가 된 행이 옛 행을 대체하도록 UNIQUE 인덱스)
+# refresh_hours: UPDATE가 있는 테이블은 id 워터마크로 변경을 못 잡으므로 이 주기마다 전체 다시 받기
+TABLES = {
+    "blogs": {"key": None, "refresh_hours": 0},
+    "my_posts": {"key": None, "refresh_hours": 24},           # /posts/update-urls
+    "collected_titles": {"key": None, "refresh_hours": 24},   # /titles/status
+    "gsc_daily": {"key": ("site", "date")},
+    "gsc_keywords": {"key": ("site", "date", "query")},
+    "ga4_pageviews": {"key": ("site", "date", "page")},
+    "bing_daily": {"key": ("site", "date")},
+    "bing_keywords": {"key": ("site", "date", "query")},
+}
+INDEXES = {
+    "my_posts": [("blog_id",)],
+    "gsc_daily": [("date",)],
+    "gsc_keywords": [("date",), ("query",)],
+    "ga4_pageviews": [("date",)],
+    "bing_daily": [("date",)],
+    "bing_keywords": [("date",)],
+}
+
+MISS = object()  # 로컬에서 답할 수 없음
+
+
+class Replica:
+    def __init__(self, path=REPLICA_PATH):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    @property
+    def db(self):
+        # sqlite3 연결은 스레드 간 공유 불가 → 스레드별 연결
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _replica_meta (name TEXT PRIMARY KEY, last_id INTEGER DEFAULT 0,"
+                " synced_at TEXT, full_at TEXT, rows INTEGER DEFAULT 0)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def meta(self, name):
+        row = self.db.execute("SELECT * FROM _replica_meta WHERE name = ?", (name,)).fetchone()
+        return dict(row) if row else None
+
+    def _columns(self, name):
+        return [r["name"] for r in self.db.execute(f"PRAGMA table_info({name})")]
+
+    def _ensure_table(self, name, columns):
+        """첫 응답의 컬럼으로 테이블 생성, 이후 새 컬럼이 보이면 추가"""
+        existing = self._columns(name)
+        if not existing:
+            cols = ", ".join(f'"{c}"' for c in columns if c != "id")
+            self.db.execute(f'CREATE TABLE {name} (id INTEGER PRIMARY KEY, {cols})')
+            key = TABLES[name]["key"]
+            if key:
+                self.db.execute(f"CREATE UNIQUE INDEX ux_{name} ON {name} ({', '.join(key)})")
+            for idx in INDEXES.get(name, []):
+                self.db.execute(f"CREATE INDEX ix_{name}_{'_'.join(idx)} ON {name} ({', '.join(idx)})")
+            return
+        for c in columns:
+            if c not in existing:
+                self.db.execute(f'ALTER TABLE {name} ADD COLUMN "{c}"')
+
+    def sync_table(self, name, full=False):
+        """테이블 하나 pull → 받은 행 수
+
+        증분은 페이지마다 행 + 워터마크를 한 트랜잭션으로 커밋 (중간에 끊겨도 이어받기).
+        전체 다시 받기는 마지막에 한 번 커밋 (받는 동안 다른 CLI는 이전 내용을 봄)
+        """
+        from api import get
+
+        meta = self.meta(name) or {}
+        refresh = TABLES[name].get("refresh_hours")
+        if refresh is not None and not full:
+            full_at = meta.get("full_at")
+            full = not full_at or datetime.fromisoformat(full_at) < datetime.now() - timedelta(hours=refresh)
+        after_id = 0 if full else meta.get("last_id") or 0
+
+        db = self.db
+        received = 0
+        try:
+            if full and self._columns(name):
+                db.execute(f"DELETE FROM {name}")
+            while True:
+                page = get(f"/replica/{name}", {"after_id": after_id, "limit": PAGE_SIZE})
+                rows = page.get("rows", [])
+                if rows:
+                    columns = list(rows[0].keys())
+                    self._ensure_table(name, columns)
+                    cols = ", ".join(f'"{c}"' for c in columns)
+                    marks = ", ".join("?" for _ in columns)
+                    db.executemany(f"INSERT OR REPLACE INTO {name} ({cols}) VALUES ({marks})",
+                                   [tuple(r.get(c) for c in columns) for r in rows])
+                    received += len(rows)
+                after_id = page.get("last_id", after_id)
+                if not full:
+                    self._save_meta(name, after_id)
+                    db.commit()
+                if len(rows) < PAGE_SIZE:
+                    break
+        except BaseException:
+            db.rollback()
+            raise
+        if name == "my_posts" and (received or full):
+            self._rebuild_fts()
+        count = db.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0] if self._columns(name) else 0
+        self._save_meta(name, after_id, full=full, count=count)
+        db.commit()
+        return received
+
+    def _rebuild_fts(self):
+        """my_posts.search_tokens → posts_fts (D1 posts_fts와 같은 구성, 만 단위라 매번 통째로)
+        D1에 search_tokens가 아직 없거나 sqlite에 FTS5가 없으면 건너뜀 → /posts/fts는 네트워크로"""
+        if "search_tokens" not in self._columns("my_posts"):
+            return
+        try:
+            self.db.execute("DROP TABLE IF EXISTS posts_fts")
+            self.db.execute("CREATE VIRTUAL TABLE posts_fts USING fts5(tokens, tokenize = 'unicode61')")
+        except sqlite3.OperationalError:
+            return
+        self.db.execute(
+            "INSERT INTO posts_fts (rowid, tokens) SELECT id, search_tokens FROM my_posts"
+            " WHERE search_tokens IS NOT NULL AND search_tokens != ''"
+        )
+
+    def _save_meta(self, name, last_id, full=False, count=None):
+        now = datetime.now().isoformat(timespec="seconds")
+        self.db.execute(
+            "INSERT INTO _replica_meta (name, last_id, synced_at, full_at, rows) VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT(name) DO UPDATE SET last_id = excluded.last_id, synced_at = excluded.synced_at,"
+            " full_at = COALESCE(excluded.full_at, full_at), rows = COALESCE(excluded.rows, rows)",
+            (name, last_id, now, now if full else None, count),
+        )
+
+    def sync(self, tables=None, full=()):
+        """{테이블: 받은 행 수} — full에 있는 테이블은 전체 다시 받기"""
+        out = {}
+        for name in tables or TABLES:
+            start = time.monotonic()
+            out[name] = self.sync_table(name, full=name in full)
+            console.print(f"  [cyan]{name}[/]: {out[name]:,}행 ({time.monotonic() - start:.1f}초)")
+        return out
+
+    def age(self, tables):
+        """tables 중 가장 오래된 동기화 시점으로부터 경과 시간 (한 번도 안 받은 테이블이 있으면 None)"""
+        oldest = None
+        for name in tables:
+            meta = self.meta(name)
+            if not meta or not meta.get("synced_at") or not self._columns(name):
+                return None
+            synced = datetime.fromisoformat(meta["synced_at"])
+            oldest = synced if oldest is None or synced < oldest else oldest
+        return datetime.now() - oldest if oldest else None
+
+    def rows(self, sql, params=()):
+        return [dict(r) for r in self.db.execute(sql, params)]
+
+    def answer(self, path, params=None, max_age_hours=MAX_AGE_HOURS):
+        """Worker GET 응답과 같은 모양의 결과, 지원하지 않거나 오래됐으면 MISS"""
+        handler = HANDLERS.get(path)
+        if handler is None:
+            return MISS
+        fn, tables = handler
+        age = self.age(tables)
+        if age is None or (max_age_hours is not None and age > timedelta(hours=max_age_hours)):
+            return MISS
+        return fn(self, dict(params or {}))
+
+
+# === 조회 레이어 — worker/src/index.js의 같은 경로와 같은 SQL/모양 ===
+
+def _page_limit(p):
+    return min(max(int(p.get("limit") or 1000), 1), 5000)
+
+
+def _next_cursor(rows, limit):
+    return rows[-1]["id"] if len(rows) == limit else None
+
+
+def _blogs(r, p):
+    return r.rows("SELECT * FROM blogs ORDER BY id")
+
+
+def _posts_search(r, p):
+    pattern = f"%{p.get('q', '')}%"
+    sql = ("SELECT p.*, b.name as blog_name, b.platform FROM my_posts p JOIN blogs b ON p.blog_id = b.id"
+           " WHERE (p.title LIKE ? OR p.keywords LIKE ?)")
+    binds = [pattern, pattern]
+    if p.get("blog_id"):
+        sql += " AND p.blog_id = ?"
+        binds.append(int(p["blog_id"]))
+    if p.get("after_id") is not None:
+        limit = _page_limit(p)
+        rows = r.rows(sql + " AND p.id > ? ORDER BY p.id LIMIT ?", binds + [int(p["after_id"]), limit])
+        return {"results": rows, "next": _next_cursor(rows, limit)}
+    sql += " ORDER BY p.published_at DESC LIMIT 10000"
+    return {"results": r.rows(sql, binds)}
+
+
+def _posts_fts(r, p):
+    """GET /posts/fts — bm25 순위 + 토큰 없는 글 LIKE 보충"""
+    if not r.rows("SELECT name FROM sqlite_master WHERE name = 'posts_fts'"):
+        return MISS
+    limit = min(int(p.get("limit") or 50), 10000)
+    op = " OR " if p.get("mode") == "any" else " AND "
+    blog_where = " AND p.blog_id = ?" if p.get("blog_id") else ""
+    blog_bind = [int(p["blog_id"])] if p.get("blog_id") else []
+    tokens = str(p.get("tokens") or "").split()[:FTS_MAX_TOKENS]
+    results = []
+    if tokens:
+        match = op.join('"' + t.replace('"', '""') + '"' for t in tokens)
+        results += r.rows(
+            "SELECT p.*, b.name as blog_name, b.platform, -bm25(posts_fts) as score FROM posts_fts"
+            " JOIN my_posts p ON p.id = posts_fts.rowid JOIN blogs b ON p.blog_id = b.id"
+            f" WHERE posts_fts MATCH ?{blog_where} ORDER BY bm25(posts_fts) LIMIT ?", [match] + blog_bind + [limit])
+    if p.get("q"):
+        pattern = f"%{p['q']}%"
+        results += r.rows(
+            "SELECT p.*, b.name as blog_name, b.platform, 0 as score FROM my_posts p JOIN blogs b ON p.blog_id = b.id"
+            f" WHERE (p.search_tokens IS NULL OR p.search_tokens = '') AND (p.title LIKE ? OR p.keywords LIKE ?){blog_where}"
+            " ORDER BY p.published_at DESC LIMIT ?", [pattern, pattern] + blog_bind + [limit])
+    return {"results": results[:limit]}
+
+
+def _titles_search(r, p):
+    if p.get("after_id") is not None:
+        limit = _page_limit(p)
+        rows = r.rows("SELECT * FROM collected_titles WHERE title LIKE ? AND id > ? ORDER BY id LIMIT ?",
+                      (f"%{p.get('q', '')}%", int(p["after_id"]), limit))
+        return {"results": rows, "next": _next_cursor(rows, limit)}
+    titles = r.rows("SELECT * FROM collected_titles WHERE title LIKE ? ORDER BY id DESC LIMIT 50",
+                    (f"%{p.get('q', '')}%",))
+    enriched = []
+    for t in titles:
+        words = [w for w in t["title"].split() if len(w) >= 2][:3]
+        seen = set()
+        matched = []
+        for w in words:
+            for post in r.rows("SELECT p.title, p.url, b.name as blog_name, b.platform FROM my_posts p"
+                               " JOIN blogs b ON p.blog_id = b.id WHERE p.title LIKE ? LIMIT 5", (f"%{w}%",)):
+                k = post["url"] or post["title"]
+                if k in seen:
+                    continue
+                seen.add(k)
+                # 2개 이상 키워드 매칭된 것만
+                if sum(1 for x in words if post["title"] and x in post["title"]) >= 2:
+                    matched.append(post)
+        enriched.append({**t, "published_in": matched[:3]})
+    return enriched
+
+
+def _gsc_daily(r, p):
+    days = p.get("days", "30")
+    if p.get("site"):
+        return r.rows("SELECT * FROM gsc_daily WHERE site = ? AND date >= date('now', '-' || ? || ' days')"
+                      " ORDER BY date", (p["site"], days))
+    return r.rows(
+        "SELECT date, SUM(clicks) as clicks, SUM(impressions) as impressions, CASE WHEN SUM(impressions) > 0"
+        " THEN ROUND(SUM(clicks) * 100.0 / SUM(impressions), 2) ELSE 0 END as ctr FROM gsc_daily"
+        " WHERE date >= date('now', '-' || ? || ' days') GROUP BY date ORDER BY date", (days,))
+
+
+def _gsc_sites(r, p):
+    return r.rows(
+        "SELECT site, SUM(clicks) as clicks, SUM(impressions) as impressions, CASE WHEN SUM(impressions) > 0"
+        " THEN ROUND(SUM(clicks) * 100.0 / SUM(impressions), 2) ELSE 0 END as ctr FROM gsc_daily"
+        " WHERE date >= date('now', '-' || ? || ' days') GROUP BY site ORDER BY impressions DESC",
+        (p.get("days", "30"),))
+
+
+def _since(p):
+    return (datetime.now() - timedelta(days=int(p.get("days", "30")))).strftime("%Y-%m-%d")
+
+
+def _bing_daily(r, p):
+    sql, binds = "SELECT * FROM bing_daily WHERE date >= ?", [_since(p)]
+    if p.get("site"):
+        sql += " AND site = ?"
+        binds.append(p["site"])
+    return r.rows(sql + " ORDER BY date DESC, site", binds)
+
+
+def _bing_keywords(r, p):
+    sql = ("SELECT site, query, SUM(clicks) as clicks, SUM(impressions) as impressions,"
+           " ROUND(AVG(position),1) as position FROM bing_keywords WHERE date >= ?")
+    binds = [_since(p)]
+    if p.get("site"):
+        sql += " AND site = ?"
+        binds.append(p["site"])
+    binds.append(int(p.get("limit", "100")))
+    return r.rows(sql + " GROUP BY site, query ORDER BY impressions DESC LIMIT ?", binds)
+
+
+def _search_batch(r, p):
+    """POST /posts/search/batch와 같은 모양 — 패턴별 글 목록/블로그별 글 수"""
+    where = "(p.title LIKE ? OR p.keywords LIKE ?)" + (" AND p.blog_id = ?" if p.get("blog_id") else "")
+
+    def binds(q):
+        return [f"%{q}%", f"%{q}%"] + ([int(p["blog_id"])] if p.get("blog_id") else [])
+
+    def by_blog(sql, params):
+        return {row["blog_id"]: row["n"] for row in r.rows(sql, params)}
+
+    out = {"hits": {}, "counts": {}}
+    for q in p.get("hits", []):
+        out["hits"][q] = r.rows(
+            "SELECT p.*, b.name as blog_name, b.platform FROM my_posts p JOIN blogs b ON p.blog_id = b.id"
+            f" WHERE {where} ORDER BY p.published_at DESC LIMIT ?", binds(q) + [int(p.get("limit") or 10000)])
+    for q in p.get("counts", []):
+        out["counts"][q] = by_blog(f"SELECT p.blog_id, COUNT(*) as n FROM my_posts p WHERE {where} GROUP BY p.blog_id",
+                                   binds(q))
+    if p.get("totals"):
+        out["totals"] = by_blog("SELECT blog_id, COUNT(*) as n FROM my_posts GROUP BY blog_id", ())
+    if p.get("blogs"):
+        out["blogs"] = _blogs(r, p)
+    if (p.get("related") or {}).get("q"):
+        related = _related(r, p["related"], p.get("blog_id"))
+        if related is MISS:
+            return MISS
+        out["related"] = related
+    return out
+
+
+def _related(r, rel, blog_id):
+    """/posts/search/batch의 related — 관련 글 집합을 블로그별 글 수/유사 제목 수/상위 제목으로 집계"""
+    tokens = str(rel.get("tokens") or "").split()[:FTS_MAX_TOKENS]
+    words = list(rel.get("words") or [])[:SEARCH_BATCH_MAX]
+    pattern = f"%{rel['q']}%"
+    blog_where = " AND p.blog_id = ?" if blog_id else ""
+    blog_bind = [int(blog_id)] if blog_id else []
+    if tokens:
+        if not r.rows("SELECT name FROM sqlite_master WHERE name = 'posts_fts'"):
+            return MISS
+        op = " OR " if rel.get("mode") == "any" else " AND "
+        match = op.join('"' + t.replace('"', '""') + '"' for t in tokens)
+        rel_sql = ("SELECT p.blog_id, p.title, p.published_at, -bm25(posts_fts) AS score FROM posts_fts"
+                   f" JOIN my_posts p ON p.id = posts_fts.rowid WHERE posts_fts MATCH ?{blog_where}"
+                   " UNION ALL SELECT p.blog_id, p.title, p.published_at, 0 FROM my_posts p"
+                   f" WHERE (p.search_tokens IS NULL OR p.search_tokens = '') AND (p.title LIKE ? OR p.keywords LIKE ?){blog_where}")
+        rel_binds = [match] + blog_bind + [pattern, pattern] + blog_bind
+    else:
+        rel_sql = ("SELECT p.blog_id, p.title, p.published_at, 0 AS score FROM my_posts p"
+                   f" WHERE (p.title LIKE ? OR p.keywords LIKE ?){blog_where}")
+        rel_binds = [pattern, pattern] + blog_bind
+    similar = " AND ".join("instr(lower(title), lower(?)) > 0" for _ in words) or "1"
+    out = {"total": 0, "counts": {}, "similar": {}, "titles": {}}
+    for row in r.rows(f"WITH rel AS ({rel_sql}) SELECT blog_id, COUNT(*) AS n, SUM({similar}) AS similar"
+                      " FROM rel GROUP BY blog_id", rel_binds + words):
+        out["total"] += row["n"]
+        out["counts"][row["blog_id"]] = row["n"]
+        out["similar"][row["blog_id"]] = row["similar"]
+    for row in r.rows(f"WITH rel AS ({rel_sql}) SELECT blog_id, title FROM (SELECT blog_id, title, ROW_NUMBER() OVER"
+                      " (PARTITION BY blog_id ORDER BY score DESC, published_at DESC) AS rn FROM rel)"
+                      " WHERE rn <= ? ORDER BY blog_id, rn", rel_binds + [min(int(rel.get("titles") or 5), 50)]):
+        out["titles"].setdefault(row["blog_id"], []).append(row["title"])
+    return out
+
+
+HANDLERS = {
+    "/blogs": (_blogs, ("blogs",)),
+    "/posts/search": (_posts_search, ("my_posts", "blogs")),
+    "/titles/search": (_titles_search, ("collected_titles", "my_posts", "blogs")),
+    "/gsc/daily": (_gsc_daily, ("gsc_daily",)),
+    "/gsc/sites": (_gsc_sites, ("gsc_daily",)),
+    "/bing/daily": (_bing_daily, ("bing_daily",)),
+    "/bing/keywords": (_bing_keywords, ("bing_keywords",)),
+    "/posts/search/batch": (_search_batch, ("my_posts", "blogs")),
+    "/posts/fts": (_posts_fts, ("my_posts", "blogs")),
+}
+
+_default = None
+
+
+def default():
+    """api.get이 쓰는 복제본 (파일이 없거나 BLOGDEX_REPLICA=0이면 None)"""
+    global _default
+    if os.getenv("BLOGDEX_REPLICA") == "0" or not REPLICA_PATH.exists():
+        return None
+    if _default is None:
+        _default = Replica(REPLICA_PATH)
+    return _default
+
+
+def print_status(replica):
+    table = Table(title=f"복제본 {replica.path}")
+    table.add_column("테이블", style="cyan")
+    table.add_column("행", justify="right", style="green")
+    table.add_column("워터마크 id", justify="right")
+    table.add_column("마지막 동기화")
+    table.add_column("전체 다시 받기")
+    for name in TABLES:
+        meta = replica.meta(name) or {}
+        table.add_row(name, f"{meta.get('rows', 0):,}", str(meta.get("last_id", "-")),
+                      meta.get("synced_at") or "-", meta.get("full_at") or "-")
+    console.print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="D1 로컬 복제본")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_sync = sub.add_parser("sync", help="증분 동기화")
+    p_sync.add_argument("tables", nargs="*", help=f"기본: 전체 ({', '.join(TABLES)})")
+    p_sync.add_argument("--full", action="store_true", help="지정한 테이블(없으면 전체)을 처음부터 다시 받기")
+    sub.add_parser("status", help="테이블별 상태")
+    args = parser.parse_args()
+
+    replica = Replica(REPLICA_PATH)
+    if args.command == "sync":
+        tables = args.tables or list(TABLES)
+        unknown = [t for t in tables if t not in TABLES]
+        if unknown:
+            parser.error(f"알 수 없는 테이블: {', '.join(unknown)}")
+        start = time.monotonic()
+        got = replica.sync(tables, full=tables if args.full else ())
+        console.print(f"[bold green]복제본 동기화 완료[/] — {sum(got.values()):,}행, {time.monotonic() - start:.1f}초")
+    else:
+        print_status(replica)
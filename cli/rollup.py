@@ -0,0 +1,67 @@
+"""사이트별 일일 노출/클릭 롤업 - 최근 N일만 보관하는 작은 파일
+
+GSC 스냅샷(사이트당 키워드 포함, 수 MB)을 매번 다시 읽지 않고
+리포트의 7일 vs 이전 7일 비교를 사이트 수만큼의 조회로 처리.
+
+파일 구조: {"days": N, "dates": {"YYYY-MM-DD": {site: [impressions, clicks]}}}
+"""
+import json
+from pathlib import Path
+
+from checkpoint import write_json_atomic
+
+
+class ExposureRollup:
+    def __init__(self, path, days=28):
+        self.path = Path(path)
+        self.days = days
+        self.dates = {}
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self.dates = json.load(f).get("dates", {})
+            except (OSError, ValueError):
+                self.dates = {}
+
+    def __bool__(self):
+        return bool(self.dates)
+
+    def update(self, date, sites):
+        """date 하루치 사이트 값 교체 — sites: {site: {"impressions", "clicks", ...}} (스냅샷 sites 형식)
+
+        오래된 날짜는 days개만 남기고 버림
+        """
+        self.dates[date] = {
+            name: [info.get("impressions", 0), info.get("clicks", 0)]
+            for name, info in sites.items()
+        }
+        for old in sorted(self.dates)[:-self.days]:
+            del self.dates[old]
+
+    def save(self):
+        write_json_atomic(self.path, {"days": self.days, "dates": self.dates})
+
+    def window(self, start, end):
+        """저장된 날짜 중 [start:end] 구간(정렬 순서 인덱스)의 사이트별 노출 합계"""
+        totals = {}
+        for date in sorted(self.dates)[start:end]:
+            for name, (impressions, _) in self.dates[date].items():
+                totals[name] = totals.get(name, 0) + impressions
+        return totals
+
+    def recent_vs_prev(self, span=7):
+        """(최근 span일 합계, 그 이전 span일 합계) — 이전 구간은 2*span일이 쌓였을 때만"""
+        recent = self.window(-span, None)
+        prev = self.window(-2 * span, -span) if len(self.dates) >= 2 * span else {}
+        return recent, prev
+
+    def backfill(self, snapshot_files):
+        """롤업 파일이 없을 때 기존 gsc_*.json 스냅샷으로 한 번 채우기"""
+        for sf in sorted(snapshot_files)[-self.days:]:
+            try:
+                with open(sf, encoding="utf-8") as f:
+                    sd = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if sd.get("date"):
+                self.update(sd["date"], sd.get("sites", {}))
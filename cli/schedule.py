@@ -0,0 +1,96 @@
+"""소스/사이트별 수집 주기 판단 - sync_log(/sync/status) 기준으로 아직 신선한 소스는 건너뜀
+
+    sched = SyncSchedule(api_get("/sync/status"), {"bing": Cadence(72), "ga4": Cadence(20, stale_days=2)})
+    due, reason = sched.check("bing", site="example.com")
+"""
+from datetime import datetime, timedelta
+
+# 마지막 기록이 이 상태면 "성공한 실행"으로 봄 (error는 항상 다시 실행)
+DONE_STATUSES = ("ok", "skipped", "partial")
+
+
+class Cadence:
+    """every_hours: 마지막 성공 후 최소 간격
+    stale_days: 마지막으로 수집한 데이터 날짜(last_date_covered)가 이보다 오래되면 간격과 상관없이 실행
+    """
+
+    def __init__(self, every_hours, stale_days=None):
+        self.every = timedelta(hours=every_hours)
+        self.stale_days = stale_days
+
+    def __repr__(self):
+        return f"Cadence({self.every}, stale_days={self.stale_days})"
+
+
+def parse_cadence_env(value):
+    """'bing=72,ga4=12:2' → {"bing": Cadence(72), "ga4": Cadence(12, stale_days=2)}"""
+    out = {}
+    for part in (value or "").split(","):
+        if "=" not in part:
+            continue
+        key, spec = part.split("=", 1)
+        hours, _, stale = spec.partition(":")
+        try:
+            out[key.strip()] = Cadence(float(hours), int(stale) if stale else None)
+        except ValueError:
+            continue
+    return out
+
+
+def _covered_end(value):
+    """'YYYY-MM-DD' 또는 'start~end' → 끝 날짜 (해석 불가면 None)"""
+    if not value or value == "N/A":
+        return None
+    try:
+        return datetime.strptime(str(value).split("~")[-1][:10], "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+class SyncSchedule:
+    """status_rows: /sync/status 응답 [{source, site, last_synced_at, last_date_covered, status}]
+    rules: {"source" 또는 "source:site": Cadence} — 사이트 규칙이 없으면 소스 규칙을 따름
+    force: True(전체) 또는 강제로 실행할 소스 이름 모음
+    """
+
+    def __init__(self, status_rows, rules, force=None, now=None):
+        self.rules = rules
+        self.force = force
+        self.now = now or datetime.now()
+        self.latest = {}
+        for row in status_rows if isinstance(status_rows, list) else []:
+            self.latest[(row.get("source"), row.get("site"))] = row
+
+    def _forced(self, source):
+        return self.force is True or (self.force and source in self.force)
+
+    def check(self, source, site=None):
+        """(실행 여부, 이유)"""
+        if self._forced(source):
+            return True, "강제 실행"
+        rule = self.rules.get(f"{source}:{site}") if site else None
+        rule = rule or self.rules.get(source)
+        if rule is None:
+            return True, "주기 설정 없음"
+        row = self.latest.get((source, site))
+        if row is None:
+            return True, "기록 없음"
+        if row.get("status") not in DONE_STATUSES:
+            return True, f"지난 실행 {row.get('status')}"
+        try:
+            last = datetime.fromisoformat(row["last_synced_at"])
+        except (KeyError, TypeError, ValueError):
+            return True, "마지막 실행 시각 없음"
+        if last.tzinfo is not None:
+            last = last.astimezone().replace(tzinfo=None)
+        if rule.stale_days is not None:
+            covered = _covered_end(row.get("last_date_covered"))
+            if covered is None or covered < self.now - timedelta(days=rule.stale_days):
+                return True, f"데이터 {row.get('last_date_covered')} 기준 {rule.stale_days}일 초과"
+        age = self.now - last
+        if age >= rule.every:
+            return True, f"마지막 실행 {age.total_seconds() / 3600:.0f}시간 전"
+        return False, f"마지막 실행 {age.total_seconds() / 3600:.1f}시간 전 (주기 {rule.every.total_seconds() / 3600:.0f}시간)"
+
+    def due(self, source, site=None):
+        return self.check(source, site)[0]
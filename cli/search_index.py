@@ -0,0 +1,82 @@
+"""포스트 검색 인덱스(my_posts.search_tokens → posts_fts) 관리
+
+    python search_index.py backfill            # 토큰이 없는 글만 채우기
+    python search_index.py backfill --all      # 토크나이저를 바꿨을 때 전체 다시 계산
+    python search_index.py query 전기차보조금   # 순위 검색 결과 확인
+
+새 글은 sync 때 sync_utils.add_search_tokens가 토큰을 같이 적재하므로 backfill은 처음 한 번(schema_v5 적용 후)이면 됨
+"""
+import argparse
+import sys
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+import api
+from api import iter_posts, rank_posts
+from kiwi_tokens import index_tokens
+from uploader import Uploader
+
+console = Console()
+
+BATCH_ROWS = 300  # /posts/tokens 요청 하나의 글 수 — 글 하나에 D1 문장 3개, Worker 호출당 쿼리 한도(1000) 안쪽 (Worker 상한 300)
+
+
+def backfill(recompute=False, blog_id=None):
+    counts = {"seen": 0, "queued": 0}
+
+    def updates():
+        for p in iter_posts(blog_id=blog_id):
+            counts["seen"] += 1
+            if p.get("search_tokens") and not recompute:
+                continue
+            tokens = " ".join(index_tokens(f"{p.get('title', '')} {p.get('keywords') or ''}")) or None
+            counts["queued"] += 1
+            yield None, {"id": p["id"], "tokens": tokens}
+
+    start = time.monotonic()
+    result = Uploader(max_in_flight=2).upload_stream("/posts/tokens", updates(), "updates",
+                                                     stage="search_tokens", max_rows=BATCH_ROWS)
+    elapsed = time.monotonic() - start
+    note = f", [red]실패 {result.failed}개[/]" if result.failed else ""
+    console.print(f"[green]검색 토큰 {result.sent:,}개 갱신[/] (전체 {counts['seen']:,}개 중 대상 {counts['queued']:,}개,"
+                  f" {elapsed:.1f}초{note})")
+    return 0 if result.ok else 1
+
+
+def query(text, mode, limit):
+    rows = rank_posts(text, mode=mode, limit=limit)
+    table = Table(title=f"'{text}' 순위 검색 ({len(rows)}건)")
+    table.add_column("점수", justify="right", style="cyan")
+    table.add_column("블로그", style="green")
+    table.add_column("제목", style="white")
+    table.add_column("토큰", style="dim")
+    for r in rows:
+        table.add_row(f"{r.get('score') or 0:.2f}", r.get("blog_name", ""), r.get("title", ""),
+                      (r.get("search_tokens") or "(없음 - LIKE)")[:60])
+    console.print(table)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="포스트 검색 인덱스 관리")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("backfill", help="토큰 없는 글의 검색 토큰 계산 → /posts/tokens")
+    b.add_argument("--all", action="store_true", help="토큰이 있는 글도 다시 계산")
+    b.add_argument("--blog-id", type=int, help="이 블로그만")
+    q = sub.add_parser("query", help="순위 검색 결과 보기")
+    q.add_argument("text", nargs="+")
+    q.add_argument("--any", action="store_true", help="명사 하나라도 들어간 글 (기본: 모두)")
+    q.add_argument("--limit", type=int, default=20)
+    api.add_cache_args(parser)
+    args = parser.parse_args()
+    api.apply_cache_args(args)
+
+    if args.command == "backfill":
+        return backfill(recompute=args.all, blog_id=args.blog_id)
+    return query(" ".join(args.text), "any" if args.any else "all", args.limit)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""업로드 실패분 보관(dead-letter spool) + 재전송
+
+업로드가 재시도 끝에 실패하면 배치를 버리지 않고 디스크에 보관:
+    <root>/<endpoint>.ndjson.gz   (엔드포인트당 파일 하나, gzip 멤버를 계속 이어붙임)
+각 줄: {"endpoint", "key", "rows"} 또는 {"endpoint", "payload"} + "error", "spooled_at"
+
+다음 실행 때 replay()가 엔드포인트별로 병렬 재전송, 다시 실패한 분은 새 파일로 재보관.
+재시도해도 소용없는 실패(4xx)는 <root>/rejected/에 따로 보관 (replay 대상 아님, 수동 확인용).
+"""
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+from concurrency import run_parallel
+from uploader import INGEST_KEYS
+
+log = logging.getLogger(__name__)
+
+
+def _safe_name(endpoint):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", endpoint.strip("/")) or "root"
+
+
+class Spool:
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, endpoint):
+        return self.root / f"{_safe_name(endpoint)}.ndjson.gz"
+
+    def _append(self, endpoint, record, retryable=True):
+        record = {"endpoint": endpoint, **record, "spooled_at": datetime.now().isoformat()}
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        path = self._path(endpoint)
+        if not retryable:
+            path = self.root / "rejected" / path.name
+        with self._lock:
+            path.parent.mkdir(exist_ok=True)
+            with gzip.open(path, "at", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def put_rows(self, endpoint, payload_key, rows, error=None, retryable=True):
+        """행 배치 보관 (재전송 시 다시 배치로 나눔)"""
+        self._append(endpoint, {"key": payload_key, "rows": rows, "error": error}, retryable)
+
+    def put_payload(self, endpoint, payload, error=None, retryable=True):
+        """요청 본문 그대로 보관 (sync/log 등 행 배치가 아닌 요청)"""
+        self._append(endpoint, {"payload": payload, "error": error}, retryable)
+
+    def files(self):
+        """보관 중인 파일 (중간에 죽은 재전송 파일 포함)"""
+        return sorted(self.root.glob("*.ndjson.gz")) + sorted(self.root.glob("*.draining-*"))
+
+    def stats(self):
+        """엔드포인트별 보관 행 수"""
+        counts = {}
+        for path in self.files():
+            for rec in _read(path):
+                n = len(rec["rows"]) if "rows" in rec else 1
+                counts[rec["endpoint"]] = counts.get(rec["endpoint"], 0) + n
+        return counts
+
+    def replay(self, uploader, workers=4, bulk=None):
+        """보관분 재전송 → {"rows", "sent", "failed"}
+
+        파일을 먼저 .draining-*으로 옮긴 뒤 읽으므로 재전송 중 새로 실패한 분은
+        원래 파일에 새로 쌓임. 전송이 끝난 .draining 파일만 삭제.
+        INGEST_KEYS 엔드포인트 행은 uploader.bulk (bulk=None이면 BULK_INGEST 설정을 따름)
+        """
+        with self._lock:
+            draining = sorted(self.root.glob("*.draining-*"))
+            stamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
+            for path in sorted(self.root.glob("*.ndjson.gz")):
+                target = path.with_name(f"{path.name}.draining-{stamp}")
+                os.replace(path, target)
+                draining.append(target)
+        if not draining:
+            return {"rows": 0, "sent": 0, "failed": 0}
+
+        def drain(path):
+            # 같은 (endpoint, key) 행은 모아서 uploader가 다시 배치로 나눔
+            groups = OrderedDict()
+            payloads = []
+            for rec in _read(path):
+                if "rows" in rec:
+                    groups.setdefault((rec["endpoint"], rec["key"]), []).extend(rec["rows"])
+                else:
+                    payloads.append(rec)
+            total = sum(len(r) for r in groups.values()) + len(payloads)
+            sent = 0
+            for (endpoint, key), rows in groups.items():
+                if endpoint in INGEST_KEYS:
+                    sent += uploader.bulk(endpoint, rows, stage="replay", bulk=bulk).sent
+                else:
+                    sent += uploader.upload(endpoint, rows, key, stage="replay").sent
+            for rec in payloads:
+                if uploader.post(rec["endpoint"], rec["payload"], stage="replay") is not None:
+                    sent += 1
+            path.unlink()
+            log.info(f"  spool {path.name}: {sent}/{total}건 재전송")
+            return total, sent
+
+        rows = sent = 0
+        for path, res, err in run_parallel(drain, draining, workers):
+            if err is not None:
+                log.error(f"  spool {path.name} 재전송 실패: {err}")
+                continue
+            rows += res[0]
+            sent += res[1]
+        return {"rows": rows, "sent": sent, "failed": rows - sent}
+
+
+def _read(path):
+    """손상된 꼬리(쓰다 죽은 gzip 멤버)는 건너뛰고 읽을 수 있는 줄만"""
+    records = []
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except (OSError, EOFError) as e:
+        log.warning(f"  spool {path.name} 일부 손상: {e}")
+    return records
@@ -0,0 +1,101 @@
+"""의존성 그래프(DAG) 기반 스테이지 병렬 실행기
+
+서로 독립인 스테이지는 동시에, 의존 관계가 있는 스테이지는 선행 스테이지가
+끝난 뒤에 실행. 선행 스테이지가 실패해도 후행 스테이지는 그대로 실행
+(기존 순차 실행과 동일한 동작).
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+log = logging.getLogger(__name__)
+
+
+class Stage:
+    """실행 단위 하나
+
+    fn: 인자 없이 호출, 결과 dict 반환 (None이면 {"status": "ok"})
+    deps: 먼저 끝나야 하는 스테이지 이름들
+    log_source: sync_log에 기록할 source 이름 (None이면 기록 안 함)
+    """
+
+    def __init__(self, name, fn, deps=(), log_source=None, label=None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.log_source = log_source
+        self.label = label or name
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, deps={list(self.deps)})"
+
+
+def _check_graph(stages):
+    names = {s.name for s in stages}
+    if len(names) != len(stages):
+        raise ValueError("스테이지 이름 중복")
+    for s in stages:
+        missing = [d for d in s.deps if d not in names]
+        if missing:
+            raise ValueError(f"{s.name}: 알 수 없는 의존 스테이지 {missing}")
+
+    # 위상 정렬로 순환 검사
+    remaining = {s.name: set(s.deps) for s in stages}
+    while remaining:
+        ready = [n for n, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"순환 의존: {sorted(remaining)}")
+        for n in ready:
+            del remaining[n]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def _run_one(stage):
+    start = time.monotonic()
+    log.info(f"[{stage.name}] 시작")
+    try:
+        result = stage.fn() or {"status": "ok"}
+    except Exception as e:
+        log.error(f"{stage.label} 실패: {e}")
+        result = {"status": "error", "message": str(e)}
+    result["elapsed"] = round(time.monotonic() - start, 1)
+    log.info(f"[{stage.name}] {result.get('status', 'ok')} ({result['elapsed']}초)")
+    return result
+
+
+def run_stages(stages, workers=4, results=None, on_done=None):
+    """스테이지 그래프 실행
+
+    results: 스테이지 이름 → 결과 dict (완료되는 대로 채움, 후행 스테이지 fn에서 참조 가능)
+    on_done(stage, result): 스테이지 하나가 끝날 때마다 메인 스레드에서 호출
+    """
+    stages = list(stages)
+    _check_graph(stages)
+    results = {} if results is None else results
+    pending = {s.name: s for s in stages}
+    done = set()
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        while pending or running:
+            # 선언 순서를 유지하며 실행 가능한 스테이지 제출
+            for name in list(pending):
+                stage = pending[name]
+                if all(d in done for d in stage.deps):
+                    running[ex.submit(_run_one, stage)] = stage
+                    del pending[name]
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                stage = running.pop(fut)
+                result = fut.result()
+                results[stage.name] = result
+                done.add(stage.name)
+                if on_done:
+                    try:
+                        on_done(stage, result)
+                    except Exception as e:
+                        log.error(f"[{stage.name}] 결과 처리 실패: {e}")
+
+    return results
@@ -1,4 +1,5 @@
-from api import get
+import sys
+import api
 from rich.console import Console
 from rich.table import Table
 from rich import box
@@ -6,11 +7,11 @@ from rich import box
 console = Console()
 
 def run():
-    blogs = get("/blogs")
+    # 블로그 목록과 글 목록은 서로 독립 — 동시에 요청
+    blogs, response = api.run(api.gather(api.aget("/blogs"), api.aget("/posts/search", {"q": ""})))
     if isinstance(blogs, dict):
         blogs = blogs.get("results", blogs.get("blogs", []))
 
-    response = get("/posts/search", params={"q": ""})
     if isinstance(response, dict):
         posts = response.get("results", [])
     else:
@@ -37,4 +38,5 @@ def run():
     console.print(f"\n총 [bold]{total}[/]개 글 관리 중")
 
 if __name__ == "__main__":
+    sys.argv[1:] = api.parse_cache_flags(sys.argv[1:])
     run()
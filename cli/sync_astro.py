@@ -1,8 +1,9 @@
+import sys
 import yaml
 from pathlib import Path
-from api import get
+from api import get, parse_cache_flags
 from sync_hugo import parse_front_matter
-from sync_utils import get_existing_posts, save_new_posts
+from sync_utils import save_new_posts
 from rich.console import Console
 
 console = Console()
@@ -38,9 +39,6 @@ def run():
 
         console.print(f"\n[bold cyan]{name}[/] ({content_path}) 수집 중...")
 
-        existing = get_existing_posts(db_blog_id)
-        console.print(f"  DB 기존 글: {len(existing)}개")
-
         all_posts = []
         for md_file in content_path.rglob("*.md"):
             meta = parse_front_matter(md_file)
@@ -65,8 +63,9 @@ def run():
                 "published_at": date
             })
 
-        save_new_posts(all_posts, existing, name)
+        save_new_posts(all_posts, db_blog_id, name)
 
 
 if __name__ == "__main__":
+    sys.argv[1:] = parse_cache_flags(sys.argv[1:])
     run()
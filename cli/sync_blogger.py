@@ -1,8 +1,9 @@
+import sys
 import yaml
 from googleapiclient.discovery import build
 from google_auth import get_credentials
-from api import get
-from sync_utils import get_existing_posts, save_new_posts
+from api import get, parse_cache_flags
+from sync_utils import save_new_posts
 from rich.console import Console
 
 console = Console()
@@ -35,9 +36,6 @@ def run():
 
         console.print(f"\n[bold cyan]{name}[/] (blog_id: {blog_id}) 수집 중...")
 
-        existing = get_existing_posts(db_blog_id)
-        console.print(f"  DB 기존 글: {len(existing)}개")
-
         page_token = None
         all_posts = []
 
@@ -74,8 +72,9 @@ def run():
             if not page_token:
                 break
 
-        save_new_posts(all_posts, existing, name)
+        save_new_posts(all_posts, db_blog_id, name)
 
 
 if __name__ == "__main__":
+    sys.argv[1:] = parse_cache_flags(sys.argv[1:])
     run()
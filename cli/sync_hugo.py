@@ -1,8 +1,9 @@
+import sys
 import yaml
 import re
 from pathlib import Path
-from api import get
-from sync_utils import get_existing_posts, save_new_posts, safe_title
+from api import get, parse_cache_flags
+from sync_utils import save_new_posts, safe_title
 from rich.console import Console
 
 console = Console()
@@ -98,9 +99,6 @@ def run():
 
         console.print(f"\n[bold cyan]{name}[/] ({content_path}) 수집 중...")
 
-        existing = get_existing_posts(db_blog_id)
-        console.print(f"  DB 기존 글: {len(existing)}개")
-
         all_posts = []
         for md_file in content_path.rglob("*.md"):
             meta = parse_front_matter(md_file)
@@ -137,7 +135,7 @@ def run():
                 "published_at": date
             })
 
-        new, skip = save_new_posts(all_posts, existing, name)
+        new, skip = save_new_posts(all_posts, db_blog_id, name)
         total_new += new
         total_skip += skip
 
@@ -145,4 +143,5 @@ def run():
 
 
 if __name__ == "__main__":
+    sys.argv[1:] = parse_cache_flags(sys.argv[1:])
     run()
@@ -0,0 +1,93 @@
+"""daily_sync --plan: 실제 호출 없이 스테이지별 예상 작업량 출력
+
+예상치는 현재 사이트 목록/설정 + 지난 실행 메트릭(logs/metrics.jsonl) 평균으로 계산.
+"""
+import json
+import math
+from collections import deque
+
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from uploader import DEFAULT_BATCH_BYTES, DEFAULT_BATCH_ROWS
+
+console = Console()
+
+
+class History:
+    """metrics.jsonl 최근 runs회 실행 — 메트릭 이름/라벨로 실행당 평균 조회"""
+
+    def __init__(self, runs):
+        self.runs = runs
+
+    @classmethod
+    def load(cls, path, runs=7):
+        last = deque(maxlen=runs)
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        last.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        return cls(list(last))
+
+    def __len__(self):
+        return len(self.runs)
+
+    def avg(self, name, **labels):
+        """라벨이 모두 일치하는 메트릭 값의 실행별 합 → 실행 평균 (해당 메트릭이 있던 실행만, 없으면 None)"""
+        totals = []
+        for run in self.runs:
+            values = [
+                m["value"] for m in run.get("metrics", [])
+                if m["name"] == name and all(m["labels"].get(k) == str(v) for k, v in labels.items())
+            ]
+            if values:
+                totals.append(sum(values))
+        return sum(totals) / len(totals) if totals else None
+
+
+def estimate_batches(rows, bytes_per_row=None, max_bytes=DEFAULT_BATCH_BYTES, max_rows=DEFAULT_BATCH_ROWS):
+    """행 수 → 예상 배치 수 (행 수 한도와 바이트 한도 중 큰 쪽)"""
+    if not rows:
+        return 0
+    by_rows = math.ceil(rows / max_rows)
+    by_bytes = math.ceil(rows * bytes_per_row / max_bytes) if bytes_per_row else 0
+    return max(by_rows, by_bytes)
+
+
+def print_plan(plans, quotas):
+    """plans: [{"stage", "calls": {api: n}, "rows", "batches", "seconds", "basis"}]
+    quotas: {api: 일일 호출 한도}
+    """
+    table = Table(title="daily_sync 실행 계획 (예상치)", box=box.ROUNDED)
+    table.add_column("스테이지", style="cyan")
+    table.add_column("API 호출", justify="right")
+    table.add_column("업로드 행", justify="right", style="green")
+    table.add_column("배치", justify="right")
+    table.add_column("예상 시간", justify="right", style="yellow")
+    table.add_column("근거", style="dim")
+
+    calls_total = {}
+    for p in plans:
+        calls = ", ".join(f"{api} {n:,.0f}" for api, n in p.get("calls", {}).items()) or "-"
+        for api, n in p.get("calls", {}).items():
+            calls_total[api] = calls_total.get(api, 0) + n
+        seconds = p.get("seconds")
+        table.add_row(
+            p["stage"], calls,
+            f"{p['rows']:,.0f}" if p.get("rows") else "-",
+            f"{p['batches']:,}" if p.get("batches") else "-",
+            f"{seconds:,.0f}초" if seconds is not None else "?",
+            p.get("basis", ""),
+        )
+    console.print(table)
+
+    for api, n in calls_total.items():
+        limit = quotas.get(api)
+        share = f" / 일일 {limit:,} ({n / limit:.2%})" if limit else ""
+        console.print(f"  {api}: {n:,.0f}회{share}")
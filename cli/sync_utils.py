@@ -1,23 +1,49 @@
-"""sync 공통 유틸리티 - 중복 방지 및 배치 저장"""
-from api import get, post
+"""sync 공통 유틸리티 - 중복 방지(제목 지문 비교) 및 배치 저장"""
+from api import iter_posts, post
+from title_hash import title_hash as _hash
+from uploader import Uploader
 from rich.console import Console
 
 console = Console()
+# 재시도/spool 없음: 타임아웃 뒤 실제로는 커밋된 배치를 다시 보내면 my_posts UNIQUE 인덱스(schema_v6.sql)
+# 적용 전 DB에 중복이 생김. 실패한 글은 다음 sync의 find_unknown_posts에서 다시 신규로 잡힘
+uploader = Uploader(max_in_flight=2, retries=0)
 
 
-def get_existing_posts(blog_id):
-    """DB에 저장된 해당 블로그의 포스트 제목 set 반환"""
-    results = get("/posts/search", params={"q": "", "blog_id": blog_id})
-    if isinstance(results, dict):
-        results = results.get("results", [])
-    existing = set()
-    for p in results:
-        if str(p.get("blog_id")) == str(blog_id):
-            title = p.get("title", "")
-            if isinstance(title, list):
-                title = title[0] if title else ""
-            existing.add(str(title).strip().lower())
-    return existing
+def title_hash(title):
+    """제목 지문 — 정규화 규칙은 title_hash.py (Worker /posts/exists와 같은 규칙)"""
+    return _hash(safe_title(title))
+
+
+def find_unknown_posts(blog_id, posts):
+    """DB(blog_id)에 없는 포스트만 → (신규 목록, DB 기존 글 수)
+
+    제목 전체를 내려받지 않고 지문만 보내서 Worker가 모르는 지문만 돌려받음.
+    /posts/exists가 오류(미배포 404, 500 등)를 돌려주면 기존 제목 전체를 받아 비교
+    """
+    hashes = {}
+    for p in posts:
+        hashes.setdefault(title_hash(p.get("title", "")), []).append(p)
+    if not hashes:
+        return [], 0
+    res = post("/posts/exists", {"blog_id": blog_id, "hashes": list(hashes)}, idempotent=True)
+    if not isinstance(res, dict) or "error" in res or "unknown" not in res:
+        error = res.get("error") if isinstance(res, dict) else res
+        console.print(f"  [yellow]/posts/exists 실패({error}) → 기존 제목 전체 비교[/]")
+        known = known_title_hashes(blog_id)
+        unknown, known_total = set(hashes) - known, len(known)
+    else:
+        unknown, known_total = set(res["unknown"]), res.get("known_total", 0)
+    return [p for h, group in hashes.items() if h in unknown for p in group], known_total
+
+
+def known_title_hashes(blog_id):
+    """DB에 저장된 해당 블로그의 포스트 제목 지문 set (/posts/exists 대체 경로)
+
+    복제본(최대 MAX_AGE_HOURS 전)이나 캐시로 답하면 그 뒤에 저장된 글을 신규로 보고 다시 넣으므로 서버에서 직접
+    """
+    return {title_hash(p.get("title", "")) for p in iter_posts(blog_id=blog_id, fresh=True)
+            if str(p.get("blog_id")) == str(blog_id)}
 
 
 def safe_title(title):
@@ -29,23 +55,34 @@ def safe_title(title):
     return str(title)
 
 
-def save_new_posts(all_posts, existing_titles, blog_name):
-    """기존에 없는 포스트만 필터링 후 배치 저장"""
-    new_posts = []
-    skipped = 0
+def add_search_tokens(posts):
+    """제목 + 키워드의 Kiwi 토큰 → p["search_tokens"] (Worker가 posts_fts에 반영)
+
+    kiwipiepy가 없으면 건너뜀 — 토큰 없는 글은 /posts/fts가 LIKE로 보충하고 search_index.py backfill로 채움
+    """
+    try:
+        from kiwi_tokens import index_tokens
+        for p in posts:
+            # 토큰이 하나도 없으면 NULL — /posts/fts의 LIKE 보충 대상으로 남김
+            p["search_tokens"] = " ".join(index_tokens(f"{p.get('title', '')} {p.get('keywords') or ''}")) or None
+    except ImportError:
+        console.print("  [yellow]kiwipiepy 없음 → 검색 토큰 생략 (나중에 search_index.py backfill)[/]")
+
+
+def save_new_posts(all_posts, blog_id, blog_name):
+    """DB에 없는 포스트만 골라 저장 → (신규 수, 스킵 수)"""
     for p in all_posts:
-        title = safe_title(p.get("title", ""))
-        p["title"] = title
-        if title.strip().lower() in existing_titles:
-            skipped += 1
-        else:
-            new_posts.append(p)
+        p["title"] = safe_title(p.get("title", ""))
+    new_posts, known_total = find_unknown_posts(blog_id, all_posts)
+    skipped = len(all_posts) - len(new_posts)
+    console.print(f"  DB 기존 글: {known_total}개")
 
     if new_posts:
-        for i in range(0, len(new_posts), 100):
-            batch = new_posts[i:i + 100]
-            post("/posts", {"posts": batch})
-        console.print(f"  [green]{blog_name}: 신규 {len(new_posts)}개 저장 (기존 {skipped}개 스킵)[/]")
+        add_search_tokens(new_posts)
+        # /ingest 대량 적재, BULK_INGEST=0이면 기존 /posts
+        result = uploader.bulk("/posts", new_posts, stage="posts")
+        note = f", [red]실패 {result.failed}개[/]" if result.failed else ""
+        console.print(f"  [green]{blog_name}: 신규 {result.sent}개 저장 (기존 {skipped}개 스킵{note})[/]")
     else:
         console.print(f"  [yellow]{blog_name}: 신규 글 없음 (기존 {skipped}개 모두 존재)[/]")
 
@@ -1,7 +1,8 @@
+import sys
 import yaml
 import requests
-from api import get
-from sync_utils import get_existing_posts, save_new_posts
+from api import get, parse_cache_flags
+from sync_utils import save_new_posts
 from rich.console import Console
 
 console = Console()
@@ -33,9 +34,6 @@ def run():
 
         console.print(f"\n[bold cyan]{name}[/] ({url}) 수집 중...")
 
-        existing = get_existing_posts(blog_id)
-        console.print(f"  DB 기존 글: {len(existing)}개")
-
         page = 1
         all_posts = []
 
@@ -70,8 +68,9 @@ def run():
             console.print(f"  페이지 {page} — {len(posts)}개")
             page += 1
 
-        save_new_posts(all_posts, existing, name)
+        save_new_posts(all_posts, blog_id, name)
 
 
 if __name__ == "__main__":
+    sys.argv[1:] = parse_cache_flags(sys.argv[1:])
     run()
@@ -0,0 +1,70 @@
+"""체크포인트 ack/완료 판정, 행 파일 스트리밍"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from checkpoint import CheckpointStore  # noqa: E402
+
+
+def _upload_all(store, endpoint):
+    """upload_pending이 전부 성공했을 때와 같은 ack"""
+    for site, _ in store.iter_pending(endpoint):
+        store.ack(site, endpoint)
+
+
+def test_empty_endpoint_does_not_block_settled(tmp_path):
+    store = CheckpointStore(tmp_path, "gsc", "2026-10-01")
+    store.save("a.com", {"clicks": 0}, rows={"/gsc/daily": [{"site": "a.com"}], "/gsc/keywords": []})
+    _upload_all(store, "/gsc/daily")
+    _upload_all(store, "/gsc/keywords")
+    assert store.get("a.com")["acked"] == ["/gsc/daily"]
+    assert store.is_settled()
+
+
+def test_unacked_rows_not_settled(tmp_path):
+    store = CheckpointStore(tmp_path, "gsc", "2026-10-01")
+    store.save("a.com", {}, rows={"/gsc/daily": [{"site": "a.com"}], "/gsc/keywords": [{"query": "q"}]})
+    _upload_all(store, "/gsc/daily")
+    assert not store.is_settled()
+    _upload_all(store, "/gsc/keywords")
+    assert store.is_settled()
+
+
+def test_failed_unit_not_settled(tmp_path):
+    store = CheckpointStore(tmp_path, "gsc", "2026-10-01")
+    store.fail("a.com", "timeout")
+    assert not store.is_settled()
+
+
+def test_streamed_rows_written_to_file(tmp_path):
+    store = CheckpointStore(tmp_path, "ga4", "2026-10-01~2026-10-03")
+    entry = {"rows": 0}
+
+    def rows():
+        for i in range(3):
+            entry["rows"] += 1
+            yield {"page": f"/p{i}"}
+
+    store.save("123", entry, rows={"/ga4/pageviews": rows()})
+    assert store.get("123")["data"] == {"rows": 3}
+    [(site, pending)] = store.pending("/ga4/pageviews")
+    assert site == "123" and [r["page"] for r in pending] == ["/p0", "/p1", "/p2"]
+    assert not store.is_settled()
+    store.ack("123", "/ga4/pageviews")
+    assert store.is_settled()
+
+
+def test_streamed_rows_failure_leaves_no_unit(tmp_path):
+    store = CheckpointStore(tmp_path, "ga4", "2026-10-01~2026-10-03")
+
+    def rows():
+        yield {"page": "/p0"}
+        raise RuntimeError("quota")
+
+    with pytest.raises(RuntimeError):
+        store.save("123", {}, rows={"/ga4/pageviews": rows()})
+    assert store.get("123") is None
+    assert list(tmp_path.rglob("*.jsonl")) == []
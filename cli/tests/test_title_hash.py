@@ -0,0 +1,42 @@
+"""제목 지문 고정 벡터 - worker/test/title_hash.test.mjs와 같은 값이어야 함"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from title_hash import normalize_title, title_hash  # noqa: E402
+
+VECTORS = [
+    ("전기차 보조금 2026 신청방법", "전기차 보조금 2026 신청방법"),
+    ("  Hello\u3000World\u00a0 ", "hello world"),  # 전각 공백, NBSP
+    ("\ufeffABC\u200bdef", "abc def"),             # BOM(JS trim만 공백), zero-width space(양쪽 다 아님)
+    ("e\u0301clair", "\u00e9clair"),                # NFC 결합
+    ("\u00c9CLAIR", "\u00c9clair"),                 # ASCII만 소문자
+    ("\u1100\u1161\u11a8 \t\n", "\uac01"),         # 한글 자모 → 완성형
+    ("\x1c tab\tend\n", "\x1c tab end"),          # U+001C는 Python strip만 공백 → 규칙에서 제외
+    ("", ""),
+]
+HASHES = {
+    "전기차 보조금 2026 신청방법": "54fe079cd906cf8f",
+    "hello world": "b94d27b9934d3e08",
+    "abc def": "010971ea0013a09d",
+    "\u00e9clair": "0ebe6cb10ee48b34",
+    "\u00c9clair": "c1b9327b72ce7375",
+    "\x1c tab end": "56a0de2f5ac35279",
+    "": "e3b0c44298fc1c14",
+}
+
+
+def test_normalize():
+    for raw, expected in VECTORS:
+        assert normalize_title(raw) == expected, raw
+
+
+def test_hash_vectors():
+    for normalized, digest in HASHES.items():
+        assert title_hash(normalized) == digest, normalized
+
+
+def test_raw_and_normalized_hash_equal():
+    for raw, expected in VECTORS:
+        assert title_hash(raw) == title_hash(expected)
@@ -5,7 +5,8 @@ import os
 from datetime import datetime, timedelta
 from googleapiclient.discovery import build
 from google_auth import get_credentials
-from api import get
+import api
+from kiwi_tokens import query_tokens
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -82,36 +83,29 @@ def run():
     console.print(f"핵심 키워드: {', '.join(keywords)}")
     console.print(f"제외된 불용어: {', '.join(w for w in title.split() if w in STOP_WORDS)}\n")
 
-    # 1. 중복 체크 (핵심 키워드만)
+    # 1. 중복 체크 (순위 검색 — 명사 하나라도 겹치는 글 중 2개 이상 매칭되는 것만)
     console.print("[bold cyan]1. 기존 글 중복 체크[/]")
-    found_any = False
-    for kw in keywords[:5]:
-        results = get("/posts/search", params={"q": kw})
-        if isinstance(results, dict):
-            results = results.get("results", [])
-        if results:
-            # 2개 이상 키워드 매칭되는 것만 표시
-            relevant = []
-            for r in results:
-                t = r.get("title", "")
-                if isinstance(t, list):
-                    t = t[0] if t else ""
-                t = str(t)
-                matched_count = sum(1 for k in keywords if k.lower() in t.lower())
-                if matched_count >= 2:
-                    relevant.append((r, matched_count))
-
-            if relevant:
-                found_any = True
-                relevant.sort(key=lambda x: x[1], reverse=True)
-                console.print(f"  [yellow]'{kw}'[/] — 관련 글 {len(relevant)}건:")
-                for r, mc in relevant[:3]:
-                    t = r.get("title", "")
-                    if isinstance(t, list):
-                        t = t[0] if t else ""
-                    console.print(f"    - [{r.get('platform','')}] {str(t)[:60]} (매칭 {mc}개)")
-
-    if not found_any:
+    try:
+        tokens = query_tokens(title)
+    except ImportError:
+        console.print("  [yellow]kiwipiepy 없음 → 공백 단위 키워드로 매칭[/]")
+        tokens = [k.lower() for k in keywords]
+    relevant = []
+    if tokens:
+        for r in api.rank_posts(title, mode="any", limit=50):
+            post_tokens = set((r.get("search_tokens") or "").split())
+            t = str(r.get("title", "")).lower()
+            matched_count = sum(1 for k in tokens if k in post_tokens or k in t)
+            if matched_count >= min(2, len(tokens)):
+                relevant.append((r, matched_count))
+
+    if not tokens:
+        console.print("  [yellow]비교할 핵심 키워드가 없어 중복 체크 생략[/]")
+    elif relevant:
+        console.print(f"  관련 글 {len(relevant)}건 (관련도순):")
+        for r, mc in relevant[:5]:
+            console.print(f"    - [{r.get('platform','')}] {str(r.get('title', ''))[:60]} (매칭 {mc}/{len(tokens)}개)")
+    else:
         console.print("  [green]중복 없음! 새로운 주제입니다.[/]")
 
     # 2. 스냅샷 기반 블로그별 성과
@@ -252,4 +246,5 @@ def _recommend_by_total(recent_files):
 
 
 if __name__ == "__main__":
+    sys.argv[1:] = api.parse_cache_flags(sys.argv[1:])
     run()
@@ -0,0 +1,25 @@
+"""제목 지문 - Worker(worker/src/title_hash.js)와 바이트 단위로 같은 정규화 + 해시
+
+정규화 규칙 (양쪽 동일, 바꾸면 두 파일과 테스트 벡터를 같이 바꿀 것):
+  1. NFC 정규화
+  2. WHITESPACE의 문자 연속 → 공백 하나, 앞뒤 공백 제거
+  3. ASCII A-Z만 소문자 (str.lower/toLowerCase는 유니코드 대소문자 표가 런타임마다 달라서 제외)
+지문 = 정규화한 제목 UTF-8의 SHA-256 앞 8바이트 hex (16자)
+"""
+import hashlib
+import re
+import unicodedata
+
+# Python str.isspace와 JS \s가 다르게 보는 문자까지 명시 (U+001C~1F 제외, U+200B/FEFF 포함)
+WHITESPACE = re.compile(r"[\t\n\v\f\r \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000\u200b\ufeff]+")
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def normalize_title(title):
+    text = unicodedata.normalize("NFC", str(title or ""))
+    return WHITESPACE.sub(" ", text).strip(" ").translate(_ASCII_LOWER)
+
+
+def title_hash(title):
+    """제목 지문 (64비트 hex)"""
+    return hashlib.sha256(normalize_title(title).encode("utf-8")).hexdigest()[:16]
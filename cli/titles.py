@@ -1,7 +1,7 @@
 import sys
 import csv
 import os
-from api import get, post
+from api import get, post, parse_cache_flags
 from rich.console import Console
 from rich.table import Table
 from rich.prompt import Prompt
@@ -45,7 +45,7 @@ def cmd_csv(filepath):
     if titles:
         for i in range(0, len(titles), 500):
             batch = titles[i:i+500]
-            post("/titles", {"titles": batch})
+            post("/titles", {"titles": batch}, idempotent=True)
         console.print(f"[green]{os.path.basename(filepath)}[/] -> {len(titles)}개 저장")
 
 def cmd_csv_dir(dirpath):
@@ -93,4 +93,5 @@ def main():
         console.print("[red]알 수 없는 명령[/]")
 
 if __name__ == "__main__":
+    sys.argv[1:] = parse_cache_flags(sys.argv[1:])
     main()
@@ -1,10 +1,11 @@
-"""로컬 GSC 스냅샷을 D1에 업로드"""
+"""로컬 GSC 스냅샷을 D1에 업로드 (/ingest 대량 적재 — 90일치도 요청 몇 번)"""
 import os
 import json
-from api import get, post
+from uploader import Uploader
 from rich.console import Console
 
 console = Console()
+uploader = Uploader(max_in_flight=4)
 
 SNAPSHOT_DIR = "/Users/twinssn/Projects/blogdex/cli/snapshots"
 
@@ -13,55 +14,59 @@ def run():
     files = sorted([f for f in os.listdir(SNAPSHOT_DIR) if f.startswith("gsc_") and f.endswith(".json")])
     console.print(f"[cyan]스냅샷 {len(files)}개 업로드 시작[/]\n")
 
-    for fname in files:
-        filepath = os.path.join(SNAPSHOT_DIR, fname)
-        with open(filepath, "r", encoding="utf-8") as f:
-            snapshot = json.load(f)
+    # 사이트별 일별 요약 (작음 — 모아 두었다가 마지막에 한 번에)
+    daily_data = []
+    kw_counts = {}
 
-        date = snapshot.get("date", fname.replace("gsc_", "").replace(".json", ""))
+    def keyword_rows():
+        """스냅샷을 하나씩 읽으며 (date, 키워드 행) — 업로드가 읽는 대로 전송"""
+        for fname in files:
+            filepath = os.path.join(SNAPSHOT_DIR, fname)
+            with open(filepath, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
 
-        # 사이트별 일별 요약
-        daily_data = []
-        keyword_data = []
+            date = snapshot.get("date", fname.replace("gsc_", "").replace(".json", ""))
+            kw_counts[date] = 0
 
-        for site_name, site_data in snapshot.get("sites", {}).items():
-            if "error" in site_data:
-                continue
+            for site_name, site_data in snapshot.get("sites", {}).items():
+                if "error" in site_data:
+                    continue
 
-            daily_data.append({
-                "site": site_name,
-                "date": date,
-                "clicks": site_data.get("clicks", 0),
-                "impressions": site_data.get("impressions", 0),
-                "ctr": site_data.get("ctr", 0),
-            })
-
-            for kw in site_data.get("top_keywords", []):
-                keyword_data.append({
+                daily_data.append({
                     "site": site_name,
                     "date": date,
-                    "query": kw["query"],
-                    "page": kw.get("page", ""),
-                    "clicks": kw["clicks"],
-                    "impressions": kw["impressions"],
-                    "ctr": kw["ctr"],
-                    "position": kw["position"],
+                    "clicks": site_data.get("clicks", 0),
+                    "impressions": site_data.get("impressions", 0),
+                    "ctr": site_data.get("ctr", 0),
                 })
 
-        # 업로드
-        if daily_data:
-            post("/gsc/daily", {"data": daily_data})
-
-        if keyword_data:
-            # 100개씩 청크
-            for i in range(0, len(keyword_data), 100):
-                chunk = keyword_data[i:i + 100]
-                post("/gsc/keywords", {"data": chunk})
-
-        kw_count = len(keyword_data)
-        console.print(f"  [green]{date}[/] — 사이트 {len(daily_data)}개, 키워드 {kw_count}개")
-
-    console.print(f"\n[bold green]업로드 완료: {len(files)}일치[/]")
+                for kw in site_data.get("top_keywords", []):
+                    kw_counts[date] += 1
+                    yield date, {
+                        "site": site_name,
+                        "date": date,
+                        "query": kw["query"],
+                        "page": kw.get("page", ""),
+                        "clicks": kw["clicks"],
+                        "impressions": kw["impressions"],
+                        "ctr": kw["ctr"],
+                        "position": kw["position"],
+                    }
+
+    # 업로드 (gzip NDJSON 대량 요청 — BULK_INGEST=0이면 기존 배열 엔드포인트, 실패 시 재시도)
+    failed_dates = set(uploader.bulk_stream("/gsc/keywords", keyword_rows(), stage="snapshots").failed_tags)
+    daily = uploader.bulk_stream("/gsc/daily", ((d["date"], d) for d in daily_data), stage="snapshots")
+    failed_dates |= daily.failed_tags
+
+    for date, kw_count in kw_counts.items():
+        sites = sum(1 for d in daily_data if d["date"] == date)
+        note = " [red](업로드 실패)[/]" if date in failed_dates else ""
+        console.print(f"  [green]{date}[/] — 사이트 {sites}개, 키워드 {kw_count}개{note}")
+
+    stats = uploader.summary("snapshots")
+    console.print(f"\n[bold green]업로드 완료: {len(files)}일치[/] — "
+                  f"{stats['rows']:,}행 / 요청 {stats['batches']}회, {stats['rows_per_sec']:,.0f}행/초, "
+                  f"오류율 {stats['error_rate']:.1%}")
 
 
 if __name__ == "__main__":
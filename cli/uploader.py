@@ -0,0 +1,334 @@
+"""Worker API 업로드 엔진 - 바이트 기준 배치 + 병렬 전송 + 지수 백오프 재시도
+
+모든 sync 모듈이 공유:
+    up = Uploader(max_in_flight=4)
+    result = up.upload("/gsc/keywords", rows, "data", stage="gsc")
+    up.summary("gsc")  # 행/초, 오류율
+
+spool(spool.Spool)을 주면 재시도 끝에 실패한 배치는 디스크에 보관 → 다음 실행에서 replay
+
+대량 적재는 /ingest/<엔드포인트>로 gzip NDJSON (요청 하나에 수만 행):
+    up.bulk("/gsc/keywords", rows, stage="snapshots")  # BULK_INGEST=0이면 기존 배열 엔드포인트로
+"""
+import gzip
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import API_URL, API_KEY
+
+log = logging.getLogger(__name__)
+
+HEADERS = {"X-API-Key": API_KEY, "Content-Type": "application/json"}
+INGEST_HEADERS = {"X-API-Key": API_KEY, "Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"}
+
+DEFAULT_BATCH_BYTES = 256 * 1024  # 배치 하나의 최대 JSON 크기
+DEFAULT_BATCH_ROWS = 500          # 배치 하나의 최대 행 수 (Worker가 행 단위로 처리하는 엔드포인트는 더 작게)
+
+# /ingest가 받는 엔드포인트 → 기존 POST의 payload 키 (spool에는 기존 형식으로 보관)
+INGEST_KEYS = {
+    "/gsc/daily": "data",
+    "/gsc/keywords": "data",
+    "/ga4/pageviews": "data",
+    "/bing/daily": "rows",
+    "/bing/keywords": "keywords",
+    "/posts": "posts",
+}
+INGEST_MAX_BYTES = 8 * 1024 * 1024  # 요청 하나의 NDJSON 크기 (압축 전)
+# Worker는 요청 하나를 D1 문장 900개 이하로 받음 (floor(100 / 열 수)행씩) — 가장 넓은 8열이면 10800행, 넘으면 413
+INGEST_MAX_ROWS = 10000
+INGEST_IN_FLIGHT = 2                # D1 쓰기는 어차피 직렬 — 동시 요청을 늘려도 빨라지지 않음
+# INGEST_KEYS 엔드포인트를 /ingest로 보낼지 — Worker에 /ingest 배포 전이면 0 (기존 배열 엔드포인트로)
+BULK_INGEST = os.getenv("BULK_INGEST", "1") != "0"
+
+
+class UploadError(Exception):
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def make_batches(rows, max_bytes=DEFAULT_BATCH_BYTES, max_rows=DEFAULT_BATCH_ROWS):
+    """행 목록 → [(start, end, byte_size)] (JSON 직렬화 크기 기준으로 자름)"""
+    batches = []
+    start = 0
+    size = 2  # "[]"
+    for i, row in enumerate(rows):
+        row_size = len(json.dumps(row, ensure_ascii=False).encode("utf-8")) + 1
+        if i > start and (size + row_size > max_bytes or i - start >= max_rows):
+            batches.append((start, i, size))
+            start = i
+            size = 2
+        size += row_size
+    if start < len(rows):
+        batches.append((start, len(rows), size))
+    return batches
+
+
+class StageStats:
+    """스테이지별 업로드 통계"""
+
+    def __init__(self):
+        self.rows = 0
+        self.failed_rows = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.retries = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def error_rate(self):
+        return self.failed_batches / self.batches if self.batches else 0.0
+
+    def as_dict(self):
+        return {
+            "rows": self.rows, "failed_rows": self.failed_rows,
+            "batches": self.batches, "failed_batches": self.failed_batches,
+            "retries": self.retries, "bytes": self.bytes,
+            "elapsed": round(self.elapsed, 2),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+            "error_rate": round(self.error_rate, 4),
+        }
+
+
+class UploadResult:
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.sent = 0
+        self.failed = 0
+        self.batches = []  # (start, end, ok, error)
+        self.failed_tags = set()
+        # 실패했고 spool replay 대상도 아닌 배치의 tag (spool 없음/쓰기 실패, 또는 재시도 불가 → rejected)
+        # — 이 tag의 원본(체크포인트 등)은 직접 다시 보내야 함
+        self.lost_tags = set()
+
+    @property
+    def ok(self):
+        return self.failed == 0
+
+
+class Uploader:
+    def __init__(self, max_in_flight=4, max_batch_bytes=DEFAULT_BATCH_BYTES,
+                 max_batch_rows=DEFAULT_BATCH_ROWS, retries=4, backoff=0.5,
+                 max_backoff=30.0, timeout=60, spool=None):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_rows = max_batch_rows
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.spool = spool
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_maxsize=self.max_in_flight))
+
+    def _stage(self, stage):
+        with self._lock:
+            return self.stats.setdefault(stage or "default", StageStats())
+
+    def _post_once(self, endpoint, payload, headers=HEADERS):
+        try:
+            r = self._session.post(f"{API_URL}{endpoint}", headers=headers,
+                                   data=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise UploadError(str(e))
+        if r.status_code == 429 or r.status_code >= 500:
+            raise UploadError(f"HTTP {r.status_code}: {r.text[:200]}")
+        if r.status_code >= 400:
+            raise UploadError(f"HTTP {r.status_code}: {r.text[:200]}", retryable=False)
+        try:
+            body = r.json()
+        except ValueError:
+            raise UploadError(f"JSON 아님: {r.text[:200]}")
+        if isinstance(body, dict) and "error" in body:
+            raise UploadError(str(body["error"]))
+        return body
+
+    def _send(self, endpoint, payload, stats, headers=HEADERS):
+        """배치 하나 전송 — 재시도 가능한 오류는 지수 백오프 + full jitter"""
+        attempt = 0
+        while True:
+            try:
+                return self._post_once(endpoint, payload, headers)
+            except UploadError as e:
+                if not e.retryable or attempt >= self.retries:
+                    raise
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+                attempt += 1
+                with self._lock:
+                    stats.retries += 1
+                log.warning(f"  {endpoint} 재시도 {attempt}/{self.retries} ({delay:.1f}초 후): {e}")
+                time.sleep(delay)
+
+    def upload(self, endpoint, rows, payload_key, stage=None, max_rows=None):
+        """rows를 바이트 기준 배치로 나눠 최대 max_in_flight개 동시 전송
+
+        실패한 배치는 UploadResult.batches에 (start, end, False, error)로 남음
+        """
+        return self.upload_stream(endpoint, ((None, r) for r in rows), payload_key, stage, max_rows)
+
+    def upload_stream(self, endpoint, items, payload_key, stage=None, max_rows=None):
+        """(tag, row) 이터레이터를 읽는 대로 배치로 묶어 전송
+
+        전송 중인 배치가 max_in_flight개를 넘으면 이터레이터 읽기를 멈춤(back-pressure) —
+        메모리에는 최대 max_in_flight + 1개 배치만 올라감.
+        실패한 배치에 속한 tag는 UploadResult.failed_tags에 모음 (체크포인트 단위 ack용)
+        """
+        key = json.dumps(payload_key, ensure_ascii=False)
+
+        def encode(lines):
+            # json.dumps({payload_key: rows})와 같은 바이트 (행은 크기 계산 때 한 번만 직렬화)
+            return f"{{{key}: [{', '.join(lines)}]}}".encode("utf-8"), HEADERS
+
+        return self._stream(endpoint, endpoint, payload_key, items, encode, stage,
+                            max_rows or self.max_batch_rows, self.max_batch_bytes, self.max_in_flight)
+
+    def ingest(self, endpoint, rows, stage=None):
+        """rows를 /ingest<endpoint>로 대량 전송 (endpoint는 INGEST_KEYS 중 하나)"""
+        return self.ingest_stream(endpoint, ((None, r) for r in rows), stage)
+
+    def ingest_stream(self, endpoint, items, stage=None):
+        """upload_stream과 같지만 요청 하나 = gzip NDJSON 최대 INGEST_MAX_ROWS행
+
+        Worker가 D1 한도에 맞춰 나눠 커밋. 실패한 묶음은 기존 엔드포인트 형식으로 spool 보관
+        """
+        def encode(lines):
+            return gzip.compress(("\n".join(lines) + "\n").encode("utf-8"), compresslevel=5), INGEST_HEADERS
+
+        return self._stream(f"/ingest{endpoint}", endpoint, INGEST_KEYS[endpoint], items, encode, stage,
+                            INGEST_MAX_ROWS, INGEST_MAX_BYTES, min(self.max_in_flight, INGEST_IN_FLIGHT))
+
+    def bulk(self, endpoint, rows, stage=None, max_rows=None, bulk=None):
+        """INGEST_KEYS 엔드포인트 공통 진입점 — BULK_INGEST(또는 bulk)면 ingest, 아니면 기존 배열 엔드포인트"""
+        return self.bulk_stream(endpoint, ((None, r) for r in rows), stage, max_rows, bulk)
+
+    def bulk_stream(self, endpoint, items, stage=None, max_rows=None, bulk=None):
+        """bulk와 같지만 (tag, row) 이터레이터 — max_rows는 기존 엔드포인트로 보낼 때만 적용"""
+        if BULK_INGEST if bulk is None else bulk:
+            return self.ingest_stream(endpoint, items, stage)
+        return self.upload_stream(endpoint, items, INGEST_KEYS[endpoint], stage, max_rows)
+
+    def _stream(self, target, endpoint, payload_key, items, encode, stage, max_rows, max_bytes, in_flight):
+        result = UploadResult(endpoint)
+        stats = self._stage(stage)
+        start_time = time.monotonic()
+        slots = threading.BoundedSemaphore(in_flight)
+        outcomes = []
+
+        def send(start, lines, tags):
+            try:
+                payload, headers = encode(lines)
+                with self._lock:
+                    stats.bytes += len(payload)
+                try:
+                    self._send(target, payload, stats, headers)
+                    return start, start + len(lines), True, None, tags, None
+                except UploadError as e:
+                    spooled = self._spool_rows(endpoint, payload_key, lines, e)
+                    return start, start + len(lines), False, str(e), tags, spooled
+            finally:
+                slots.release()
+
+        with ThreadPoolExecutor(max_workers=in_flight) as ex:
+            futures = []
+
+            def submit(start, lines, tags):
+                slots.acquire()  # 전송 슬롯이 빌 때까지 대기
+                futures.append(ex.submit(send, start, lines, tags))
+
+            lines, tags = [], set()
+            start = index = 0
+            size = 2  # "[]"
+            for tag, row in items:
+                line = json.dumps(row, ensure_ascii=False)
+                row_size = len(line.encode("utf-8")) + 1
+                if lines and (size + row_size > max_bytes or len(lines) >= max_rows):
+                    submit(start, lines, tags)
+                    lines, tags = [], set()
+                    start = index
+                    size = 2
+                lines.append(line)
+                tags.add(tag)
+                size += row_size
+                index += 1
+            if lines:
+                submit(start, lines, tags)
+            outcomes = [f.result() for f in futures]
+
+        for start, end, ok, error, tags, spooled in outcomes:
+            result.batches.append((start, end, ok, error))
+            if ok:
+                result.sent += end - start
+            else:
+                result.failed += end - start
+                result.failed_tags.update(tags)
+                if spooled != "replay":
+                    result.lost_tags.update(tags)
+                note = {"replay": " (spool 보관)", "rejected": " (spool rejected 보관)"}.get(spooled, "")
+                log.error(f"  {target} 배치 {start}~{end} 실패{note}: {error}")
+
+        with self._lock:
+            stats.rows += result.sent
+            stats.failed_rows += result.failed
+            stats.batches += len(outcomes)
+            stats.failed_batches += sum(1 for o in outcomes if not o[2])
+            stats.elapsed += time.monotonic() - start_time
+        return result
+
+    def _spool_rows(self, endpoint, payload_key, lines, error):
+        """실패 배치를 spool에 보관 → "replay"(다음 실행 재전송) | "rejected"(재시도 불가, 수동 확인) | None
+
+        spool 쓰기 실패(디스크 가득 참, 권한 등)는 로그만 남김 — 전송 중인 다른 배치까지 중단하지 않음
+        """
+        if self.spool is None:
+            return None
+        try:
+            rows = [json.loads(line) for line in lines]
+            self.spool.put_rows(endpoint, payload_key, rows, str(error), error.retryable)
+        except Exception as e:
+            log.error(f"  {endpoint} spool 보관 실패 ({len(lines)}행): {e}")
+            return None
+        return "replay" if error.retryable else "rejected"
+
+    def post(self, endpoint, data, stage=None):
+        """행 배치가 아닌 단일 요청 — 성공하면 응답 body, 실패하면 (spool 보관 후) None"""
+        stats = self._stage(stage)
+        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            stats.bytes += len(payload)
+            stats.batches += 1
+        try:
+            return self._send(endpoint, payload, stats)
+        except UploadError as e:
+            with self._lock:
+                stats.failed_batches += 1
+            log.error(f"  {endpoint} 실패{' (spool 보관)' if self.spool else ''}: {e}")
+            if self.spool is not None:
+                try:
+                    self.spool.put_payload(endpoint, data, str(e), e.retryable)
+                except Exception as spool_error:
+                    log.error(f"  {endpoint} spool 보관 실패: {spool_error}")
+            return None
+
+    def summary(self, stage=None):
+        """스테이지 업로드 통계 로그 + dict 반환"""
+        stats = self._stage(stage)
+        log.info(
+            f"  업로드[{stage or 'default'}]: {stats.rows:,}행 / {stats.batches}배치, "
+            f"{stats.rows_per_sec:,.0f}행/초, 오류율 {stats.error_rate:.1%}, 재시도 {stats.retries}회"
+        )
+        return stats.as_dict()
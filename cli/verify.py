@@ -1,8 +1,9 @@
 """Blogdex 데이터 정합성 검증"""
+import sys
 import yaml
 import os
 from pathlib import Path
-from api import get
+from api import get, iter_posts, parse_cache_flags
 from rich.console import Console
 from rich.table import Table
 from rich import box
@@ -24,15 +25,14 @@ def run():
         config = yaml.safe_load(f)
 
     blogs_in_db = get("/blogs")
-    all_posts = get("/posts/search", params={"q": ""})
-    if isinstance(all_posts, dict):
-        all_posts = all_posts.get("results", [])
 
-    # 블로그별 DB 포스트 수
+    # 블로그별 DB 포스트 수 (전체 글을 페이지 단위로 세기만)
     db_counts = {}
-    for p in all_posts:
+    total_posts = 0
+    for p in iter_posts():
         bid = str(p.get("blog_id"))
         db_counts[bid] = db_counts.get(bid, 0) + 1
+        total_posts += 1
 
     console.print("[bold]1. 블로그 등록 상태[/]\n")
 
@@ -94,7 +94,7 @@ def run():
         table.add_row(name, "blogger", str(db_count), "API", "[green]OK[/]" if db_count > 0 else "[red]비어있음[/]")
 
     console.print(table)
-    console.print(f"\nDB 등록 블로그: {len(blogs_in_db)}개 | 총 포스트: {len(all_posts)}개")
+    console.print(f"\nDB 등록 블로그: {len(blogs_in_db)}개 | 총 포스트: {total_posts}개")
 
     # 스냅샷 상태
     console.print("\n[bold]2. GSC 스냅샷 상태[/]\n")
@@ -111,4 +111,5 @@ def run():
 
 
 if __name__ == "__main__":
+    sys.argv[1:] = parse_cache_flags(sys.argv[1:])
     run()
@@ -0,0 +1,11 @@
+-- v0.8.0 포스트 전문 검색 (FTS5)
+
+-- Kiwi 명사/복합명사 토큰 (공백 구분) — 동기화 때 cli/kiwi_tokens.index_tokens로 계산해서 같이 적재
+ALTER TABLE my_posts ADD COLUMN search_tokens TEXT;
+
+-- rowid = my_posts.id. 토큰은 이미 형태소 단위라 unicode61은 공백 분리 + 영문 소문자화만 함
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(tokens, tokenize = 'unicode61');
+
+-- 기존 토큰이 있는 글 채우기 (토큰이 없는 글은 cli/search_index.py backfill)
+INSERT INTO posts_fts (rowid, tokens)
+SELECT id, search_tokens FROM my_posts WHERE search_tokens IS NOT NULL AND search_tokens != '';
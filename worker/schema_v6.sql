@@ -0,0 +1,32 @@
+-- v0.8.1 포스트 중복 방지: my_posts(blog_id, title) UNIQUE
+-- 이 인덱스가 있어야 /posts, /ingest/posts의 INSERT OR IGNORE가 실제로 중복을 막음 (재시도/spool replay 안전)
+
+-- 1) 기존 중복 정리 — (blog_id, title)마다 id가 가장 작은 글만 남김
+--    performance는 남는 글로 옮기고 (같은 날짜가 이미 있으면 중복 쪽 행은 버림), posts_fts에서도 제거
+UPDATE OR IGNORE performance
+SET post_id = (
+    SELECT MIN(d.id) FROM my_posts m JOIN my_posts d ON d.blog_id = m.blog_id AND d.title = m.title
+    WHERE m.id = performance.post_id
+)
+WHERE post_id IN (
+    SELECT m.id FROM my_posts m
+    WHERE EXISTS (SELECT 1 FROM my_posts d WHERE d.blog_id = m.blog_id AND d.title = m.title AND d.id < m.id)
+);
+
+DELETE FROM performance WHERE post_id IN (
+    SELECT m.id FROM my_posts m
+    WHERE EXISTS (SELECT 1 FROM my_posts d WHERE d.blog_id = m.blog_id AND d.title = m.title AND d.id < m.id)
+);
+
+DELETE FROM posts_fts WHERE rowid IN (
+    SELECT m.id FROM my_posts m
+    WHERE EXISTS (SELECT 1 FROM my_posts d WHERE d.blog_id = m.blog_id AND d.title = m.title AND d.id < m.id)
+);
+
+DELETE FROM my_posts WHERE id IN (
+    SELECT m.id FROM my_posts m
+    WHERE EXISTS (SELECT 1 FROM my_posts d WHERE d.blog_id = m.blog_id AND d.title = m.title AND d.id < m.id)
+);
+
+-- 2) 이후 같은 블로그에 같은 제목은 한 번만
+CREATE UNIQUE INDEX IF NOT EXISTS idx_my_posts_blog_title ON my_posts(blog_id, title);
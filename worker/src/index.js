@@ -1,5 +1,13 @@
+import { titleHash } from "./title_hash.js";
+
 export default {
   async fetch(request, env) {
+    const response = await route(request, env);
+    return request.method === "GET" ? withEtag(request, response) : response;
+  }
+};
+
+async function route(request, env) {
     const url = new URL(request.url);
     const path = url.pathname;
     const method = request.method;
@@ -50,28 +58,30 @@ export default {
       }
 
       if (path === "/blogs" && method === "POST") {
-        const body = await request.json();
+        const body = await readJson(request);
         const { results } = await env.DB.prepare(
           "INSERT INTO blogs (name, platform, url, ga4_property_id) VALUES (?, ?, ?, ?) RETURNING *"
         ).bind(body.name, body.platform, body.url || "", body.ga4_property_id || "").all();
         return json(results[0]);
       }
 
+      // (blog_id, title) 중복은 무시 — schema_v6.sql의 UNIQUE 인덱스가 있어야 함
       if (path === "/posts" && method === "POST") {
-        const body = await request.json();
+        const body = await readJson(request);
         const stmt = env.DB.prepare(
-          "INSERT OR IGNORE INTO my_posts (blog_id, title, url, keywords, published_at) VALUES (?, ?, ?, ?, ?)"
+          "INSERT OR IGNORE INTO my_posts (blog_id, title, url, keywords, published_at, search_tokens) VALUES (?, ?, ?, ?, ?, ?)"
         );
         const batch = body.posts.map(p =>
-          stmt.bind(p.blog_id, p.title, p.url || "", p.keywords || "", p.published_at || "")
+          stmt.bind(p.blog_id, p.title, p.url || "", p.keywords || "", p.published_at || "", p.search_tokens || null)
         );
+        batch.push(env.DB.prepare(POSTS_FTS_SYNC));
         await env.DB.batch(batch);
         return json({ inserted: body.posts.length });
       }
 
       // 포스트 URL 벌크 업데이트
       if (path === "/posts/update-urls" && method === "POST") {
-        const body = await request.json();
+        const body = await readJson(request);
         const updates = body.updates || [];
         const stmt = env.DB.prepare(
           "UPDATE my_posts SET url = ? WHERE blog_id = ? AND title = ?"
@@ -86,6 +96,56 @@ export default {
         return json({ updated: updates.length });
       }
 
+      // 검색 토큰 갱신 (백필/재계산): my_posts.search_tokens와 posts_fts를 같이
+      if (path === "/posts/tokens" && method === "POST") {
+        const body = await readJson(request);
+        const updates = body.updates || [];
+        if (updates.length > TOKENS_MAX_POSTS) {
+          return json({ error: `too many updates (max ${TOKENS_MAX_POSTS} per request)`, max_posts: TOKENS_MAX_POSTS }, 413);
+        }
+        const update = env.DB.prepare("UPDATE my_posts SET search_tokens = ? WHERE id = ?");
+        const remove = env.DB.prepare("DELETE FROM posts_fts WHERE rowid = ?");
+        const insert = env.DB.prepare("INSERT INTO posts_fts (rowid, tokens) VALUES (?, ?)");
+        const perPost = u => [
+          update.bind(u.tokens || null, u.id),
+          remove.bind(u.id),
+          ...(u.tokens ? [insert.bind(u.id, u.tokens)] : []),
+        ];
+        // D1 batch 최대 100개씩 — 글 하나에 문장 최대 3개라 33개 글씩 (한 글의 문장이 batch 사이에 갈라지지 않게)
+        for (let i = 0; i < updates.length; i += 33) {
+          await env.DB.batch(updates.slice(i, i + 33).flatMap(perPost));
+        }
+        return json({ updated: updates.length });
+      }
+
+      // 순위 검색: tokens(공백 구분, cli/kiwi_tokens.query_tokens)를 posts_fts에서 bm25 순으로
+      // mode=all(기본)은 모든 토큰, any는 하나라도. 아직 토큰이 없는 글은 q의 LIKE로 보충 (score 0)
+      if (path === "/posts/fts" && method === "GET") {
+        const tokens = (url.searchParams.get("tokens") || "").split(/\s+/).filter(Boolean).slice(0, FTS_MAX_TOKENS);
+        const keyword = url.searchParams.get("q") || "";
+        const blogId = url.searchParams.get("blog_id") || "";
+        const limit = Math.min(parseInt(url.searchParams.get("limit") || "50"), 10000);
+        const op = url.searchParams.get("mode") === "any" ? " OR " : " AND ";
+        const blogWhere = blogId ? " AND p.blog_id = ?" : "";
+        const blogBind = blogId ? [parseInt(blogId)] : [];
+        const stmts = [];
+        if (tokens.length) {
+          const match = tokens.map(t => '"' + t.replace(/"/g, '""') + '"').join(op);
+          stmts.push(env.DB.prepare(
+            `SELECT p.*, b.name as blog_name, b.platform, -bm25(posts_fts) as score FROM posts_fts JOIN my_posts p ON p.id = posts_fts.rowid JOIN blogs b ON p.blog_id = b.id WHERE posts_fts MATCH ?${blogWhere} ORDER BY bm25(posts_fts) LIMIT ?`
+          ).bind(match, ...blogBind, limit));
+        }
+        if (keyword) {
+          const pattern = "%" + keyword + "%";
+          stmts.push(env.DB.prepare(
+            `SELECT p.*, b.name as blog_name, b.platform, 0 as score FROM my_posts p JOIN blogs b ON p.blog_id = b.id WHERE (p.search_tokens IS NULL OR p.search_tokens = '') AND (p.title LIKE ? OR p.keywords LIKE ?)${blogWhere} ORDER BY p.published_at DESC LIMIT ?`
+          ).bind(pattern, pattern, ...blogBind, limit));
+        }
+        const res = stmts.length ? await env.DB.batch(stmts) : [];
+        const results = res.flatMap(r => r.results).slice(0, limit);
+        return json({ results });
+      }
+
       if (path === "/posts/search" && method === "GET") {
         const keyword = url.searchParams.get("q") || "";
         const blogId = url.searchParams.get("blog_id") || "";
@@ -96,13 +156,78 @@ export default {
           sql += " AND p.blog_id = ?";
           binds.push(parseInt(blogId));
         }
+        // after_id가 있으면 id 순 커서 페이지 (LIMIT 10000에 잘리지 않게 끝까지 순회용)
+        const afterId = url.searchParams.get("after_id");
+        if (afterId !== null) {
+          const limit = pageLimit(url);
+          sql += " AND p.id > ? ORDER BY p.id LIMIT ?";
+          const { results } = await env.DB.prepare(sql).bind(...binds, parseInt(afterId) || 0, limit).all();
+          return json({ results, next: nextCursor(results, limit) });
+        }
         sql += " ORDER BY p.published_at DESC LIMIT 10000";
         const { results } = await env.DB.prepare(sql).bind(...binds).all();
         return json({ results });
       }
 
+      // 여러 패턴 검색을 한 번에 (D1 batch 한 번)
+      // hits: 패턴별 글 목록 / counts: 패턴별 블로그당 글 수 / totals: 블로그별 전체 글 수 (전체 목록 대신)
+      if (path === "/posts/search/batch" && method === "POST") {
+        const body = await readJson(request);
+        const hits = (body.hits || []).slice(0, SEARCH_BATCH_MAX);
+        const counts = (body.counts || []).slice(0, SEARCH_BATCH_MAX);
+        const limit = Math.min(parseInt(body.limit || "10000"), 10000);
+        const where = "(p.title LIKE ? OR p.keywords LIKE ?)" + (body.blog_id ? " AND p.blog_id = ?" : "");
+        const binds = q => body.blog_id ? ["%" + q + "%", "%" + q + "%", parseInt(body.blog_id)] : ["%" + q + "%", "%" + q + "%"];
+        const stmts = [
+          ...hits.map(q => env.DB.prepare(
+            `SELECT p.*, b.name as blog_name, b.platform FROM my_posts p JOIN blogs b ON p.blog_id = b.id WHERE ${where} ORDER BY p.published_at DESC LIMIT ?`
+          ).bind(...binds(q), limit)),
+          ...counts.map(q => env.DB.prepare(
+            `SELECT p.blog_id, COUNT(*) as n FROM my_posts p WHERE ${where} GROUP BY p.blog_id`
+          ).bind(...binds(q))),
+        ];
+        if (body.totals) stmts.push(env.DB.prepare("SELECT blog_id, COUNT(*) as n FROM my_posts GROUP BY blog_id"));
+        if (body.blogs) stmts.push(env.DB.prepare("SELECT * FROM blogs ORDER BY id"));
+        const related = body.related && body.related.q ? relatedStatements(env, body.related, body.blog_id) : [];
+        stmts.push(...related);
+        const res = stmts.length ? await env.DB.batch(stmts) : [];
+        const byBlog = rows => Object.fromEntries(rows.map(r => [r.blog_id, r.n]));
+        const out = { hits: {}, counts: {} };
+        hits.forEach((q, i) => { out.hits[q] = res[i].results; });
+        counts.forEach((q, i) => { out.counts[q] = byBlog(res[hits.length + i].results); });
+        let next = hits.length + counts.length;
+        if (body.totals) out.totals = byBlog(res[next++].results);
+        if (body.blogs) out.blogs = res[next++].results;
+        if (related.length) out.related = relatedResult(res[next].results, res[next + 1].results);
+        return json(out);
+      }
+
+      // 로컬 복제본(cli/replica.py)용 증분 export: id > after_id를 id 순으로
+      if (path.startsWith("/replica/") && method === "GET") {
+        const table = path.slice("/replica/".length);
+        if (!REPLICA_TABLES.includes(table)) return json({ error: "unknown table", tables: REPLICA_TABLES }, 404);
+        const afterId = parseInt(url.searchParams.get("after_id") || "0");
+        const limit = Math.min(parseInt(url.searchParams.get("limit") || "5000"), 10000);
+        const { results } = await env.DB.prepare(
+          `SELECT * FROM ${table} WHERE id > ? ORDER BY id LIMIT ?`
+        ).bind(afterId, limit).all();
+        const maxRow = await env.DB.prepare(`SELECT MAX(id) as max_id FROM ${table}`).first();
+        return json({ rows: results, last_id: results.length ? results[results.length - 1].id : afterId, max_id: maxRow.max_id || 0 });
+      }
+
+      // 존재 확인: 제목 지문만 받아서 이 블로그에 없는 지문만 반환 (전체 제목 목록을 내려보내지 않음)
+      if (path === "/posts/exists" && method === "POST") {
+        const body = await readJson(request);
+        const { results } = await env.DB.prepare(
+          "SELECT title FROM my_posts WHERE blog_id = ?"
+        ).bind(parseInt(body.blog_id)).all();
+        const known = new Set(await Promise.all(results.map(r => titleHash(r.title))));
+        const unknown = (body.hashes || []).filter(h => !known.has(h));
+        return json({ unknown, known_total: results.length });
+      }
+
       if (path === "/titles" && method === "POST") {
-        const body = await request.json();
+        const body = await readJson(request);
         const stmt = env.DB.prepare(
           "INSERT OR IGNORE INTO collected_titles (title, url, source, status) VALUES (?, ?, ?, 'new')"
         );
@@ -113,6 +238,15 @@ export default {
 
       if (path === "/titles/search" && method === "GET") {
         const q = url.searchParams.get("q") || "";
+        // after_id가 있으면 id 순 커서 페이지 (published_in 매칭 없이 행만)
+        const afterId = url.searchParams.get("after_id");
+        if (afterId !== null) {
+          const limit = pageLimit(url);
+          const { results } = await env.DB.prepare(
+            "SELECT * FROM collected_titles WHERE title LIKE ? AND id > ? ORDER BY id LIMIT ?"
+          ).bind('%' + q + '%', parseInt(afterId) || 0, limit).all();
+          return json({ results, next: nextCursor(results, limit) });
+        }
         const { results } = await env.DB.prepare(
           "SELECT * FROM collected_titles WHERE title LIKE ? ORDER BY id DESC LIMIT 50"
         ).bind('%' + q + '%').all();
@@ -145,7 +279,7 @@ export default {
       }
 
       if (path === "/titles/status" && method === "PUT") {
-        const body = await request.json();
+        const body = await readJson(request);
         const stmt = env.DB.prepare("UPDATE collected_titles SET status = ? WHERE id = ?");
         const batch = body.updates.map(u => stmt.bind(u.status, u.id));
         await env.DB.batch(batch);
@@ -160,7 +294,7 @@ export default {
       }
 
       if (path === "/performance" && method === "POST") {
-        const body = await request.json();
+        const body = await readJson(request);
         const stmt = env.DB.prepare(
           "INSERT OR REPLACE INTO performance (post_id, date, pageviews, sessions, clicks, impressions) VALUES (?, ?, ?, ?, ?, ?)"
         );
@@ -177,8 +311,15 @@ export default {
         return json({ results });
       }
 
+      // === 벌크 적재: gzip NDJSON (한 줄 = 행 하나) → D1 한도에 맞춘 청크로 커밋 ===
+      if (path.startsWith("/ingest/") && method === "POST") {
+        const spec = INGEST[path.slice("/ingest/".length)];
+        if (!spec) return json({ error: "unknown ingest target", targets: Object.keys(INGEST) }, 404);
+        return await ingestRows(env, request, spec);
+      }
+
       if (path === "/gsc/daily" && method === "POST") {
-        const body = await request.json();
+        const body = await readJson(request);
         const stmt = env.DB.prepare(
           "INSERT OR REPLACE INTO gsc_daily (site, date, clicks, impressions, ctr) VALUES (?, ?, ?, ?, ?)"
         );
@@ -211,7 +352,7 @@ export default {
       }
 
       if (path === "/gsc/keywords" && method === "POST") {
-        const body = await request.json();
+        const body = await readJson(request);
         const stmt = env.DB.prepare(
           "INSERT OR REPLACE INTO gsc_keywords (site, date, query, page, clicks, impressions, ctr, position) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
         );
@@ -256,7 +397,7 @@ export default {
       }
 
       if (path === "/coupang" && method === "POST") {
-        const body = await request.json();
+        const body = await readJson(request);
         const stmt = env.DB.prepare(
           "INSERT OR REPLACE INTO coupang_revenue (date, sub_id, clicks, orders, amount, revenue, product, source_file) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
         );
@@ -314,7 +455,7 @@ export default {
       
       // --- 타이틀 발행 블로그 매칭 ---
       if (path === "/titles/match" && method === "POST") {
-        const body = await request.json();
+        const body = await readJson(request);
         const titles = body.titles || [];
         const results = [];
         for (const t of titles) {
@@ -346,7 +487,7 @@ export default {
 
       // --- 타이틀 최적 블로그 추천 ---
       if (path === "/titles/recommend" && method === "POST") {
-        const body = await request.json();
+        const body = await readJson(request);
         const titles = body.titles || [];
         const { results: blogs } = await env.DB.prepare("SELECT * FROM blogs").all();
         const results = [];
@@ -390,7 +531,7 @@ export default {
 
       // --- 타이틀 상태 일괄 업데이트 ---
       if (path === "/titles/bulk-status" && method === "PUT") {
-        const body = await request.json();
+        const body = await readJson(request);
         const ids = body.ids || [];
         const status = body.status || "saved";
         if (ids.length === 0) return json({ updated: 0 });
@@ -417,6 +558,20 @@ export default {
         const offset = (page - 1) * limit;
         let rows, countRow;
         const source = url.searchParams.get("source") || "";
+        // before_id가 있으면 OFFSET 대신 키셋 (최신순 유지, 0이면 처음부터, 총 개수는 생략)
+        const beforeId = url.searchParams.get("before_id");
+        if (beforeId !== null) {
+          const conds = [];
+          const binds = [];
+          if (status !== "all") { conds.push("status = ?"); binds.push(status); }
+          if (source) { conds.push("source = ?"); binds.push(source); }
+          if (parseInt(beforeId) > 0) { conds.push("id < ?"); binds.push(parseInt(beforeId)); }
+          const where = conds.length ? " WHERE " + conds.join(" AND ") : "";
+          const { results } = await env.DB.prepare(
+            `SELECT * FROM collected_titles${where} ORDER BY id DESC LIMIT ?`
+          ).bind(...binds, limit).all();
+          return json({ limit, data: results, next: nextCursor(results, limit) });
+        }
         if (status === "all" && !source) {
           countRow = await env.DB.prepare("SELECT COUNT(*) as total FROM collected_titles").first();
           const { results } = await env.DB.prepare("SELECT * FROM collected_titles ORDER BY id DESC LIMIT ? OFFSET ?").bind(limit, offset).all();
@@ -446,7 +601,7 @@ export default {
       }
 
     if (path === "/ga4/pageviews" && method === "POST") {
-      const body = await request.json();
+      const body = await readJson(request);
       const data = body.data || [];
       if (data.length === 0) return json({ inserted: 0 });
       const stmt = env.DB.prepare(
@@ -703,7 +858,7 @@ export default {
     
     // === sync_log 엔드포인트 ===
     if (path === "/sync/log" && method === "POST") {
-      const body = await request.json();
+      const body = await readJson(request);
       const rows = body.logs || [body];
       for (const log of rows) {
         await env.DB.prepare(
@@ -834,7 +989,7 @@ export default {
     
     // === Bing 전용 엔드포인트 ===
     if (path === "/bing/daily" && method === "POST") {
-      const body = await request.json();
+      const body = await readJson(request);
       const rows = body.rows || [body];
       let count = 0;
       for (const r of rows) {
@@ -861,7 +1016,7 @@ export default {
     }
 
     if (path === "/bing/keywords" && method === "POST") {
-      const body = await request.json();
+      const body = await readJson(request);
       const rows = body.keywords || [body];
       let count = 0;
       for (const r of rows) {
@@ -911,7 +1066,7 @@ export default {
     }
 
     if (path === "/exposure/update" && method === "POST") {
-      const body = await request.json();
+      const body = await readJson(request);
       const rows = body.data || [];
       let updated = 0;
       for (const r of rows) {
@@ -939,7 +1094,7 @@ export default {
     }
 
     if (path === "/exposure/weekly" && method === "POST") {
-      const body = await request.json();
+      const body = await readJson(request);
       const week = body.week || 1;
       const rows = body.data || [];
       const col = "week" + week + "_impressions";
@@ -1001,8 +1156,22 @@ export default {
     } catch (e) {
       return json({ error: e.message }, 500);
     }
+}
+
+// GET 200 응답에 본문 해시 ETag — If-None-Match가 같으면 304 (cli/api_cache.py 재검증용)
+async function withEtag(request, response) {
+  if (response.status !== 200) return response;
+  const body = await response.arrayBuffer();
+  const digest = new Uint8Array(await crypto.subtle.digest("SHA-1", body));
+  const etag = 'W/"' + Array.from(digest.slice(0, 12), b => b.toString(16).padStart(2, "0")).join("") + '"';
+  const headers = new Headers(response.headers);
+  headers.set("ETag", etag);
+  headers.set("Cache-Control", "private, no-cache");
+  if (request.headers.get("If-None-Match") === etag) {
+    return new Response(null, { status: 304, headers });
   }
-};
+  return new Response(body, { status: 200, headers });
+}
 
 function corsHeaders() {
   return {
@@ -1012,8 +1181,90 @@ function corsHeaders() {
   };
 }
 
+// 요청 본문 JSON — Content-Encoding: gzip이면 풀어서 파싱
+async function readJson(request) {
+  if ((request.headers.get("Content-Encoding") || "").toLowerCase() === "gzip") {
+    const stream = request.body.pipeThrough(new DecompressionStream("gzip"));
+    return await new Response(stream).json();
+  }
+  return await request.json();
+}
+
+// 커서 페이지 크기 (?limit=, 기본 1000 / 최대 5000)
+function pageLimit(url) {
+  return Math.min(Math.max(parseInt(url.searchParams.get("limit") || "1000") || 1000, 1), 5000);
+}
+
+// 꽉 찬 페이지면 마지막 id가 다음 커서, 아니면 끝(null)
+function nextCursor(results, limit) {
+  return results.length === limit ? results[results.length - 1].id : null;
+}
+
+const SEARCH_BATCH_MAX = 30;  // /posts/search/batch 패턴 수 상한 (hits, counts 각각)
+const FTS_MAX_TOKENS = 16;    // /posts/fts 검색어 토큰 수 상한
+const TOKENS_MAX_POSTS = 300; // /posts/tokens 요청 하나의 글 수 상한 (글 하나에 D1 문장 최대 3개 → 900개, 호출당 쿼리 한도 1000)
+
+// /posts/search/batch의 related — /posts/fts와 같은 관련 글 집합(bm25 + 토큰 없는 글 LIKE)을 블로그별로 집계
+// 글 목록은 내려보내지 않고 블로그별 글 수, words가 제목에 모두 들어간 글 수, 상위 titles개 제목만.
+// tokens가 없으면(kiwipiepy 없는 클라이언트) q LIKE로 전체 글에서
+function relatedStatements(env, rel, blogId) {
+  const tokens = String(rel.tokens || "").split(/\s+/).filter(Boolean).slice(0, FTS_MAX_TOKENS);
+  const words = (rel.words || []).slice(0, SEARCH_BATCH_MAX);
+  const titles = Math.min(parseInt(rel.titles || "5"), 50);
+  const pattern = "%" + rel.q + "%";
+  const blogWhere = blogId ? " AND p.blog_id = ?" : "";
+  const blogBind = blogId ? [parseInt(blogId)] : [];
+  let relSql, relBinds;
+  if (tokens.length) {
+    const op = rel.mode === "any" ? " OR " : " AND ";
+    const match = tokens.map(t => '"' + t.replace(/"/g, '""') + '"').join(op);
+    relSql = "SELECT p.blog_id, p.title, p.published_at, -bm25(posts_fts) AS score FROM posts_fts JOIN my_posts p ON p.id = posts_fts.rowid" +
+      ` WHERE posts_fts MATCH ?${blogWhere}` +
+      " UNION ALL SELECT p.blog_id, p.title, p.published_at, 0 FROM my_posts p" +
+      ` WHERE (p.search_tokens IS NULL OR p.search_tokens = '') AND (p.title LIKE ? OR p.keywords LIKE ?)${blogWhere}`;
+    relBinds = [match, ...blogBind, pattern, pattern, ...blogBind];
+  } else {
+    relSql = `SELECT p.blog_id, p.title, p.published_at, 0 AS score FROM my_posts p WHERE (p.title LIKE ? OR p.keywords LIKE ?)${blogWhere}`;
+    relBinds = [pattern, pattern, ...blogBind];
+  }
+  const similar = words.map(() => "instr(lower(title), lower(?)) > 0").join(" AND ") || "1";
+  return [
+    env.DB.prepare(
+      `WITH rel AS (${relSql}) SELECT blog_id, COUNT(*) AS n, SUM(${similar}) AS similar FROM rel GROUP BY blog_id`
+    ).bind(...relBinds, ...words),
+    env.DB.prepare(
+      `WITH rel AS (${relSql}) SELECT blog_id, title FROM (SELECT blog_id, title, ROW_NUMBER() OVER ` +
+      "(PARTITION BY blog_id ORDER BY score DESC, published_at DESC) AS rn FROM rel) WHERE rn <= ? ORDER BY blog_id, rn"
+    ).bind(...relBinds, titles),
+  ];
+}
+
+function relatedResult(counts, titles) {
+  const out = { total: 0, counts: {}, similar: {}, titles: {} };
+  for (const r of counts) {
+    out.total += r.n;
+    out.counts[r.blog_id] = r.n;
+    out.similar[r.blog_id] = r.similar;
+  }
+  for (const r of titles) (out.titles[r.blog_id] ||= []).push(r.title);
+  return out;
+}
+
+// 새로 들어온 글(posts_fts의 마지막 rowid 이후)의 검색 토큰을 posts_fts에 반영
+// 토큰을 나중에 채우는 기존 글은 /posts/tokens가 직접 갱신
+const POSTS_FTS_SYNC =
+  "INSERT INTO posts_fts (rowid, tokens) SELECT id, search_tokens FROM my_posts " +
+  "WHERE search_tokens IS NOT NULL AND search_tokens != '' AND id > (SELECT COALESCE(MAX(rowid), 0) FROM posts_fts)";
+
+// 복제본 export 허용 테이블 (테이블 이름이 SQL에 그대로 들어가므로 목록에 있는 것만)
+const REPLICA_TABLES = [
+  "blogs", "my_posts", "collected_titles", "gsc_daily", "gsc_keywords",
+  "ga4_pageviews", "bing_daily", "bing_keywords",
+];
+
+// 응답은 공백 없이 직렬화 (대량 조회 응답 크기 절감, gzip은 Cloudflare가 Accept-Encoding 보고 적용)
 function json(data, status = 200) {
-  return new Response(JSON.stringify(data, null, 2), {
+  return new Response(JSON.stringify(data), {
     status,
     headers: {
       "Content-Type": "application/json",
@@ -1024,3 +1275,122 @@ function json(data, status = 200) {
   });
 }
 
+// === 벌크 적재 (/ingest/<엔드포인트>) ===
+// 기존 POST 엔드포인트와 같은 SQL/기본값. 같은 본문을 다시 보내도 결과가 같음 — UNIQUE 키 위의 INSERT OR REPLACE,
+// posts는 my_posts(blog_id, title) UNIQUE 인덱스(schema_v6.sql) 위의 INSERT OR IGNORE
+const INGEST = {
+  "gsc/daily": {
+    sql: "INSERT OR REPLACE INTO gsc_daily (site, date, clicks, impressions, ctr) VALUES ",
+    cols: 5,
+    bind: d => [d.site, d.date, d.clicks || 0, d.impressions || 0, d.ctr || 0],
+  },
+  "gsc/keywords": {
+    sql: "INSERT OR REPLACE INTO gsc_keywords (site, date, query, page, clicks, impressions, ctr, position) VALUES ",
+    cols: 8,
+    bind: d => [d.site, d.date, d.query, d.page || "", d.clicks || 0, d.impressions || 0, d.ctr || 0, d.position || 0],
+  },
+  "ga4/pageviews": {
+    sql: "INSERT OR REPLACE INTO ga4_pageviews (site, date, page, pageviews, sessions, revenue) VALUES ",
+    cols: 6,
+    bind: d => [d.site, d.date, d.page, d.pageviews || 0, d.sessions || 0, d.revenue || 0],
+  },
+  "bing/daily": {
+    sql: "INSERT OR REPLACE INTO bing_daily (site, date, clicks, impressions, account) VALUES ",
+    cols: 5,
+    bind: d => [d.site, d.date, d.clicks || 0, d.impressions || 0, d.account || null],
+  },
+  "bing/keywords": {
+    sql: "INSERT OR REPLACE INTO bing_keywords (site, date, query, clicks, impressions, ctr, position, account) VALUES ",
+    cols: 8,
+    bind: d => [d.site, d.date, d.query, d.clicks || 0, d.impressions || 0, d.ctr || 0, d.position || 0, d.account || null],
+  },
+  "posts": {
+    sql: "INSERT OR IGNORE INTO my_posts (blog_id, title, url, keywords, published_at, search_tokens) VALUES ",
+    cols: 6,
+    bind: p => [p.blog_id, p.title, p.url || "", p.keywords || "", p.published_at || "", p.search_tokens || null],
+    after: POSTS_FTS_SYNC,
+  },
+};
+
+const D1_MAX_PARAMS = 100;      // 문장 하나의 바인딩 파라미터 한도
+const D1_BATCH_STATEMENTS = 50; // batch() 한 번(= 트랜잭션 하나)에 묶는 문장 수
+// Worker 호출 하나의 D1 쿼리 한도(1000) 안쪽 — 요청 하나의 최대 행 = floor(100 / 열 수) * 900
+// (8열이면 10800행, 클라이언트 INGEST_MAX_ROWS는 10000)
+const INGEST_MAX_STATEMENTS = 900;
+
+// 본문을 읽는 대로 줄 단위 파싱 (전체를 문자열 하나로 올리지 않음)
+async function* readNdjson(request) {
+  let stream = request.body;
+  if ((request.headers.get("Content-Encoding") || "").toLowerCase() === "gzip") {
+    stream = stream.pipeThrough(new DecompressionStream("gzip"));
+  }
+  const reader = stream.pipeThrough(new TextDecoderStream()).getReader();
+  let rest = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    const lines = (rest + value).split("\n");
+    rest = lines.pop();
+    for (const line of lines) {
+      if (line.trim()) yield line;
+    }
+  }
+  if (rest.trim()) yield rest;
+}
+
+// 여러 행을 VALUES (...), (...) 문장 하나로 (파라미터 한도 안에서) → 문장 D1_BATCH_STATEMENTS개씩 batch 커밋
+// 중간 청크가 실패하면 앞 청크는 이미 커밋된 상태 — 응답의 inserted로 확인, 재전송해도 안전
+// 행이 maxRows를 넘으면 그때까지 받은 행만 커밋하고 413 (나머지는 요청을 나눠 다시)
+async function ingestRows(env, request, spec) {
+  const rowsPerStmt = Math.floor(D1_MAX_PARAMS / spec.cols);
+  const maxRows = rowsPerStmt * INGEST_MAX_STATEMENTS;
+  const tuple = "(" + new Array(spec.cols).fill("?").join(", ") + ")";
+  const fullSql = spec.sql + new Array(rowsPerStmt).fill(tuple).join(", ");
+  const full = env.DB.prepare(fullSql);
+  let pending = [];  // 아직 문장으로 묶지 않은 행
+  let stmts = [];
+  let inserted = 0, chunks = 0, lineNo = 0;
+
+  const commit = async () => {
+    if (stmts.length === 0) return;
+    await env.DB.batch(stmts);
+    chunks++;
+    stmts = [];
+  };
+  const pack = (rows) => {
+    const params = rows.flat();
+    const stmt = rows.length === rowsPerStmt
+      ? full
+      : env.DB.prepare(spec.sql + new Array(rows.length).fill(tuple).join(", "));
+    stmts.push(stmt.bind(...params));
+    inserted += rows.length;
+  };
+
+  for await (const line of readNdjson(request)) {
+    lineNo++;
+    if (lineNo > maxRows) {
+      if (pending.length > 0) pack(pending);
+      await commit();
+      if (spec.after && inserted > 0) await env.DB.prepare(spec.after).run();
+      return json({ error: `too many rows (max ${maxRows} per request)`, max_rows: maxRows, inserted, chunks }, 413);
+    }
+    let row;
+    try {
+      row = JSON.parse(line);
+    } catch (e) {
+      await commit();
+      return json({ error: `line ${lineNo}: ${e.message}`, inserted, chunks }, 400);
+    }
+    pending.push(spec.bind(row));
+    if (pending.length === rowsPerStmt) {
+      pack(pending);
+      pending = [];
+      if (stmts.length >= D1_BATCH_STATEMENTS) await commit();
+    }
+  }
+  if (pending.length > 0) pack(pending);
+  await commit();
+  // 적재 후처리 (posts → posts_fts 등), 적재 전체가 끝난 뒤 한 번
+  if (spec.after && inserted > 0) await env.DB.prepare(spec.after).run();
+  return json({ inserted, chunks });
+}
@@ -0,0 +1,19 @@
+// 제목 지문 — cli/title_hash.py와 바이트 단위로 같은 정규화 + 해시 (규칙은 그 파일 docstring 참고)
+// 1. NFC  2. WHITESPACE 연속 → 공백 하나, 앞뒤 제거  3. ASCII A-Z만 소문자
+// 지문 = SHA-256 앞 8바이트 hex
+
+const WHITESPACE = /[\t\n\v\f\r \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000\u200b\ufeff]+/g;
+
+export function normalizeTitle(title) {
+  return String(title ?? "")
+    .normalize("NFC")
+    .replace(WHITESPACE, " ")
+    .replace(/^ +| +$/g, "")
+    .replace(/[A-Z]/g, c => c.toLowerCase());
+}
+
+export async function titleHash(title) {
+  const data = new TextEncoder().encode(normalizeTitle(title));
+  const digest = new Uint8Array(await crypto.subtle.digest("SHA-256", data));
+  return Array.from(digest.slice(0, 8), b => b.toString(16).padStart(2, "0")).join("");
+}
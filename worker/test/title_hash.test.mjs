@@ -0,0 +1,38 @@
+// 제목 지문 고정 벡터 — cli/tests/test_title_hash.py와 같은 값이어야 함
+import { test } from "node:test";
+import assert from "node:assert/strict";
+import { normalizeTitle, titleHash } from "../src/title_hash.js";
+
+const VECTORS = [
+  ["전기차 보조금 2026 신청방법", "전기차 보조금 2026 신청방법"],
+  ["  Hello\u3000World\u00a0 ", "hello world"],  // 전각 공백, NBSP
+  ["\ufeffABC\u200bdef", "abc def"],             // BOM(JS trim만 공백), zero-width space(양쪽 다 아님)
+  ["e\u0301clair", "\u00e9clair"],                // NFC 결합
+  ["\u00c9CLAIR", "\u00c9clair"],                 // ASCII만 소문자
+  ["\u1100\u1161\u11a8 \t\n", "\uac01"],         // 한글 자모 → 완성형
+  ["\x1c tab\tend\n", "\x1c tab end"],          // U+001C는 Python strip만 공백 → 규칙에서 제외
+  ["", ""],
+];
+const HASHES = {
+  "전기차 보조금 2026 신청방법": "54fe079cd906cf8f",
+  "hello world": "b94d27b9934d3e08",
+  "abc def": "010971ea0013a09d",
+  "\u00e9clair": "0ebe6cb10ee48b34",
+  "\u00c9clair": "c1b9327b72ce7375",
+  "\x1c tab end": "56a0de2f5ac35279",
+  "": "e3b0c44298fc1c14",
+};
+
+test("normalize", () => {
+  for (const [raw, expected] of VECTORS) assert.equal(normalizeTitle(raw), expected, raw);
+});
+
+test("hash vectors", async () => {
+  for (const [normalized, digest] of Object.entries(HASHES)) {
+    assert.equal(await titleHash(normalized), digest, normalized);
+  }
+});
+
+test("raw and normalized hash equal", async () => {
+  for (const [raw, expected] of VECTORS) assert.equal(await titleHash(raw), await titleHash(expected));
+});